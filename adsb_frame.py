@@ -0,0 +1,297 @@
+"""
+Bulk encoding and decoding of 112-bit ADS-B DF17 airborne-position frames.
+
+Frames are handled as (N, 14) uint8 arrays so that whole batches can be
+encoded, checked and decoded with a handful of NumPy operations.
+"""
+import zlib
+import numpy as np
+
+FRAME_BYTES = 14
+FRAME_BITS = FRAME_BYTES * 8
+DATA_BYTES = 11  # DF/CA, ICAO address and ME field covered by the parity
+
+DF17_HEADER = (17 << 3) | 5  # Downlink format 17, capability 5
+AIRBORNE_POSITION_TC = 11  # Barometric altitude, NUCp 7
+
+CRC24_GENERATOR = 0xFFF409
+CPR_BITS = 17
+CPR_SCALE = float(1 << CPR_BITS)
+CPR_NZ = 15
+FEET_PER_METER = 1 / 0.3048
+
+
+def _build_crc24_table():
+    table = np.zeros(256, dtype=np.uint32)
+    for byte in range(256):
+        crc = byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= CRC24_GENERATOR
+        table[byte] = crc & 0xFFFFFF
+    return table
+
+
+CRC24_TABLE = _build_crc24_table()
+
+
+def crc24(frames):
+    """
+    Compute the Mode S parity of every frame in a batch.
+    :param frames: (N, 14) or (N, 11) uint8 array; only the first 11 bytes are used.
+    :return: (N,) uint32 array of 24-bit parity values.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    crc = np.zeros(frames.shape[0], dtype=np.uint32)
+    for k in range(DATA_BYTES):
+        index = ((crc >> 16) ^ frames[:, k]) & 0xFF
+        crc = ((crc << 8) & 0xFFFFFF) ^ CRC24_TABLE[index]
+    return crc
+
+
+def parity_field(frames):
+    """Return the 24-bit PI field carried in the last three bytes of each frame."""
+    frames = np.asarray(frames, dtype=np.uint8)
+    return ((frames[:, 11].astype(np.uint32) << 16) |
+            (frames[:, 12].astype(np.uint32) << 8) |
+            frames[:, 13].astype(np.uint32))
+
+
+def check_crc(frames):
+    """Return a boolean mask of frames whose parity field matches their contents."""
+    return crc24(frames) == parity_field(frames)
+
+
+def icao_address(drone_id):
+    """
+    Map a simulation drone id onto a 24-bit ICAO address.
+    Numeric ids are used directly, anything else is hashed.
+    """
+    try:
+        return int(drone_id) & 0xFFFFFF
+    except (TypeError, ValueError):
+        return zlib.crc32(str(drone_id).encode()) & 0xFFFFFF
+
+
+def cpr_nl(lat):
+    """Number of longitude zones (NL) for the given latitudes in degrees."""
+    lat = np.abs(np.asarray(lat, dtype=np.float64))
+    a = 1 - np.cos(np.pi / (2 * CPR_NZ))
+    b = np.cos(np.radians(lat)) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nl = np.floor(2 * np.pi / np.arccos(np.clip(1 - a / b, -1.0, 1.0)))
+    nl = np.where(lat == 0, 59, nl)
+    nl = np.where(lat == 87, 2, nl)
+    nl = np.where(lat > 87, 1, nl)
+    return nl.astype(np.int64)
+
+
+def cpr_encode(lat, lon, odd):
+    """
+    Airborne CPR encoding of positions.
+    :param lat: Latitudes in degrees.
+    :param lon: Longitudes in degrees.
+    :param odd: Boolean/int array, 1 for odd-format frames.
+    :return: (lat_cpr, lon_cpr) arrays of 17-bit integers.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    i = np.asarray(odd, dtype=np.int64)
+
+    dlat = 360.0 / (4 * CPR_NZ - i)
+    yz = np.floor(CPR_SCALE * np.mod(lat, dlat) / dlat + 0.5)
+    rlat = dlat * (yz / CPR_SCALE + np.floor(lat / dlat))
+
+    dlon = 360.0 / np.maximum(cpr_nl(rlat) - i, 1)
+    xz = np.floor(CPR_SCALE * np.mod(lon, dlon) / dlon + 0.5)
+
+    mask = (1 << CPR_BITS) - 1
+    return yz.astype(np.int64) & mask, xz.astype(np.int64) & mask
+
+
+def cpr_decode_local(lat_cpr, lon_cpr, odd, ref_lat, ref_lon):
+    """
+    Locally unambiguous CPR decoding against a reference position
+    (valid within ~180 NM of the reference, e.g. the GCS).
+    :return: (lat, lon) arrays in degrees.
+    """
+    yz = np.asarray(lat_cpr, dtype=np.float64) / CPR_SCALE
+    xz = np.asarray(lon_cpr, dtype=np.float64) / CPR_SCALE
+    i = np.asarray(odd, dtype=np.int64)
+
+    dlat = 360.0 / (4 * CPR_NZ - i)
+    j = np.floor(ref_lat / dlat) + np.floor(0.5 + np.mod(ref_lat, dlat) / dlat - yz)
+    lat = dlat * (j + yz)
+
+    dlon = 360.0 / np.maximum(cpr_nl(lat) - i, 1)
+    m = np.floor(ref_lon / dlon) + np.floor(0.5 + np.mod(ref_lon, dlon) / dlon - xz)
+    lon = dlon * (m + xz)
+    return lat, lon
+
+
+def cpr_decode_global(lat_even, lon_even, lat_odd, lon_odd, odd_is_newer):
+    """
+    Globally unambiguous CPR decoding of even/odd frame pairs.
+    :param odd_is_newer: Boolean array selecting which frame of each pair is the most recent.
+    :return: (lat, lon, valid) arrays; valid is False where the pair straddles an NL boundary.
+    """
+    yz0 = np.asarray(lat_even, dtype=np.float64) / CPR_SCALE
+    xz0 = np.asarray(lon_even, dtype=np.float64) / CPR_SCALE
+    yz1 = np.asarray(lat_odd, dtype=np.float64) / CPR_SCALE
+    xz1 = np.asarray(lon_odd, dtype=np.float64) / CPR_SCALE
+    odd_is_newer = np.asarray(odd_is_newer, dtype=bool)
+
+    dlat0 = 360.0 / (4 * CPR_NZ)
+    dlat1 = 360.0 / (4 * CPR_NZ - 1)
+    j = np.floor(59 * yz0 - 60 * yz1 + 0.5)
+    lat0 = dlat0 * (np.mod(j, 60) + yz0)
+    lat1 = dlat1 * (np.mod(j, 59) + yz1)
+    lat0 = np.where(lat0 >= 270, lat0 - 360, lat0)
+    lat1 = np.where(lat1 >= 270, lat1 - 360, lat1)
+
+    nl0, nl1 = cpr_nl(lat0), cpr_nl(lat1)
+    valid = nl0 == nl1
+
+    lat = np.where(odd_is_newer, lat1, lat0)
+    i = odd_is_newer.astype(np.int64)
+    nl = np.where(odd_is_newer, nl1, nl0)
+    ni = np.maximum(nl - i, 1)
+    m = np.floor(xz0 * (nl - 1) - xz1 * nl + 0.5)
+    xz = np.where(odd_is_newer, xz1, xz0)
+    lon = (360.0 / ni) * (np.mod(m, ni) + xz)
+    lon = np.where(lon >= 180, lon - 360, lon)
+    return lat, lon, valid
+
+
+def encode_altitude(alt_m):
+    """Encode altitudes in meters into the 12-bit, 25 ft (Q=1) altitude field."""
+    feet = np.asarray(alt_m, dtype=np.float64) * FEET_PER_METER
+    n = np.clip(np.round((feet + 1000) / 25), 0, 2047).astype(np.int64)
+    return ((n >> 4) << 5) | 0x10 | (n & 0xF)
+
+
+def decode_altitude(alt_field):
+    """Decode 12-bit (Q=1) altitude fields back to meters."""
+    alt_field = np.asarray(alt_field, dtype=np.int64)
+    n = ((alt_field >> 5) << 4) | (alt_field & 0xF)
+    return (n * 25 - 1000) / FEET_PER_METER
+
+
+def encode_airborne_position(icao, lat, lon, alt_m, odd, type_code=AIRBORNE_POSITION_TC):
+    """
+    Build DF17 airborne-position frames for a batch of reports.
+    :param icao: 24-bit ICAO addresses.
+    :param lat: Latitudes in degrees.
+    :param lon: Longitudes in degrees.
+    :param alt_m: Barometric altitudes in meters.
+    :param odd: CPR format flag per frame (0 even, 1 odd).
+    :param type_code: ADS-B type code (9-18 for airborne position).
+    :return: (N, 14) uint8 array of frames with valid parity.
+    """
+    icao = np.asarray(icao, dtype=np.uint64)
+    odd = np.asarray(odd, dtype=np.int64)
+    lat_cpr, lon_cpr = cpr_encode(lat, lon, odd)
+    alt_field = encode_altitude(alt_m)
+
+    me = ((np.uint64(type_code) << np.uint64(51)) |
+          (alt_field.astype(np.uint64) << np.uint64(36)) |
+          (odd.astype(np.uint64) << np.uint64(34)) |
+          (lat_cpr.astype(np.uint64) << np.uint64(17)) |
+          lon_cpr.astype(np.uint64))
+
+    count = me.shape[0]
+    frames = np.empty((count, FRAME_BYTES), dtype=np.uint8)
+    frames[:, 0] = DF17_HEADER
+    frames[:, 1:4] = icao.astype('>u4').view(np.uint8).reshape(count, 4)[:, 1:]
+    frames[:, 4:11] = me.astype('>u8').view(np.uint8).reshape(count, 8)[:, 1:]
+    frames[:, 11:14] = crc24(frames).astype('>u4').view(np.uint8).reshape(count, 4)[:, 1:]
+    return frames
+
+
+def decode_airborne_position(frames, ref_lat, ref_lon):
+    """
+    Decode a batch of DF17 airborne-position frames.
+    :param frames: (N, 14) uint8 array.
+    :param ref_lat: Reference latitude used for local CPR decoding.
+    :param ref_lon: Reference longitude used for local CPR decoding.
+    :return: Dict of arrays: icao, type_code, odd, latitude, longitude, altitude, crc_ok.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    icao = ((frames[:, 1].astype(np.uint32) << 16) |
+            (frames[:, 2].astype(np.uint32) << 8) |
+            frames[:, 3].astype(np.uint32))
+
+    me = np.zeros(frames.shape[0], dtype=np.uint64)
+    for k in range(4, 11):
+        me = (me << np.uint64(8)) | frames[:, k].astype(np.uint64)
+
+    type_code = (me >> np.uint64(51)).astype(np.int64) & 0x1F
+    alt_field = (me >> np.uint64(36)).astype(np.int64) & 0xFFF
+    odd = (me >> np.uint64(34)).astype(np.int64) & 0x1
+    lat_cpr = (me >> np.uint64(17)).astype(np.int64) & 0x1FFFF
+    lon_cpr = me.astype(np.int64) & 0x1FFFF
+
+    lat, lon = cpr_decode_local(lat_cpr, lon_cpr, odd, ref_lat, ref_lon)
+    return {
+        'icao': icao,
+        'type_code': type_code,
+        'odd': odd,
+        'latitude': lat,
+        'longitude': lon,
+        'altitude': decode_altitude(alt_field),
+        'crc_ok': check_crc(frames) & ((frames[:, 0] >> 3) == 17),
+    }
+
+
+def encode_messages(messages, odd=None):
+    """
+    Encode a list of simulation message dicts (drone_id, latitude, longitude, altitude).
+    :param odd: Optional CPR format flags; by default frames alternate even/odd.
+    """
+    count = len(messages)
+    icao = np.fromiter((icao_address(m['drone_id']) for m in messages), dtype=np.uint64, count=count)
+    lat = np.fromiter((m['latitude'] for m in messages), dtype=np.float64, count=count)
+    lon = np.fromiter((m['longitude'] for m in messages), dtype=np.float64, count=count)
+    alt = np.fromiter((m['altitude'] for m in messages), dtype=np.float64, count=count)
+    if odd is None:
+        odd = np.arange(count) & 1
+    return encode_airborne_position(icao, lat, lon, alt, odd)
+
+
+def flip_random_bits(frames, bit_error_probability, rng=None):
+    """
+    Return a copy of the frames with each bit flipped independently.
+    :param bit_error_probability: Scalar or per-frame probability of a bit error.
+    :param rng: Optional numpy Generator.
+    """
+    rng = rng or np.random.default_rng()
+    frames = np.array(frames, dtype=np.uint8)
+    counts = rng.binomial(FRAME_BITS, bit_error_probability, size=frames.shape[0])
+    return _flip(frames, counts, rng)
+
+
+def flip_bit_count(frames, counts, rng=None):
+    """Return a copy of the frames with `counts[i]` random bits flipped in frame i."""
+    rng = rng or np.random.default_rng()
+    frames = np.array(frames, dtype=np.uint8)
+    counts = np.broadcast_to(np.asarray(counts, dtype=np.int64), (frames.shape[0],))
+    return _flip(frames, counts, rng)
+
+
+def _flip(frames, counts, rng):
+    rows = np.repeat(np.arange(frames.shape[0]), counts)
+    bits = rng.integers(0, FRAME_BITS, size=rows.shape[0])
+    # Distinct bits per frame: a bit drawn twice would flip back and could leave a
+    # corrupted frame intact
+    while True:
+        key = rows * FRAME_BITS + bits
+        order = np.argsort(key, kind='stable')
+        repeated = order[1:][key[order[1:]] == key[order[:-1]]]
+        if repeated.shape[0] == 0:
+            break
+        bits[repeated] = rng.integers(0, FRAME_BITS, size=repeated.shape[0])
+    masks = (np.uint8(0x80) >> (bits & 7).astype(np.uint8)).astype(np.uint8)
+    # ufunc.at so that two flips landing in the same byte both apply
+    np.bitwise_xor.at(frames, (rows, bits >> 3), masks)
+    return frames
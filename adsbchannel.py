@@ -1,13 +1,51 @@
 import numpy as np
 import random
 import time
+from adsb_frame import flip_bit_count, flip_random_bits
+from ber import default_table
+from importance import decide
 
 class ADSBChannel:
-    def __init__(self, error_rate=0.01, frequency=1090e6, noise_figure_db=5.0):
+    def __init__(self, error_rate=0.01, frequency=1090e6, noise_figure_db=5.0,
+                 terrain=None, fading=None, spectrum=None, corruption_model='threshold', crn=None,
+                 sampler=None):
+        """
+        :param terrain: Optional TerrainModel; its obstruction loss is added to the
+                        free-space path loss of every link.
+        :param fading: Optional FadingModel; one fading gain per transmission is added
+                       to the received power of the drone-GCS link.
+        :param spectrum: Optional SpectrumGrid. When set and transmit() is given a jammer
+                         and the simulated time, the interference is read from the grid in
+                         the channel's own band instead of taken from the jammer regardless
+                         of frequency. Without a jammer the grid is not consulted.
+        :param corruption_model: 'threshold' corrupts every frame below 0 dB SNR plus a flat
+                                 error_rate; 'ber' draws corruption from the PPM frame error
+                                 rate at the frame's SNR; any object with a vectorised
+                                 frame_error_rate(snr_db) (e.g. a baseband CalibrationTable)
+                                 is used the same way.
+        :param crn: Optional CommonRandomNumbers. When set and transmit() is given the
+                    simulated time, the corruption draws of each message come from a
+                    stream keyed by (drone id, time), so runs with the same seed share
+                    them whatever the jammer and spoofer consume.
+        :param sampler: Optional ImportanceSampler; corruption decisions are then drawn
+                        biased toward failure and their likelihood ratios recorded.
+        """
         self.error_rate = np.float64(error_rate)
         self.frequency = np.float64(frequency)
         self.noise_figure_db = np.float64(noise_figure_db)
         self.light_speed = np.float64(3e8)  # Speed of light in m/s
+        self.terrain = terrain
+        self.fading = fading
+        self.spectrum = spectrum
+        self.corruption_model = corruption_model
+        self.crn = crn
+        self.sampler = sampler
+        if corruption_model == 'ber':
+            self.frame_error_model = default_table()
+        elif corruption_model == 'threshold':
+            self.frame_error_model = None
+        else:
+            self.frame_error_model = corruption_model
 
     def haversine_distance(self, lat1, lon1, lat2, lon2):
         R = np.float64(6371000)  # Earth radius in meters
@@ -34,8 +72,36 @@ class ADSBChannel:
         noise_power_dbm = 10 * np.log10(noise_power_watts) + 30
         return noise_power_dbm
 
-    def transmit(self, message, gcs_position, tx_power_dbm=50, bandwidth_hz=1e6, jammer=None, spoofer=None):
+    def link_gains_db(self, drone_ids, positions, gcs_position):
+        """
+        Fading gain minus terrain obstruction loss of many drone-GCS links at once,
+        for transmit's link_gain_db. Advances each link's fading by one sample.
+        :param drone_ids: Unique ids of the transmitting drones.
+        :param positions: (N, 3) drone positions (lat, lon, alt).
+        :return: (N,) gains in dB; zeros without terrain and fading models.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        gains = np.zeros(positions.shape[0])
+        if not positions.shape[0]:
+            return gains
+        if self.terrain is not None:
+            gains -= self.terrain.link_losses(positions[:, 0], positions[:, 1], positions[:, 2],
+                                              gcs_position[0], gcs_position[1])
+        if self.fading is not None:
+            gcs_position = tuple(gcs_position)
+            gains += self.fading.gains_db([(drone_id, gcs_position) for drone_id in drone_ids])
+        return gains
+
+    def transmit(self, message, gcs_position, tx_power_dbm=50, bandwidth_hz=1e6, jammer=None, spoofer=None,
+                 sim_time=None, link_gain_db=None):
+        """
+        :param link_gain_db: This link's entry of link_gains_db, computed for a whole tick;
+                             terrain and fading are evaluated for this message alone when omitted.
+        """
         drone_lat, drone_lon = message["latitude"], message["longitude"]
+        rng = random
+        if self.crn is not None and sim_time is not None:
+            rng = self.crn.generator(message["drone_id"], sim_time)
         gcs_lat, gcs_lon = gcs_position
 
         distance = self.haversine_distance(drone_lat, drone_lon, gcs_lat, gcs_lon)
@@ -46,15 +112,25 @@ class ADSBChannel:
         time.sleep(delay_seconds)
 
         path_loss_db = self.free_space_path_loss(distance)
+        if self.terrain is not None and link_gain_db is None:
+            path_loss_db += self.terrain.link_loss(drone_lat, drone_lon, message["altitude"], gcs_lat, gcs_lon)
         noise_power_dbm = self.thermal_noise_power(bandwidth_hz)
 
         rx_power_dbm = tx_power_dbm - path_loss_db
+        if link_gain_db is not None:
+            rx_power_dbm += link_gain_db
+        if self.fading is not None and link_gain_db is None:
+            rx_power_dbm += self.fading.gain_db((message["drone_id"], tuple(gcs_position)))
 
         # Initialize SNR with the basic calculation
         snr_db = rx_power_dbm - (noise_power_dbm + self.noise_figure_db)
 
-        # Apply jamming effects if a jammer is present
-        if jammer:
+        # Apply jamming effects: from the spectrum grid when available, else from the jammer
+        if jammer and self.spectrum is not None and sim_time is not None:
+            interference_mw = float(self.spectrum.interference_mw(sim_time, self.frequency, bandwidth_hz))
+            effective_noise_power_dbm = 10 * np.log10(10**(noise_power_dbm / 10) + interference_mw)
+            snr_db = rx_power_dbm - (effective_noise_power_dbm + self.noise_figure_db)
+        elif jammer:
             jamming_signal_power_dbm = jammer.jamming_signal_power()
             # Combine the noise power with the jamming signal power
             effective_noise_power_dbm = 10 * np.log10(
@@ -73,16 +149,50 @@ class ADSBChannel:
                 )
                 snr_db = rx_power_dbm - (effective_noise_power_dbm + self.noise_figure_db)
 
-        corrupted = False
-        if snr_db < 0 or random.random() < self.error_rate:
-            message = self.corrupt_message(message)
-            corrupted = True
+        if self.frame_error_model is not None:
+            corrupted = decide(self.frame_error_model.frame_error_rate(snr_db), self.sampler, rng)
+        else:
+            corrupted = snr_db < 0 or decide(self.error_rate, self.sampler, rng)
+        if corrupted:
+            message = self.corrupt_message(message, rng)
 
         return message, delay_ns, corrupted, snr_db
 
-    def corrupt_message(self, message):
+    def frame_error_probability(self, snr_db):
+        """Probability that frames at the given SNRs are corrupted, for whole batches."""
+        snr_db = np.asarray(snr_db, dtype=np.float64)
+        if self.frame_error_model is None:
+            return np.where(snr_db < 0, 1.0, self.error_rate)
+        return self.frame_error_model.frame_error_rate(snr_db)
+
+    def corrupted_mask(self, snr_db, rng=None):
+        """Draw the corruption decision of a batch of frames from their SNRs."""
+        rng = rng or np.random.default_rng()
+        probability = self.frame_error_probability(snr_db)
+        return rng.random(probability.shape) < probability
+
+    def corrupt_message(self, message, rng=random):
         corrupted_message = message.copy()
-        corrupted_message['latitude'] += random.uniform(-0.01, 0.01)
-        corrupted_message['longitude'] += random.uniform(-0.01, 0.01)
-        corrupted_message['altitude'] += random.uniform(-10, 10)
+        corrupted_message['latitude'] += rng.uniform(-0.01, 0.01)
+        corrupted_message['longitude'] += rng.uniform(-0.01, 0.01)
+        corrupted_message['altitude'] += rng.uniform(-10, 10)
         return corrupted_message
+
+    def corrupt_frames(self, frames, corrupted, bit_error_probability=None, rng=None):
+        """
+        Bit-level corruption of encoded DF17 frames.
+        :param frames: (N, 14) uint8 array of frames.
+        :param corrupted: Boolean mask of frames the channel decided to corrupt.
+        :param bit_error_probability: Optional per-bit error probability applied to every frame
+                                      in addition to the forced corruption.
+        :param rng: Optional numpy Generator.
+        :return: Copy of the frames with bits flipped.
+        """
+        rng = rng or np.random.default_rng()
+        corrupted = np.asarray(corrupted, dtype=bool)
+        # At least one flipped bit per corrupted frame, occasionally a short burst
+        counts = np.where(corrupted, rng.integers(1, 4, size=corrupted.shape[0]), 0)
+        frames = flip_bit_count(frames, counts, rng)
+        if bit_error_probability:
+            frames = flip_random_bits(frames, bit_error_probability, rng)
+        return frames
@@ -0,0 +1,315 @@
+"""
+Block-streaming complex-baseband simulation of 1090ES reception.
+
+DF17 frames are modulated as pulse-position bursts at 2 Msps (an 8 us preamble
+of four 0.5 us pulses, then 112 one-microsecond bit cells), mixed with
+jammer waveforms and unit-power complex noise, low-pass filtered with an
+overlap-save FFT filter and demodulated by a preamble detector. Everything runs
+in fixed-size blocks, so arbitrarily long signals are processed with bounded
+memory. Detection rates measured here calibrate the fast probabilistic models
+(see calibrate and CalibrationTable).
+
+Powers are relative to the noise: a burst's SNR is its pulse power over the
+noise power, and a jammer's JNR its power over the noise power.
+"""
+import numpy as np
+from adsb_frame import FRAME_BITS, FRAME_BYTES, check_crc, encode_airborne_position
+from cw_jammer import ContinuousWaveJammer
+
+SAMPLE_RATE = 2e6
+CENTER_FREQUENCY = 1090e6
+PREAMBLE = np.array([1, 0, 1, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0], dtype=np.float64)
+PREAMBLE_HIGH = np.flatnonzero(PREAMBLE)
+PREAMBLE_LOW = np.flatnonzero(PREAMBLE == 0)
+BURST_SAMPLES = PREAMBLE.shape[0] + 2 * FRAME_BITS
+
+
+def modulate(frames):
+    """
+    Pulse amplitudes of 1090ES bursts at 2 Msps.
+    :param frames: (N, 14) uint8 array of frames.
+    :return: (N, BURST_SAMPLES) array of 0/1 amplitudes.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    bits = np.unpackbits(frames, axis=1).astype(np.float64)
+    # A one is a pulse in the first half of its bit cell, a zero in the second half
+    data = np.stack((bits, 1 - bits), axis=2).reshape(frames.shape[0], 2 * FRAME_BITS)
+    return np.concatenate((np.broadcast_to(PREAMBLE, (frames.shape[0], PREAMBLE.shape[0])), data), axis=1)
+
+
+def lowpass_taps(cutoff_hz, num_taps=31, sample_rate=SAMPLE_RATE):
+    """Hamming-windowed sinc low-pass FIR taps with unit DC gain."""
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = np.sinc(2 * cutoff_hz / sample_rate * n) * np.hamming(num_taps)
+    return taps / taps.sum()
+
+
+class OverlapSaveFilter:
+    """
+    Streaming FIR filter evaluated with FFTs by overlap-save. Output sample k
+    corresponds to input sample k - delay.
+    """
+    def __init__(self, taps, fft_size=4096):
+        self.taps = np.asarray(taps, dtype=np.complex128)
+        self.fft_size = max(fft_size, 2 * self.taps.shape[0])
+        self.step = self.fft_size - self.taps.shape[0] + 1
+        self.response = np.fft.fft(self.taps, self.fft_size)
+        self.history = np.zeros(self.taps.shape[0] - 1, dtype=np.complex128)
+        self.delay = (self.taps.shape[0] - 1) // 2
+
+    def process(self, block):
+        """Filter the next block of samples; returns as many samples as it was given."""
+        x = np.concatenate((self.history, block))
+        out = np.empty(block.shape[0], dtype=np.complex128)
+        overlap = self.history.shape[0]
+        for start in range(0, block.shape[0], self.step):
+            end = min(start + self.step, block.shape[0])
+            segment = np.fft.ifft(np.fft.fft(x[start:end + overlap], self.fft_size) * self.response)
+            out[start:end] = segment[overlap:overlap + end - start]
+        if overlap:
+            self.history = x[-overlap:]
+        return out
+
+
+class ToneWaveform:
+    """Continuous-wave carrier at a fixed offset from the receiver's center frequency."""
+    def __init__(self, jnr_db, offset_hz=0.0, sample_rate=SAMPLE_RATE, phase=0.0):
+        self.amplitude = 10 ** (jnr_db / 20)
+        self.offset_hz = offset_hz
+        self.sample_rate = sample_rate
+        self.phase = phase
+
+    def samples(self, start, count):
+        t = (start + np.arange(count)) / self.sample_rate
+        return self.amplitude * np.exp(1j * (2 * np.pi * self.offset_hz * t + self.phase))
+
+
+class HoppingWaveform:
+    """
+    Carrier hopping between absolute frequencies on a schedule; hops outside
+    the receiver's band contribute nothing.
+    """
+    def __init__(self, jnr_db, hop_times, frequencies, center_frequency=CENTER_FREQUENCY, sample_rate=SAMPLE_RATE):
+        self.amplitude = 10 ** (jnr_db / 20)
+        self.hop_samples = np.asarray(hop_times) * sample_rate
+        self.offsets = np.asarray(frequencies) - center_frequency
+        self.sample_rate = sample_rate
+
+    def samples(self, start, count):
+        n = start + np.arange(count)
+        hop = np.maximum(np.searchsorted(self.hop_samples, n, side='right') - 1, 0)
+        offset = self.offsets[hop]
+        in_band = np.abs(offset) < self.sample_rate / 2
+        return np.where(in_band, self.amplitude * np.exp(2j * np.pi * offset * n / self.sample_rate), 0)
+
+
+class NoiseWaveform:
+    """Complex Gaussian noise jamming, optionally gated by emission windows (pulses)."""
+    def __init__(self, jnr_db, starts=None, ends=None, sample_rate=SAMPLE_RATE, rng=None):
+        self.sigma = 10 ** (jnr_db / 20) / np.sqrt(2)
+        self.windows = None if starts is None else (np.asarray(starts) * sample_rate,
+                                                    np.asarray(ends) * sample_rate)
+        self.rng = rng or np.random.default_rng()
+
+    def samples(self, start, count):
+        noise = self.sigma * (self.rng.standard_normal(count) + 1j * self.rng.standard_normal(count))
+        if self.windows is None:
+            return noise
+        n = start + np.arange(count)
+        window = np.searchsorted(self.windows[0], n, side='right') - 1
+        active = (window >= 0) & (n < self.windows[1][np.maximum(window, 0)])
+        return np.where(active, noise, 0)
+
+
+def waveform_for(jammer, jnr_db, duration, center_frequency=CENTER_FREQUENCY, sample_rate=SAMPLE_RATE,
+                 rng=None, schedule_rng=None):
+    """
+    Baseband waveform matching a jammer class: hopping carrier for jammers with a
+    hop_schedule, gated noise for jammers with a pulse_schedule, a carrier for
+    ContinuousWaveJammer and continuous noise otherwise.
+    :param jnr_db: Jammer power over the receiver noise.
+    :param duration: Seconds of schedule to precompute.
+    :param schedule_rng: random.Random-like source passed to the schedule methods.
+    """
+    kwargs = {'rng': schedule_rng} if schedule_rng is not None else {}
+    if hasattr(jammer, 'hop_schedule'):
+        hop_times, frequencies = jammer.hop_schedule(duration, **kwargs)
+        return HoppingWaveform(jnr_db, hop_times, frequencies, center_frequency, sample_rate)
+    if hasattr(jammer, 'pulse_schedule'):
+        starts, ends = jammer.pulse_schedule(duration, **kwargs)
+        return NoiseWaveform(jnr_db, starts, ends, sample_rate, rng)
+    if isinstance(jammer, ContinuousWaveJammer):
+        return ToneWaveform(jnr_db, 0.0, sample_rate)
+    return NoiseWaveform(jnr_db, sample_rate=sample_rate, rng=rng)
+
+
+class BasebandScene:
+    """
+    Bursts and jammer waveforms mixed with unit-power noise, produced block by block.
+    """
+    def __init__(self, waveforms=(), sample_rate=SAMPLE_RATE, seed=None):
+        self.waveforms = list(waveforms)
+        self.sample_rate = sample_rate
+        self.rng = np.random.default_rng(seed)
+        self.burst_starts = np.zeros(0, dtype=np.int64)
+        self.burst_frames = np.zeros((0, FRAME_BYTES), dtype=np.uint8)
+        self.burst_amplitudes = np.zeros(0, dtype=np.complex128)
+
+    def add_bursts(self, times, frames, snr_db):
+        """
+        Schedule frames for transmission.
+        :param times: Burst start times in seconds.
+        :param frames: (N, 14) uint8 frames.
+        :param snr_db: Pulse SNR of each burst (scalar or array).
+        """
+        starts = np.round(np.asarray(times) * self.sample_rate).astype(np.int64)
+        phase = self.rng.uniform(0, 2 * np.pi, starts.shape[0])
+        amplitudes = 10 ** (np.broadcast_to(snr_db, starts.shape) / 20) * np.exp(1j * phase)
+        starts = np.concatenate((self.burst_starts, starts))
+        order = np.argsort(starts, kind='stable')
+        self.burst_starts = starts[order]
+        self.burst_frames = np.concatenate((self.burst_frames, np.asarray(frames, dtype=np.uint8)))[order]
+        self.burst_amplitudes = np.concatenate((self.burst_amplitudes, amplitudes))[order]
+
+    def blocks(self, num_samples, block_size=1 << 16):
+        """Yield (start sample, complex block) covering num_samples samples."""
+        for start in range(0, num_samples, block_size):
+            count = min(block_size, num_samples - start)
+            block = np.sqrt(0.5) * (self.rng.standard_normal(count) + 1j * self.rng.standard_normal(count))
+            for waveform in self.waveforms:
+                block += waveform.samples(start, count)
+            # Bursts overlapping [start, start + count)
+            lo = np.searchsorted(self.burst_starts, start - BURST_SAMPLES, side='right')
+            hi = np.searchsorted(self.burst_starts, start + count, side='left')
+            if hi > lo:
+                pulses = modulate(self.burst_frames[lo:hi]) * self.burst_amplitudes[lo:hi, None]
+                index = self.burst_starts[lo:hi, None] + np.arange(BURST_SAMPLES)[None, :] - start
+                inside = (index >= 0) & (index < count)
+                np.add.at(block, index[inside], pulses[inside])
+            yield start, block
+
+
+class PreambleDetector:
+    """
+    Streaming 1090ES demodulator: low-pass filter, magnitude, preamble
+    correlation, bit slicing and CRC check.
+    """
+    def __init__(self, sample_rate=SAMPLE_RATE, cutoff_hz=950e3, num_taps=7, threshold=2.0):
+        """
+        :param cutoff_hz: Low-pass cutoff of the front-end filter. Pulses are one sample
+                          wide at 2 Msps, so a sharper filter smears them into the
+                          neighbouring half-bit and costs several dB.
+        :param threshold: Required ratio of mean preamble pulse level to mean quiet level.
+        """
+        self.filter = OverlapSaveFilter(lowpass_taps(cutoff_hz, num_taps, sample_rate))
+        self.threshold = threshold
+        self.tail = np.zeros(0)
+        self.tail_start = 0  # Absolute (filtered) sample index of tail[0]
+        self.last_detection = -BURST_SAMPLES
+        self.candidates = 0
+
+    def process(self, block):
+        """
+        Demodulate the next block.
+        :return: (sample indices, frames) of bursts passing CRC whose candidate start
+                 falls in the data seen so far; indices refer to the unfiltered input.
+        """
+        magnitude = np.abs(self.filter.process(block))
+        m = np.concatenate((self.tail, magnitude))
+        base = self.tail_start
+        usable = m.shape[0] - BURST_SAMPLES + 1
+        found_index, found_frames = np.zeros(0, dtype=np.int64), np.zeros((0, FRAME_BYTES), dtype=np.uint8)
+        if usable > 0:
+            high = sum(m[k:k + usable] for k in PREAMBLE_HIGH) / PREAMBLE_HIGH.shape[0]
+            low = sum(m[k:k + usable] for k in PREAMBLE_LOW) / PREAMBLE_LOW.shape[0]
+            candidates = np.flatnonzero(high > self.threshold * low)
+            self.candidates += candidates.shape[0]
+            if candidates.size:
+                cells = candidates[:, None] + PREAMBLE.shape[0] + 2 * np.arange(FRAME_BITS)[None, :]
+                bits = (m[cells] > m[cells + 1]).astype(np.uint8)
+                frames = np.packbits(bits, axis=1)
+                ok = check_crc(frames) & ((frames[:, 0] >> 3) == 17)
+                found_index, found_frames = self._suppress(candidates[ok] + base, frames[ok])
+            keep = m[usable:]
+            self.tail_start = base + usable
+        else:
+            keep = m
+        self.tail = keep
+        return found_index - self.filter.delay, found_frames
+
+    def _suppress(self, index, frames):
+        # Neighbouring offsets of one burst can all pass CRC; keep the first of each
+        accepted = []
+        for i, start in enumerate(index.tolist()):
+            if start - self.last_detection >= BURST_SAMPLES:
+                accepted.append(i)
+                self.last_detection = start
+        return index[accepted], frames[accepted]
+
+
+def detect_stream(scene, num_samples, block_size=1 << 16, detector=None):
+    """
+    Run a scene through a detector.
+    :return: (sample indices, frames) of every detected burst.
+    """
+    detector = detector or PreambleDetector(scene.sample_rate)
+    indices, frames = [], []
+    for _, block in scene.blocks(num_samples, block_size):
+        index, found = detector.process(block)
+        indices.append(index)
+        frames.append(found)
+    return np.concatenate(indices), np.concatenate(frames)
+
+
+def detection_rate(snr_db, jammer=None, jnr_db=30.0, bursts=200, spacing=400, seed=None,
+                   block_size=1 << 16):
+    """
+    Fraction of bursts demodulated error-free at a given SNR, optionally under jamming.
+    :param spacing: Samples between burst starts.
+    """
+    rng = np.random.default_rng(seed)
+    frames = encode_airborne_position(rng.integers(0, 1 << 24, bursts), rng.uniform(-80, 80, bursts),
+                                      rng.uniform(-180, 180, bursts), rng.uniform(0, 3000, bursts),
+                                      np.arange(bursts) & 1)
+    num_samples = (bursts + 1) * spacing
+    waveforms = []
+    if jammer is not None:
+        waveforms.append(waveform_for(jammer, jnr_db, num_samples / SAMPLE_RATE, rng=rng))
+    scene = BasebandScene(waveforms, seed=int(rng.integers(1 << 31)))
+    starts = spacing // 2 + spacing * np.arange(bursts)
+    scene.add_bursts(starts / SAMPLE_RATE, frames, snr_db)
+
+    index, found = detect_stream(scene, num_samples, block_size)
+    slot = np.round((index - spacing // 2) / spacing).astype(np.int64)
+    valid = (slot >= 0) & (slot < bursts) & (np.abs(index - starts[np.clip(slot, 0, bursts - 1)]) <= 1)
+    correct = np.zeros(bursts, dtype=bool)
+    correct[slot[valid]] = (found[valid] == frames[slot[valid]]).all(axis=1)
+    return float(correct.mean())
+
+
+class CalibrationTable:
+    """Detection rate against SNR measured at baseband, for the fast channel models."""
+    def __init__(self, snr_db, detection_rate):
+        self.snr_db = np.asarray(snr_db, dtype=np.float64)
+        self.detection_rate = np.asarray(detection_rate, dtype=np.float64)
+
+    def frame_error_rate(self, snr_db):
+        """Interpolated probability that a frame at this SNR is lost or corrupted."""
+        return 1 - np.interp(snr_db, self.snr_db, self.detection_rate)
+
+    def jamming_probability(self, clean):
+        """
+        Loss attributable to a jammer, as a value for its jamming_probability:
+        1 - detection with the jammer / detection without it, averaged over the table.
+        :param clean: CalibrationTable measured without the jammer on the same SNRs.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loss = 1 - self.detection_rate / clean.detection_rate
+        return float(np.clip(np.nanmean(loss), 0, 1))
+
+
+def calibrate(snr_values, jammer=None, jnr_db=30.0, bursts=200, seed=None):
+    """Measure detection_rate at each SNR and return a CalibrationTable."""
+    rates = [detection_rate(snr, jammer, jnr_db, bursts, seed=None if seed is None else seed + i)
+             for i, snr in enumerate(snr_values)]
+    return CalibrationTable(snr_values, rates)
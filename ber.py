@@ -0,0 +1,59 @@
+"""
+Frame error probability of 1090ES PPM frames as a function of SNR.
+
+The bit error rate of binary PPM is 0.5 * exp(-snr / 2) for the usual
+non-coherent (energy comparison) receiver and 0.5 * erfc(sqrt(snr / 2)) for a
+coherent one; a frame of n bits survives with probability (1 - Pb) ** n. Both
+curves are tabulated once on a fine SNR grid and looked up by index, so
+whole batches are evaluated without any per-message special functions.
+"""
+import math
+import numpy as np
+from adsb_frame import FRAME_BITS
+
+
+class BERTable:
+    """
+    Precomputed bit and frame error rates on a uniform SNR grid (dB).
+    """
+    def __init__(self, frame_bits=FRAME_BITS, snr_min=-20.0, snr_max=40.0, step=0.01, detection='noncoherent'):
+        """
+        :param frame_bits: Bits per frame (112 for DF17).
+        :param snr_min: Lowest tabulated SNR; lower values use it.
+        :param snr_max: Highest tabulated SNR; higher values use it.
+        :param step: Grid spacing in dB.
+        :param detection: 'noncoherent' or 'coherent' PPM demodulation.
+        """
+        self.snr_min = snr_min
+        self.step = step
+        self.frame_bits = frame_bits
+        snr = 10 ** (np.arange(snr_min, snr_max + step / 2, step) / 10)
+        if detection == 'noncoherent':
+            self.ber = 0.5 * np.exp(-snr / 2)
+        elif detection == 'coherent':
+            self.ber = 0.5 * np.array([math.erfc(math.sqrt(x / 2)) for x in snr.tolist()])
+        else:
+            raise ValueError(f"Unknown detection {detection!r}")
+        self.fer = -np.expm1(frame_bits * np.log1p(-self.ber))
+
+    def _index(self, snr_db):
+        index = np.rint((np.asarray(snr_db, dtype=np.float64) - self.snr_min) / self.step)
+        return np.clip(index, 0, self.ber.shape[0] - 1).astype(np.intp)
+
+    def bit_error_rate(self, snr_db):
+        return self.ber[self._index(snr_db)]
+
+    def frame_error_rate(self, snr_db):
+        """Probability that a frame at each SNR has at least one bit error."""
+        return self.fer[self._index(snr_db)]
+
+
+_default_table = None
+
+
+def default_table():
+    """Shared non-coherent BERTable for 112-bit frames."""
+    global _default_table
+    if _default_table is None:
+        _default_table = BERTable()
+    return _default_table
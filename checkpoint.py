@@ -0,0 +1,114 @@
+"""
+Snapshot and restore of full simulation state.
+
+File layout: an 8-byte magic, a little-endian header with the pickle length
+and the length of every out-of-band buffer, the pickle itself, then the raw
+buffers. Pickle protocol 5 hands NumPy arrays over as PickleBuffers, which
+are written straight from their memory and come back as views into a single
+read buffer, so large array-backed state is never copied on either side.
+"""
+import os
+import pickle
+import random
+import struct
+import time
+import numpy as np
+
+MAGIC = b'DRSIMCK1'
+
+# Attributes the jammers fill with time.time() values; they are shifted on restore
+# so that a resumed run sees the same schedule relative to "now".
+WALL_CLOCK_ATTRIBUTES = ('next_pulse_time', 'pulse_active_until', 'last_hop_time')
+
+
+def capture_rng_state():
+    """Return the state of the global `random` and NumPy legacy generators."""
+    return {'random': random.getstate(), 'numpy': np.random.get_state()}
+
+
+def restore_rng_state(rng_state):
+    random.setstate(rng_state['random'])
+    np.random.set_state(rng_state['numpy'])
+
+
+def save_checkpoint(path, state):
+    """
+    Write a checkpoint atomically.
+    :param path: Destination file.
+    :param state: Dict of simulation objects (drones, jammer, spoofer, gcs, metrics, ...).
+    """
+    payload = {'state': state, 'rng': capture_rng_state(), 'wall_time': time.time()}
+    buffers = []
+    body = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+
+    header = struct.pack('<QI', len(body), len(views))
+    header += struct.pack('<%dQ' % len(views), *(view.nbytes for view in views))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(header)
+        f.write(body)
+        for view in views:
+            f.write(view)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, restore_rng=True, rebase_clock=True):
+    """
+    Read a checkpoint written by save_checkpoint.
+    :param restore_rng: Reset the global random generators to their saved state.
+    :param rebase_clock: Shift jammer wall-clock schedules by the time spent offline.
+    :return: The state dict passed to save_checkpoint.
+    """
+    with open(path, 'rb') as f:
+        data = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(data)
+
+    view = memoryview(data)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("%s is not a simulation checkpoint" % path)
+    offset = len(MAGIC)
+    body_length, buffer_count = struct.unpack_from('<QI', view, offset)
+    offset += struct.calcsize('<QI')
+    buffer_lengths = struct.unpack_from('<%dQ' % buffer_count, view, offset)
+    offset += 8 * buffer_count
+
+    body = view[offset:offset + body_length]
+    offset += body_length
+    buffers = []
+    for length in buffer_lengths:
+        buffers.append(view[offset:offset + length])
+        offset += length
+
+    payload = pickle.loads(body, buffers=buffers)
+    if restore_rng:
+        restore_rng_state(payload['rng'])
+    if rebase_clock:
+        _rebase_wall_clock(payload['state'], time.time() - payload['wall_time'])
+    return payload['state']
+
+
+def _rebase_wall_clock(obj, delta, seen=None):
+    if isinstance(obj, (int, float, complex, str, bytes, np.ndarray, np.generic, type)) or obj is None:
+        return
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, dict):
+        values = obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        values = obj
+    else:
+        for name in WALL_CLOCK_ATTRIBUTES:
+            value = getattr(obj, name, None)
+            if isinstance(value, float):
+                setattr(obj, name, value + delta)
+        # Jammers may sit anywhere in the state, e.g. inside a channel or spectrum grid
+        values = vars(obj).values() if hasattr(obj, '__dict__') else ()
+    for value in values:
+        _rebase_wall_clock(value, delta, seen)
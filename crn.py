@@ -0,0 +1,36 @@
+"""
+Common random numbers for paired scenario comparisons.
+
+Random draws are derived from a keyed hash of (seed, key) instead of being
+consumed from one shared generator, so the draw for a given message does not
+depend on how many random numbers jammers, spoofers or other messages used
+before it. Two scenarios run with the same seed then see identical channel
+errors for every message, and their difference only reflects the attacks.
+"""
+import hashlib
+import random
+
+
+class CommonRandomNumbers:
+    """
+    Counter-based random numbers: every key maps to its own reproducible stream.
+    """
+    def __init__(self, seed=0):
+        """
+        :param seed: Replication seed; scenarios of the same replication share it.
+        """
+        self.seed = seed
+        self._secret = repr(seed).encode()[:64]
+
+    def key(self, *parts):
+        """Stable 64-bit integer for the given key (independent of PYTHONHASHSEED)."""
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=8, key=self._secret).digest()
+        return int.from_bytes(digest, 'little')
+
+    def uniform(self, *parts):
+        """Single uniform draw in [0, 1) for the given key."""
+        return (self.key(*parts) >> 11) * (1.0 / (1 << 53))
+
+    def generator(self, *parts):
+        """random.Random seeded for the given key, for several draws in a fixed order."""
+        return random.Random(self.key(*parts))
@@ -1,6 +1,7 @@
 import math
 import random
 import time
+from importance import decide
 
 class DirectionalJammer:
     """
@@ -14,7 +15,8 @@ class DirectionalJammer:
         beam_width_degrees=30,
         jamming_probability=0.3,
         noise_intensity=0.7,
-        jamming_power_dbm=-70
+        jamming_power_dbm=-70,
+        sampler=None
     ):
         """
         :param target_position: (lat, lon) coordinates of the jammer's main beam aim point.
@@ -22,12 +24,14 @@ class DirectionalJammer:
         :param jamming_probability: Base probability of blocking messages.
         :param noise_intensity: For partial message corruption vs total loss.
         :param jamming_power_dbm: Power level of the jamming signal (in dBm).
+        :param sampler: Optional ImportanceSampler biasing the jamming decisions toward loss.
         """
         self.target_position = target_position
         self.beam_width_degrees = beam_width_degrees
         self.jamming_probability = jamming_probability
         self.noise_intensity = noise_intensity
         self.jamming_power_dbm = jamming_power_dbm
+        self.sampler = sampler
 
     def jam_signal(self, message):
         """
@@ -38,9 +42,9 @@ class DirectionalJammer:
             return message, False
 
         adjusted_probability = self._calculate_beam_probability(lat, lon)
-        if random.random() < adjusted_probability:
+        if decide(adjusted_probability, self.sampler):
             print("[DirectionalJammer] Jamming active, target within beam range.")
-            if random.random() < self.noise_intensity:
+            if decide(self.noise_intensity, self.sampler):
                 print("[DirectionalJammer] Message completely lost!")
                 return None, True
             else:
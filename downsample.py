@@ -0,0 +1,89 @@
+import numpy as np
+
+
+def as_xy(series):
+    """Split a metric series (list of (x, y) tuples or an (N, 2) array) into float arrays."""
+    data = np.asarray(series, dtype=np.float64)
+    if data.size == 0:
+        return np.empty(0), np.empty(0)
+    return data[:, 0], data[:, 1]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the first and last points and, from each bucket in between, the point
+    forming the largest triangle with the previously kept point and the mean
+    of the next bucket, which preserves peaks and the overall visual shape.
+    :return: (x, y) arrays of at most n_out points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    bucket_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.maximum(counts, 1)
+    bucket_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.maximum(counts, 1)
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 1 < n_out - 2:
+            next_x, next_y = bucket_x[i + 1], bucket_y[i + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def minmax_downsample(x, y, n_buckets):
+    """
+    Keep the minimum and maximum point of each of n_buckets equal-count buckets.
+    Fully vectorised; exact envelope of the series at up to 2 * n_buckets points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if 2 * n_buckets >= n:
+        return x, y
+
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends]]))
+    return x[keep], y[keep]
+
+
+def box_stats(values, label=None, whisker=1.5, max_fliers=200):
+    """
+    Precompute box-plot statistics in the format accepted by matplotlib's Axes.bxp.
+    Outliers are thinned to at most max_fliers evenly spaced (by rank) values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return None
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    low, high = q1 - whisker * iqr, q3 + whisker * iqr
+    inside = values[(values >= low) & (values <= high)]
+    fliers = np.sort(values[(values < low) | (values > high)])
+    if fliers.size > max_fliers:
+        fliers = fliers[np.linspace(0, fliers.size - 1, max_fliers).astype(np.int64)]
+    return {
+        'label': label,
+        'med': med, 'q1': q1, 'q3': q3,
+        'whislo': inside.min() if inside.size else q1,
+        'whishi': inside.max() if inside.size else q3,
+        'mean': values.mean(),
+        'fliers': fliers,
+    }
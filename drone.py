@@ -1,7 +1,8 @@
 import math
-import matplotlib.pyplot as plt
 import time
 
+CLIMB_ENERGY_FACTOR = 0.05  # Ah per meter climbed or descended
+
 class Drone:
     def __init__(self, id, drone_type, acceleration_rate, climb_rate, speed, position_error,
                  altitude_error, battery_consume_rate, battery_capacity, route):
@@ -41,7 +42,7 @@ class Drone:
     def calculate_battery_usage(self, move_distance, move_altitude):
         """Compute battery consumption based on movement and altitude change."""
         base_usage = self.battery_consume_rate * (move_distance / self.speed)
-        climb_factor = abs(move_altitude) * 0.05  # Additional consumption for climbing
+        climb_factor = abs(move_altitude) * CLIMB_ENERGY_FACTOR  # Additional consumption for climbing
         return base_usage + climb_factor
 
     def calculate_navigation(self, delta_time):
@@ -104,6 +105,9 @@ def plot_drone_path(route, drone):
     """
     Simulates the drone's movement and plots its trajectory.
     """
+    # Imported here so the simulation classes load without the plotting stack
+    import matplotlib.pyplot as plt
+
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
@@ -0,0 +1,263 @@
+"""
+Streaming export of received messages to standard ADS-B formats.
+
+SBSExporter writes BaseStation (SBS-1) MSG,3 airborne-position lines, as
+served on port 30003; BeastExporter writes Mode-S Beast binary frames, as
+served on port 30005, with the DF17 frame encoded from the received position
+and one to three bits flipped in corrupted messages, as
+ADSBChannel.corrupt_frames does, so downstream decoders see them fail parity.
+Both queue records with add() and encode them a batch at a time into a
+BufferedSink, which writes to a file or a local TCP or Unix socket in large
+chunks, so exporting costs little per message.
+
+Records are written in time order. Each batch is sorted by time, and a
+producer that calls advance(t) once nothing earlier than t can arrive (as
+run_simulation does every tick) only has records before t encoded, so batches
+never overlap either. Without advance(), batches are encoded as they fill and
+only each batch is guaranteed to be in order.
+
+    with BeastExporter(BufferedSink('tcp://127.0.0.1:30005')) as exporter:
+        run_simulation(exporter=exporter)
+"""
+import datetime
+import socket
+import time
+import numpy as np
+from adsb_frame import FEET_PER_METER, FRAME_BYTES, encode_airborne_position, flip_bit_count, icao_address
+
+BEAST_ESCAPE = 0x1A
+BEAST_MODE_S_LONG = 0x33  # '3': 14-byte Mode-S frame
+BEAST_CLOCK_HZ = 12e6  # 12 MHz MLAT timestamp counter
+BEAST_RECORD_BYTES = 2 + 6 + 1 + FRAME_BYTES
+
+
+class BufferedSink:
+    """
+    Byte sink that collects writes and passes them on in chunks of at least buffer_size.
+    """
+    def __init__(self, target, buffer_size=1 << 20):
+        """
+        :param target: File path, 'tcp://host:port', 'unix:///path/to/socket', or an
+                       object with a write(bytes) method.
+        :param buffer_size: Bytes gathered before a write to the target.
+        """
+        self.buffer_size = buffer_size
+        self._chunks = []
+        self._pending = 0
+        self.bytes_written = 0
+        self._socket = None
+        self._file = None
+        if hasattr(target, 'write'):
+            self._write = target.write
+        elif target.startswith('tcp://'):
+            host, port = target[len('tcp://'):].rsplit(':', 1)
+            self._socket = socket.create_connection((host, int(port)))
+            self._write = self._socket.sendall
+        elif target.startswith('unix://'):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(target[len('unix://'):])
+            self._write = self._socket.sendall
+        else:
+            self._file = open(target, 'wb', buffering=0)
+            self._write = self._file.write
+
+    def write(self, data):
+        self._chunks.append(data)
+        self._pending += len(data)
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            data = b''.join(self._chunks)
+            self._chunks = []
+            self._pending = 0
+            self._write(data)
+            self.bytes_written += len(data)
+
+    def close(self):
+        self.flush()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _BatchExporter:
+    """Queues records and encodes them batch_size at a time."""
+    def __init__(self, sink, batch_size=8192, epoch=None):
+        """
+        :param sink: BufferedSink (or anything with write, flush and close).
+        :param batch_size: Records encoded together.
+        :param epoch: Wall-clock time (epoch seconds) of simulated time 0 for formats
+                      with dates; the exporter's creation time by default.
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.epoch = time.time() if epoch is None else epoch
+        self.records = 0
+        self._watermark = None  # Records before this time are final (see advance)
+        self._drone_ids = []
+        self._columns = ([], [], [], [], [], [])  # timestamp, lat, lon, alt, corrupted, snr_db
+
+    def add(self, message, timestamp, corrupted=False, snr_db=0.0):
+        """
+        Queue one received message.
+        :param message: Message dict (drone_id, latitude, longitude, altitude) as received.
+        :param timestamp: Simulated reception time in seconds.
+        """
+        self._drone_ids.append(message['drone_id'])
+        times, lats, lons, alts, flags, snrs = self._columns
+        times.append(timestamp)
+        lats.append(message['latitude'])
+        lons.append(message['longitude'])
+        alts.append(message['altitude'])
+        flags.append(corrupted)
+        snrs.append(snr_db)
+        if self._watermark is None and len(times) >= self.batch_size:
+            self._encode_pending()
+
+    def advance(self, timestamp):
+        """
+        Declare that no record earlier than timestamp will be added any more; queued
+        records before it are encoded once batch_size of them have gathered.
+        """
+        self._watermark = timestamp
+        if len(self._drone_ids) >= self.batch_size:
+            self._encode_pending(timestamp)
+
+    def _encode_pending(self, until=None):
+        """Encode the queued records before `until` (all by default) in time order."""
+        if not self._drone_ids:
+            return
+        columns = [np.asarray(column, dtype=np.float64) for column in self._columns]
+        order = np.argsort(columns[0], kind='stable')
+        if until is not None:
+            order = order[columns[0][order] < until]
+            if order.shape[0] == 0:
+                return
+        drone_ids = [self._drone_ids[index] for index in order.tolist()]
+        icao = np.fromiter((icao_address(drone_id) for drone_id in drone_ids), dtype=np.int64,
+                           count=len(drone_ids))
+        times, lats, lons, alts, flags, snrs = (column[order] for column in columns)
+        self.sink.write(self.encode(icao, times, lats, lons, alts, flags.astype(bool), snrs))
+        self.records += icao.shape[0]
+
+        rest = np.ones(len(self._drone_ids), dtype=bool)
+        rest[order] = False
+        self._drone_ids = [drone_id for drone_id, left in zip(self._drone_ids, rest.tolist()) if left]
+        self._columns = tuple(column[rest].tolist() for column in columns)
+
+    def flush(self):
+        self._encode_pending()
+        self.sink.flush()
+
+    def close(self):
+        self._encode_pending()
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SBSExporter(_BatchExporter):
+    """
+    BaseStation (SBS-1) MSG,3 lines. Corrupted messages are written with the
+    position as received unless include_corrupted is False.
+    """
+    def __init__(self, sink, batch_size=8192, epoch=None, include_corrupted=True):
+        super().__init__(sink, batch_size, epoch)
+        self.include_corrupted = include_corrupted
+        self._dates = {}  # whole second -> 'YYYY/MM/DD,HH:MM:SS'
+
+    def _date(self, second):
+        text = self._dates.get(second)
+        if text is None:
+            if len(self._dates) > 4096:
+                self._dates.clear()
+            text = self._dates[second] = datetime.datetime.fromtimestamp(second).strftime('%Y/%m/%d,%H:%M:%S')
+        return text
+
+    def encode(self, icao, timestamps, lat, lon, alt_m, corrupted, snr_db):
+        if not self.include_corrupted:
+            keep = ~corrupted
+            icao, timestamps, lat, lon, alt_m = icao[keep], timestamps[keep], lat[keep], lon[keep], alt_m[keep]
+        timestamps = timestamps + self.epoch
+        seconds = np.floor(timestamps).astype(np.int64)
+        millis = np.minimum(((timestamps - seconds) * 1000).astype(np.int64), 999)
+        altitude_ft = np.rint(alt_m * FEET_PER_METER).astype(np.int64)
+        lines = []
+        for address, second, ms, altitude, latitude, longitude in zip(
+                icao.tolist(), seconds.tolist(), millis.tolist(), altitude_ft.tolist(), lat.tolist(), lon.tolist()):
+            stamp = f"{self._date(second)}.{ms:03d}"
+            lines.append(f"MSG,3,1,1,{address:06X},1,{stamp},{stamp},,{altitude},,,"
+                         f"{latitude:.5f},{longitude:.5f},,,0,0,0,0\r\n")
+        return ''.join(lines).encode('ascii')
+
+
+class BeastExporter(_BatchExporter):
+    """
+    Mode-S Beast binary records: 0x1a, '3', 48-bit 12 MHz timestamp, signal
+    level and the 14-byte DF17 frame, with every 0x1a after the leading one doubled.
+    The timestamp counter runs in simulated time, so the epoch is not used.
+    """
+    def __init__(self, sink, batch_size=8192, epoch=None, full_scale_snr_db=60.0, seed=None):
+        """
+        :param full_scale_snr_db: SNR mapped to signal level 255; levels scale with amplitude.
+        :param seed: Seeds the bit flips of corrupted frames.
+        """
+        super().__init__(sink, batch_size, epoch)
+        self.full_scale_snr_db = full_scale_snr_db
+        self.rng = np.random.default_rng(seed)
+        self._odd = {}  # icao -> next CPR format flag
+
+    def _cpr_flags(self, icao):
+        odd = np.empty(icao.shape[0], dtype=np.int64)
+        for index, address in enumerate(icao.tolist()):
+            flag = self._odd.get(address, 0)
+            odd[index] = flag
+            self._odd[address] = flag ^ 1
+        return odd
+
+    def encode(self, icao, timestamps, lat, lon, alt_m, corrupted, snr_db):
+        frames = encode_airborne_position(icao, lat, lon, alt_m, self._cpr_flags(icao))
+        if corrupted.any():
+            counts = np.where(corrupted, self.rng.integers(1, 4, size=corrupted.shape[0]), 0)
+            frames = flip_bit_count(frames, counts, self.rng)
+        return beast_records(frames, timestamps, self.signal_level(snr_db))
+
+    def signal_level(self, snr_db):
+        amplitude = 10 ** ((np.asarray(snr_db, dtype=np.float64) - self.full_scale_snr_db) / 20)
+        return np.clip(np.rint(255 * amplitude), 0, 255).astype(np.uint8)
+
+
+def beast_records(frames, timestamps, signal_level):
+    """
+    Escaped Beast binary records of a batch of 14-byte frames.
+    :param timestamps: Reception times in seconds, sent as a 12 MHz counter.
+    :param signal_level: Signal level byte per frame.
+    :return: bytes.
+    """
+    count = frames.shape[0]
+    records = np.empty((count, BEAST_RECORD_BYTES), dtype=np.uint8)
+    records[:, 0] = BEAST_ESCAPE
+    records[:, 1] = BEAST_MODE_S_LONG
+    ticks = (np.asarray(timestamps, dtype=np.float64) * BEAST_CLOCK_HZ).astype(np.uint64) & np.uint64((1 << 48) - 1)
+    records[:, 2:8] = ticks.astype('>u8').view(np.uint8).reshape(count, 8)[:, 2:]
+    records[:, 8] = signal_level
+    records[:, 9:] = frames
+    # Escape: every 0x1a in the timestamp, level or frame is sent twice
+    repeats = np.where(records == BEAST_ESCAPE, 2, 1)
+    repeats[:, 0] = 1
+    return np.repeat(records.ravel(), repeats.ravel()).tobytes()
@@ -0,0 +1,113 @@
+"""
+Small-scale Rayleigh/Rician fading with Doppler-correlated gain sequences.
+
+Each link gets a sum-of-sinusoids process (Clarke's model): the diffuse part is
+the sum of num_sinusoids unit rays with random arrival angles and phases, the
+optional line-of-sight ray is weighted by the Rician K factor. Gains are
+generated in blocks for all links that need them at once and then consumed one
+sample per transmission, so a message costs a dictionary lookup and an index.
+"""
+import numpy as np
+
+
+class FadingModel:
+    """
+    Per-link fading gains in dB, pregenerated in blocks and consumed by index.
+    """
+    def __init__(self, k_factor=0.0, doppler_hz=None, speed=15.0, frequency=1090e6,
+                 sample_interval=1.0, num_sinusoids=16, block_size=256, initial_capacity=64, seed=None):
+        """
+        :param k_factor: Rician K factor (linear); 0 gives Rayleigh fading.
+        :param doppler_hz: Maximum Doppler shift; speed / wavelength if omitted.
+        :param speed: Relative speed in m/s used to derive the Doppler shift.
+        :param frequency: Carrier frequency in Hz.
+        :param sample_interval: Seconds between two consecutive samples of a link
+                                (the transmission interval).
+        :param num_sinusoids: Rays summed per link.
+        :param block_size: Samples generated per link per refill.
+        :param initial_capacity: Links allocated up front; grows by doubling.
+        :param seed: Seed of the generator drawing angles and phases.
+        """
+        self.k_factor = float(k_factor)
+        self.doppler_hz = doppler_hz if doppler_hz is not None else speed * frequency / 3e8
+        self.sample_interval = sample_interval
+        self.num_sinusoids = num_sinusoids
+        self.block_size = block_size
+        self.rng = np.random.default_rng(seed)
+
+        self.index = {}  # link key -> row
+        self.angles = np.zeros((initial_capacity, num_sinusoids))
+        self.phases = np.zeros((initial_capacity, num_sinusoids))
+        self.los_angle = np.zeros(initial_capacity)
+        self.los_phase = np.zeros(initial_capacity)
+        self.buffer = np.zeros((initial_capacity, block_size), dtype=np.float32)
+        self.cursor = np.zeros(initial_capacity, dtype=np.int64)  # Next sample number of each link
+        self.block_start = np.zeros(initial_capacity, dtype=np.int64)  # Sample number of buffer[:, 0]
+
+    def _grow(self, capacity):
+        for name in ('angles', 'phases', 'los_angle', 'los_phase', 'buffer', 'cursor', 'block_start'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _rows(self, keys):
+        rows = np.empty(len(keys), dtype=np.int64)
+        new_rows = []
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.index)
+                new_rows.append(row)
+            rows[i] = row
+        if new_rows:
+            if len(self.index) > self.angles.shape[0]:
+                self._grow(max(2 * self.angles.shape[0], len(self.index)))
+            new_rows = np.asarray(new_rows)
+            # One row of draws per link, so a link's gains do not depend on which
+            # other links were created in the same call
+            n = self.num_sinusoids
+            draws = self.rng.uniform(-np.pi, np.pi, size=(new_rows.size, 2 * n + 2))
+            self.angles[new_rows] = draws[:, :n]
+            self.phases[new_rows] = draws[:, n:2 * n]
+            self.los_angle[new_rows] = draws[:, -2]
+            self.los_phase[new_rows] = draws[:, -1]
+            self._refill(new_rows)
+        return rows
+
+    def _refill(self, rows):
+        """Generate the next block of samples of the given links."""
+        self.block_start[rows] = self.cursor[rows]
+        t = (self.block_start[rows, None] + np.arange(self.block_size)[None, :]) * self.sample_interval
+        w = 2 * np.pi * self.doppler_hz
+        arg = (w * t[:, :, None] * np.cos(self.angles[rows, None, :]) + self.phases[rows, None, :])
+        diffuse = (np.cos(arg).sum(axis=2) + 1j * np.sin(arg).sum(axis=2)) / np.sqrt(self.num_sinusoids)
+        k = self.k_factor
+        los = np.exp(1j * (w * t * np.cos(self.los_angle[rows, None]) + self.los_phase[rows, None]))
+        h = np.sqrt(k / (k + 1)) * los + np.sqrt(1 / (k + 1)) * diffuse
+        self.buffer[rows] = 10 * np.log10(np.maximum(np.abs(h) ** 2, 1e-12))
+
+    def gains_db(self, keys):
+        """
+        Next fading gain in dB of each link, advancing each by one sample.
+        Keys should be unique within a call.
+        """
+        rows = self._rows(keys)
+        exhausted = rows[self.cursor[rows] - self.block_start[rows] >= self.block_size]
+        if exhausted.size:
+            self._refill(exhausted)
+        gains = self.buffer[rows, self.cursor[rows] - self.block_start[rows]].astype(np.float64)
+        self.cursor[rows] += 1
+        return gains
+
+    def gain_db(self, key):
+        """Next fading gain in dB of one link."""
+        row = self.index.get(key)
+        if row is None:
+            row = self._rows([key])[0]
+        offset = self.cursor[row] - self.block_start[row]
+        if offset >= self.block_size:
+            self._refill(np.array([row]))
+            offset = 0
+        self.cursor[row] += 1
+        return float(self.buffer[row, offset])
@@ -1,18 +1,122 @@
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import time
+import numpy as np
+from adsb_frame import decode_airborne_position, icao_address
 
 class GCS:
-    def __init__(self, lat, lon, alt=0):
-        """Initialize GCS position."""
+    def __init__(self, lat, lon, alt=0, tracker=None, detector=None, history=None):
+        """
+        Initialize GCS position.
+        :param tracker: Optional KalmanTracker; when set, displayed positions are
+                        filtered estimates and implausible reports are gated out.
+        :param detector: Optional SpoofDetector run on every incoming report.
+        :param history: Optional TrackHistory recording every displayed position with its
+                        time, for trails, replays and velocity estimates.
+        """
         self.position = (lat, lon, alt)
         self.drone_positions = {}
+        self.tracker = tracker
+        self.detector = detector
+        self.history = history
+        self.icao_to_id = {}  # ICAO address -> drone id, filled by register_drones
+        self.frames_received = 0
+        self.frames_rejected = 0
 
-    def receive_update(self, drone_id, position):
-        """Receive updated position from the drone."""
-        self.drone_positions[drone_id] = position
+    def receive_update(self, drone_id, position, timestamp=None, snr_db=None):
+        """
+        Receive updated position from the drone.
+        :param timestamp: Report time; defaults to the current wall-clock time.
+        :param snr_db: Measured SNR, used by the spoof detector.
+        :return: False if the tracker gated the report out, True otherwise.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.detector is not None:
+            self.detector.check(drone_id, position, timestamp, snr_db)
+
+        if self.tracker is None:
+            self.drone_positions[drone_id] = position
+            if self.history is not None:
+                self.history.append(drone_id, timestamp, position)
+            return True
+
+        accepted = self.tracker.update([drone_id], [position], [timestamp])
+        self.drone_positions[drone_id] = self.tracker.position(drone_id)
+        if self.history is not None and accepted[0]:
+            self.history.append(drone_id, timestamp, self.drone_positions[drone_id])
+        return bool(accepted[0])
+
+    def receive_updates(self, drone_ids, positions, timestamps=None, snr_db=None):
+        """
+        Batch version of receive_update.
+        :param snr_db: Optional (N,) measured SNRs, used by the spoof detector.
+        :return: Boolean mask of accepted reports.
+        """
+        if timestamps is None:
+            timestamps = np.full(len(drone_ids), time.time())
+        if self.detector is not None:
+            snrs = [None] * len(drone_ids) if snr_db is None else np.asarray(snr_db, dtype=np.float64).tolist()
+            for drone_id, position, timestamp, snr in zip(drone_ids, positions, timestamps, snrs):
+                self.detector.check(drone_id, position, timestamp, snr)
+
+        if self.tracker is None:
+            for drone_id, position in zip(drone_ids, positions):
+                self.drone_positions[drone_id] = tuple(position)
+            if self.history is not None:
+                self.history.extend(drone_ids, timestamps, positions)
+            return np.ones(len(drone_ids), dtype=bool)
+
+        accepted = self.tracker.update(drone_ids, positions, timestamps)
+        updated = list(dict.fromkeys(drone_ids))
+        for drone_id, estimate in zip(updated, self.tracker.positions(updated).tolist()):
+            self.drone_positions[drone_id] = tuple(estimate)
+        if self.history is not None:
+            # One point per drone with an accepted report: its latest estimate
+            latest = {}
+            for drone_id, timestamp, ok in zip(drone_ids, np.asarray(timestamps).tolist(), accepted.tolist()):
+                if ok:
+                    latest[drone_id] = max(timestamp, latest.get(drone_id, timestamp))
+            self.history.extend(list(latest), list(latest.values()),
+                                np.array([self.drone_positions[drone_id] for drone_id in latest]).reshape(-1, 3))
+        return accepted
+
+    def register_drones(self, drone_ids):
+        """
+        Map the ICAO addresses that adsb_frame.icao_address gives these drone ids back
+        to the ids, so decoded frames update the same tracks as plain reports.
+        """
+        for drone_id in drone_ids:
+            self.icao_to_id[icao_address(drone_id)] = drone_id
+
+    def receive_frames(self, frames, timestamps=None, snr_db=None):
+        """
+        Decode a batch of DF17 airborne-position frames, discarding those failing CRC.
+        Addresses not registered with register_drones are reported under their hex ICAO.
+        :param frames: (N, 14) uint8 array of frames.
+        :param timestamps: Optional (N,) reception times, used by the tracker.
+        :param snr_db: Optional (N,) measured SNRs, used by the spoof detector.
+        :return: Boolean mask of accepted frames.
+        """
+        decoded = decode_airborne_position(frames, self.position[0], self.position[1])
+        accepted = decoded['crc_ok']
+        self.frames_received += accepted.shape[0]
+        self.frames_rejected += int((~accepted).sum())
+
+        drone_ids = [self.icao_to_id.get(icao, '%06X' % icao) for icao in decoded['icao'][accepted].tolist()]
+        positions = np.stack([decoded['latitude'][accepted],
+                              decoded['longitude'][accepted],
+                              decoded['altitude'][accepted]], axis=1)
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps)[accepted]
+        if snr_db is not None:
+            snr_db = np.asarray(snr_db)[accepted]
+        self.receive_updates(drone_ids, positions, timestamps, snr_db)
+        return accepted
 
     def plot_status(self, routes):
         """Plots the waypoints, drones, and GCS position."""
+        # Imported here so the GCS loads without the plotting stack
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
 
@@ -0,0 +1,179 @@
+"""
+Importance sampling of rare message losses.
+
+Channel corruption and jamming decisions are Bernoulli draws with small
+probabilities, so tail outcomes such as a burst of consecutive losses from one
+drone almost never occur in plain simulation. An ImportanceSampler draws those
+decisions from a proposal biased toward failure and keeps the likelihood ratio
+p / q (event) or (1 - p) / (1 - q) (no event) of every draw, per message and
+per run. Weighting outcomes by these ratios gives unbiased estimates of their
+probabilities under the original model.
+
+Run-level weights multiply over every decision of a run and degenerate on long
+runs with a strong bias, so min_probability should stay moderate for
+whole-run events; per-message loss rates only use each message's own ratio.
+"""
+import math
+import random
+
+
+class ImportanceSampler:
+    """
+    Biased Bernoulli decisions with likelihood-ratio bookkeeping.
+    """
+    def __init__(self, min_probability=0.1, max_probability=0.9):
+        """
+        :param min_probability: Failure probabilities below this are sampled at this value.
+        :param max_probability: Upper bound of the proposal probability.
+        """
+        self.min_probability = min_probability
+        self.max_probability = max_probability
+        self.message_log_weight = 0.0
+        self.run_log_weight = 0.0
+        self.decisions = 0
+
+    def proposal(self, p):
+        """Biased probability q used to sample an event of probability p."""
+        if p <= 0.0 or p >= 1.0:
+            return p
+        return max(p, min(self.min_probability, self.max_probability))
+
+    def decide(self, p, rng=random):
+        """
+        Draw an event of probability p from the proposal and record its likelihood ratio.
+        :param rng: Source of uniforms (random module, random.Random, ...).
+        :return: Whether the event (a failure) happens.
+        """
+        p = float(p)
+        q = self.proposal(p)
+        event = rng.random() < q
+        if q != p:
+            log_ratio = math.log(p / q) if event else math.log((1.0 - p) / (1.0 - q))
+            self.message_log_weight += log_ratio
+            self.run_log_weight += log_ratio
+        self.decisions += 1
+        return event
+
+    def start_message(self):
+        """Reset the per-message likelihood ratio before a new message."""
+        self.message_log_weight = 0.0
+
+    def reset(self):
+        """Start a new run."""
+        self.message_log_weight = 0.0
+        self.run_log_weight = 0.0
+        self.decisions = 0
+
+    @property
+    def message_weight(self):
+        return math.exp(self.message_log_weight)
+
+    @property
+    def run_weight(self):
+        return math.exp(self.run_log_weight)
+
+
+def decide(p, sampler=None, rng=random):
+    """Bernoulli decision of probability p, through the sampler when one is set."""
+    if sampler is not None:
+        return sampler.decide(p, rng)
+    return rng.random() < p
+
+
+def weighted_estimate(values, weights, confidence=0.95):
+    """
+    Importance-sampling estimate of E[value] under the original model.
+    :param values: Outcome of each independent sample (0/1 for probabilities).
+    :param weights: Likelihood ratio of each sample.
+    :return: Dict with 'mean', 'half_width' (Student-t CI), 'n' and the
+             'effective_sample_size' of the weights.
+    """
+    from replication import t_quantile  # replication imports the simulation, which imports this module
+
+    products = [value * weight for value, weight in zip(values, weights)]
+    n = len(products)
+    if n == 0:
+        return {'mean': float('nan'), 'half_width': float('inf'), 'n': 0, 'effective_sample_size': 0.0}
+    mean = sum(products) / n
+    half_width = float('inf')
+    if n > 1:
+        variance = sum((x - mean) ** 2 for x in products) / (n - 1)
+        half_width = t_quantile(0.5 + confidence / 2, n - 1) * math.sqrt(variance / n)
+    total = sum(weights)
+    squares = sum(weight * weight for weight in weights)
+    return {'mean': mean, 'half_width': half_width, 'n': n,
+            'effective_sample_size': total * total / squares if squares > 0 else 0.0}
+
+
+def longest_loss_burst(drone_ids, lost):
+    """Longest run of consecutive lost messages of any single drone."""
+    current, longest = {}, 0
+    for drone_id, was_lost in zip(drone_ids, lost):
+        current[drone_id] = current.get(drone_id, 0) + 1 if was_lost else 0
+        longest = max(longest, current[drone_id])
+    return longest
+
+
+def weighted_bursts(drone_ids, lost, message_weights, burst_length):
+    """
+    Number of loss bursts (at least burst_length consecutive losses of one drone)
+    in a run, each weighted by the likelihood ratios of only the messages that
+    decide it: the burst's own messages and the delivered one before it. Message
+    decisions are independent, so the sum is unbiased for the expected number of
+    bursts per run without the degeneracy of whole-run weights.
+    """
+    sequences = {}
+    for drone_id, was_lost, weight in zip(drone_ids, lost, message_weights):
+        sequences.setdefault(drone_id, []).append((was_lost, weight))
+    total = 0.0
+    for sequence in sequences.values():
+        for start in range(len(sequence) - burst_length + 1):
+            if start > 0 and sequence[start - 1][0]:
+                continue  # Not the first loss of the burst
+            window = sequence[max(start - 1, 0):start + burst_length]
+            if all(was_lost for was_lost, _ in sequence[start:start + burst_length]):
+                total += math.prod(weight for _, weight in window)
+    return total
+
+
+def estimate_losses(runs, burst_length=3, confidence=0.95):
+    """
+    Unbiased loss estimates from importance-sampled runs.
+    :param runs: 'importance' records of run_simulation(sampler=...) results.
+    :param burst_length: Consecutive losses from one drone that make a burst.
+    :return: Dict with the per-message 'loss_probability' (each message weighted by its
+             own likelihood ratio), the expected number of 'bursts_per_run' of at least
+             burst_length losses (see weighted_bursts), and the 'burst_probability' that
+             a run contains such a burst (weighted by the whole run's ratio; check its
+             effective_sample_size).
+    """
+    loss_rates, burst_counts, bursts, run_weights = [], [], [], []
+    for run in runs:
+        messages = len(run['lost'])
+        loss_rates.append(sum(w for w, was_lost in zip(run['message_weight'], run['lost']) if was_lost)
+                          / messages if messages else 0.0)
+        burst_counts.append(weighted_bursts(run['drone_id'], run['lost'], run['message_weight'], burst_length))
+        bursts.append(1.0 if longest_loss_burst(run['drone_id'], run['lost']) >= burst_length else 0.0)
+        run_weights.append(run['run_weight'])
+    unweighted = [1.0] * len(runs)
+    return {
+        'loss_probability': weighted_estimate(loss_rates, unweighted, confidence),
+        'bursts_per_run': weighted_estimate(burst_counts, unweighted, confidence),
+        'burst_probability': weighted_estimate(bursts, run_weights, confidence),
+    }
+
+
+def run_importance(runs=100, burst_length=3, min_probability=0.1, seed=0, runner=None, **params):
+    """
+    Importance-sampled replications of a scenario.
+    :param runs: Number of runs; run i uses seed + i and a fresh sampler.
+    :param params: Scenario arguments of the runner (routes, jamming, ...).
+    :return: estimate_losses() of the runs.
+    """
+    if runner is None:
+        from simulation import run_simulation as runner
+    records = []
+    for i in range(runs):
+        sampler = ImportanceSampler(min_probability=min_probability)
+        records.append(runner(seed=seed + i, sampler=sampler, **params)['importance'])
+    return estimate_losses(records, burst_length)
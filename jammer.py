@@ -1,20 +1,22 @@
 import random
 import time
+from importance import decide
 
 class Jammer:
     """
     This class simulates jamming by introducing errors, increasing delay, or blocking messages.
     """
-    def __init__(self, jamming_probability=0.3, noise_intensity=0.7, jamming_power_dbm=-70):
+    def __init__(self, jamming_probability=0.3, noise_intensity=0.7, jamming_power_dbm=-70, sampler=None):
         self.jamming_probability = jamming_probability
         self.noise_intensity = noise_intensity  # Higher value increases interference
         self.jamming_power_dbm = jamming_power_dbm  # Default jamming signal power in dBm
+        self.sampler = sampler  # Optional ImportanceSampler for the jamming decisions
 
     def jam_signal(self, message):
         """Introduce signal degradation or block messages entirely."""
-        if random.random() < self.jamming_probability:
+        if decide(self.jamming_probability, self.sampler):
             print("[Jammer] Jamming message:", message)
-            if random.random() < self.noise_intensity:
+            if decide(self.noise_intensity, self.sampler):
                 print("[Jammer] Message completely lost!")
                 return None, True  # Message is lost
             else:
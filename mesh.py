@@ -0,0 +1,245 @@
+"""
+Multi-hop relaying of drone reports toward the GCS.
+
+Drones within link_range of each other are neighbors if their link SNR clears
+min_snr_db. Candidate neighbors come from a uniform spatial grid, so a moving
+drone only looks at the 3x3 cells around it. Each link costs 10**(-snr/10), so
+a path's cost is dominated by its weakest links. Shortest paths to the GCS are
+kept as a tree that is repaired incrementally when edges change, instead of
+running Dijkstra from scratch every tick.
+"""
+import heapq
+import math
+import numpy as np
+from adsbchannel import ADSBChannel
+
+GCS_NODE = 0
+EARTH_RADIUS = 6371000
+
+
+class MeshNetwork:
+    """
+    Neighbor graph of drones and the GCS with incrementally maintained
+    least-cost paths to the GCS.
+    """
+    def __init__(self, gcs_position, channel=None, link_range=2000.0, min_snr_db=3.0,
+                 tx_power_dbm=50, bandwidth_hz=1e6, hop_cost=0.0, cost_tolerance=0.05,
+                 initial_capacity=1024):
+        """
+        :param gcs_position: (lat, lon) of the GCS; also the origin of the local grid.
+        :param channel: ADSBChannel giving frequency, noise and noise figure.
+        :param link_range: Maximum drone-to-drone link distance in meters; also the grid cell size.
+        :param min_snr_db: Links below this SNR are not usable.
+        :param hop_cost: Cost added per hop on top of the SNR cost.
+        :param cost_tolerance: Relative change below which an edge keeps its old cost, so
+                               slowly moving or hovering drones cause no path repairs.
+        """
+        self.gcs_position = gcs_position
+        self.channel = channel or ADSBChannel()
+        self.link_range = link_range
+        self.min_snr_db = min_snr_db
+        self.tx_power_dbm = tx_power_dbm
+        self.hop_cost = hop_cost
+        self.cost_tolerance = cost_tolerance
+        self._noise_dbm = (self.channel.thermal_noise_power(bandwidth_hz) + self.channel.noise_figure_db)
+        self._wavelength = float(self.channel.light_speed / self.channel.frequency)
+        self._cos_lat = math.cos(math.radians(gcs_position[0]))
+
+        self.index = {'GCS': GCS_NODE}  # drone id -> node
+        self.names = ['GCS']
+        self.xyz = np.zeros((initial_capacity, 3))  # Local east, north, up in meters
+        self.cell = [None]
+        self.grid = {}  # cell -> set of drone nodes
+        self.adjacency = [{}]  # node -> {neighbor: cost}
+        self.dist = [0.0]
+        self.parent = [None]
+        self.children = [set()]
+
+    def _local(self, position):
+        lat, lon, alt = position
+        return (math.radians(lon - self.gcs_position[1]) * EARTH_RADIUS * self._cos_lat,
+                math.radians(lat - self.gcs_position[0]) * EARTH_RADIUS, float(alt))
+
+    def link_snr_db(self, distance):
+        """SNR in dB of free-space links of the given lengths (meters)."""
+        distance = np.maximum(np.asarray(distance, dtype=np.float64), 1.0)
+        path_loss_db = 20 * np.log10(4 * np.pi * distance / self._wavelength)
+        return self.tx_power_dbm - path_loss_db - self._noise_dbm
+
+    def _cost(self, snr_db):
+        return 10 ** (-np.asarray(snr_db) / 10) + self.hop_cost
+
+    def _node(self, drone_id):
+        node = self.index.get(drone_id)
+        if node is None:
+            node = self.index[drone_id] = len(self.names)
+            self.names.append(drone_id)
+            if node == self.xyz.shape[0]:
+                self.xyz = np.concatenate((self.xyz, np.zeros_like(self.xyz)))
+            self.cell.append(None)
+            self.adjacency.append({})
+            self.dist.append(math.inf)
+            self.parent.append(None)
+            self.children.append(set())
+        return node
+
+    def _neighbor_costs(self, node):
+        cx, cy = self.cell[node]
+        candidates = [other for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                      for other in self.grid.get((cx + dx, cy + dy), ()) if other != node]
+        if not candidates:
+            return {}
+        distance = np.sqrt(((self.xyz[candidates] - self.xyz[node]) ** 2).sum(axis=1))
+        snr_db = self.link_snr_db(distance)
+        usable = (distance <= self.link_range) & (snr_db >= self.min_snr_db)
+        costs = self._cost(snr_db[usable]).tolist()
+        return dict(zip((other for other, ok in zip(candidates, usable.tolist()) if ok), costs))
+
+    def update(self, drone_ids, positions, gcs_snr_db=None):
+        """
+        Move drones and repair the graph and the paths to the GCS.
+        :param drone_ids: Drones whose positions changed (new ids are added).
+        :param positions: Their (lat, lon, alt).
+        :param gcs_snr_db: Optional SNR of each drone's direct link to the GCS, e.g. as
+                           computed by the channel with jamming; free-space SNR otherwise.
+        :return: Number of edges that changed.
+        """
+        nodes = [self._node(drone_id) for drone_id in drone_ids]
+        for node, position in zip(nodes, positions):
+            xyz = self._local(position)
+            cell = (math.floor(xyz[0] / self.link_range), math.floor(xyz[1] / self.link_range))
+            if cell != self.cell[node]:
+                if self.cell[node] is not None:
+                    self.grid[self.cell[node]].discard(node)
+                self.grid.setdefault(cell, set()).add(node)
+                self.cell[node] = cell
+            self.xyz[node] = xyz
+
+        if gcs_snr_db is None:
+            gcs_snr_db = self.link_snr_db(np.sqrt((self.xyz[nodes] ** 2).sum(axis=1)))
+        gcs_snr_db = np.asarray(gcs_snr_db, dtype=np.float64)
+        gcs_costs = np.where(gcs_snr_db >= self.min_snr_db, self._cost(gcs_snr_db), np.inf).tolist()
+
+        tolerance = self.cost_tolerance
+        changes = []  # (u, v, old cost, new cost); None for a missing edge
+        for node, gcs_cost in zip(nodes, gcs_costs):
+            new = self._neighbor_costs(node)
+            if gcs_cost != math.inf:
+                new[GCS_NODE] = gcs_cost
+            old = self.adjacency[node]
+            for other in old.keys() | new.keys():
+                old_cost, new_cost = old.get(other), new.get(other)
+                if (old_cost is None or new_cost is None
+                        or abs(new_cost - old_cost) > tolerance * old_cost):
+                    changes.append((node, other, old_cost, new_cost))
+                    self._set_edge(node, other, new_cost)
+        self._repair(changes)
+        return len(changes)
+
+    def remove(self, drone_ids):
+        """
+        Take drones out of the graph (landed, out of battery, ...), repairing the paths
+        that went through them. They rejoin on their next update().
+        :return: Number of edges removed.
+        """
+        changes = []
+        for drone_id in drone_ids:
+            node = self.index.get(drone_id)
+            if node is None or self.cell[node] is None:
+                continue
+            self.grid[self.cell[node]].discard(node)
+            self.cell[node] = None
+            for other, cost in list(self.adjacency[node].items()):
+                changes.append((node, other, cost, None))
+                self._set_edge(node, other, None)
+        self._repair(changes)
+        return len(changes)
+
+    def _set_edge(self, u, v, cost):
+        if cost is None:
+            self.adjacency[u].pop(v, None)
+            self.adjacency[v].pop(u, None)
+        else:
+            self.adjacency[u][v] = cost
+            self.adjacency[v][u] = cost
+
+    def _set_parent(self, node, parent):
+        if self.parent[node] is not None:
+            self.children[self.parent[node]].discard(node)
+        self.parent[node] = parent
+        if parent is not None:
+            self.children[parent].add(node)
+
+    def _repair(self, changes):
+        """Update the shortest-path tree after edge changes (dynamic Dijkstra)."""
+        dist, parent = self.dist, self.parent
+        # Worse or removed tree edges orphan the child's whole subtree
+        orphans = set()
+        for u, v, old_cost, new_cost in changes:
+            if new_cost is not None and old_cost is not None and new_cost <= old_cost:
+                continue
+            for child, other in ((u, v), (v, u)):
+                if parent[child] == other and child not in orphans:
+                    stack = [child]
+                    while stack:
+                        node = stack.pop()
+                        orphans.add(node)
+                        stack.extend(self.children[node])
+        for node in orphans:
+            dist[node] = math.inf
+            self._set_parent(node, None)
+
+        heap = []
+        for node in orphans:
+            best, best_parent = math.inf, None
+            for other, cost in self.adjacency[node].items():
+                if other not in orphans and dist[other] + cost < best:
+                    best, best_parent = dist[other] + cost, other
+            if best_parent is not None:
+                dist[node] = best
+                self._set_parent(node, best_parent)
+                heapq.heappush(heap, (best, node))
+        # Better or new edges may shorten paths through them
+        for u, v, old_cost, new_cost in changes:
+            if new_cost is None:
+                continue
+            for a, b in ((u, v), (v, u)):
+                if dist[a] + new_cost < dist[b]:
+                    dist[b] = dist[a] + new_cost
+                    self._set_parent(b, a)
+                    heapq.heappush(heap, (dist[b], b))
+
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for other, cost in self.adjacency[node].items():
+                if d + cost < dist[other]:
+                    dist[other] = d + cost
+                    self._set_parent(other, node)
+                    heapq.heappush(heap, (dist[other], other))
+
+    def path(self, drone_id):
+        """Drone ids from drone_id to the GCS along the least-cost path, or None if unreachable."""
+        node = self.index.get(drone_id)
+        if node is None or self.dist[node] == math.inf:
+            return None
+        hops = []
+        while node is not None:
+            hops.append(self.names[node])
+            node = self.parent[node]
+        return hops
+
+    def cost(self, drone_id):
+        node = self.index.get(drone_id)
+        return self.dist[node] if node is not None else math.inf
+
+    def relay(self, drone_id, position, direct_snr_db):
+        """
+        Update one drone and return the relay path used when its direct link is down:
+        the list of drones from drone_id to the GCS through at least one other drone,
+        or None if no such path exists.
+        """
+        self.update([drone_id], [position], [direct_snr_db])
+        hops = self.path(drone_id)
+        return hops if hops is not None and len(hops) > 2 else None
@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import matplotlib.pyplot as plt
+from downsample import as_xy, box_stats, lttb
+
+# Points kept per line; a 12-inch figure at 100 dpi cannot show more than this
+DEFAULT_MAX_POINTS = 2000
+
+
+def _finish(fig, output_path, show):
+    fig.savefig(output_path)
+    if show:
+        plt.show(block=False)
+    else:
+        plt.close(fig)
+
+
+def _line(series, max_points):
+    x, y = as_xy(series)
+    return lttb(x, y, max_points)
+
+
+def reduce_results(results, max_points=DEFAULT_MAX_POINTS):
+    """
+    Shrink raw per-message results to what the figures need: downsampled
+    line series and precomputed SNR box statistics. The reduced dict is small
+    enough to ship to worker processes and is accepted by every plot function.
+    """
+    reduced = {}
+    for scenario, data in results.items():
+        entry = {}
+        for key in ('packet_loss', 'latency', 'throughput'):
+            if data.get(key) is not None and len(data[key]):
+                x, y = _line(data[key], max_points)
+                entry[key] = list(zip(x.tolist(), y.tolist()))
+        if 'snr_stats' in data:
+            entry['snr_stats'] = data['snr_stats']
+        elif data.get('snr') is not None and len(data['snr']):
+            entry['snr_stats'] = box_stats(as_xy(data['snr'])[1], label=scenario)
+        reduced[scenario] = entry
+    return reduced
+
+
+def plot_snr_data(results, output_path='results/snr_box_plot.png', show=False):
+    """
+    Plots SNR data as box plots for each scenario.
+    Boxes are drawn from precomputed quantiles, never from the raw samples.
+
+    Parameters:
+        results (dict): Dictionary containing SNR data (or 'snr_stats') for each scenario.
+        output_path (str, optional): File path to save the plot image.
+        show (bool, optional): Also open a (non-blocking) window.
+    """
+    stats = []
+    for scenario, data in results.items():
+        entry = data.get('snr_stats')
+        if entry is None and data.get('snr') is not None and len(data['snr']):
+            entry = box_stats(as_xy(data['snr'])[1])
+        if entry is not None:
+            stats.append(dict(entry, label=scenario))
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    if stats:
+        ax.bxp(stats, showfliers=True)
+    ax.set_xlabel('Scenario')
+    ax.set_ylabel('SNR (dB)')
+    ax.set_title('SNR Distribution across Different Scenarios')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(True)
+    fig.tight_layout()
+    _finish(fig, output_path, show)
+
+
+def _plot_lines(results, key, xlabel, ylabel, title, output_path, show, max_points,
+                colors=None, figsize=(12, 6)):
+    fig, ax = plt.subplots(figsize=figsize)
+    for i, (scenario, data) in enumerate(results.items()):
+        if data.get(key) is not None and len(data[key]):
+            x, y = _line(data[key], max_points)
+            color = colors[i % len(colors)] if colors else None
+            ax.plot(x, y, label=scenario, color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+    _finish(fig, output_path, show)
+
+
+def plot_latency_data(results, output_path='results/latency_plot.png', show=False,
+                      max_points=DEFAULT_MAX_POINTS):
+    _plot_lines(results, 'latency', 'Total Messages Sent', 'Latency (ms)',
+                'Latency over Simulation Time for Different Scenarios',
+                output_path, show, max_points)
+
+
+def plot_throughput_data(results, output_path='results/throughput_plot.png', show=False,
+                         max_points=DEFAULT_MAX_POINTS):
+    _plot_lines(results, 'throughput', 'Simulated Time (s)', 'Throughput (messages/second)',
+                'Throughput over Simulation Time for Different Scenarios',
+                output_path, show, max_points)
+
+
+def plot_packet_loss_data(results, colors=None, output_path='results/packet_loss.png', show=False,
+                          max_points=DEFAULT_MAX_POINTS):
+    """
+    Plots packet loss over time for each scenario.
+
+    Parameters:
+        results (dict): Dictionary containing packet loss data for each scenario.
+        colors (list, optional): List of colors for each scenario plot. Defaults to None.
+        output_path (str, optional): File path to save the plot image. Defaults to 'results/packet_loss.png'.
+        show (bool, optional): Also open a (non-blocking) window.
+        max_points (int, optional): Points kept per series after LTTB downsampling.
+    """
+    if colors is None:
+        colors = ['blue', 'green', 'orange', 'red', 'purple']
+    _plot_lines(results, 'packet_loss', 'Total Messages Sent', 'Packet Loss (%)',
+                'Packet Loss over Simulation Time for Different Scenarios',
+                output_path, show, max_points, colors=colors, figsize=(12, 8))
+
+
+FIGURES = {
+    'packet_loss.png': plot_packet_loss_data,
+    'snr_box_plot.png': plot_snr_data,
+    'latency_plot.png': plot_latency_data,
+    'throughput_plot.png': plot_throughput_data,
+}
+
+
+def _render(name, reduced, output_dir):
+    matplotlib.use('Agg')
+    path = os.path.join(output_dir, name)
+    FIGURES[name](reduced, output_path=path)
+    return path
+
+
+def render_all(results, output_dir='results', workers=None, max_points=DEFAULT_MAX_POINTS,
+               per_scenario=False):
+    """
+    Write every figure to output_dir without opening windows.
+    Results are reduced once in this process, then figures render in parallel.
+    :param workers: Number of worker processes (1 renders in-process).
+    :param per_scenario: Also render each scenario's figures into its own subdirectory.
+    :return: List of written file paths.
+    """
+    reduced = reduce_results(results, max_points)
+    jobs = [(name, reduced, output_dir) for name in FIGURES]
+    if per_scenario:
+        for scenario, entry in reduced.items():
+            subdir = os.path.join(output_dir, ''.join(c if c.isalnum() else '_' for c in scenario))
+            jobs.extend((name, {scenario: entry}, subdir) for name in FIGURES)
+    for _, _, directory in jobs:
+        os.makedirs(directory, exist_ok=True)
+
+    if workers == 1:
+        return [_render(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(_render, *job) for job in jobs]
+        return [future.result() for future in futures]
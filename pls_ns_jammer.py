@@ -1,5 +1,7 @@
 import random
 import time
+import numpy as np
+from importance import decide
 
 class PulsedNoiseJammer:
     """
@@ -12,7 +14,8 @@ class PulsedNoiseJammer:
         noise_intensity=0.9,
         jamming_power_dbm=-60,
         pulse_interval_range=(1.0, 3.0),
-        pulse_duration=0.5
+        pulse_duration=0.5,
+        sampler=None
     ):
         """
         :param jamming_probability: Probability of blocking each message entirely.
@@ -20,10 +23,12 @@ class PulsedNoiseJammer:
         :param jamming_power_dbm: Power level of the jamming signal in dBm.
         :param pulse_interval_range: (min, max) seconds between pulses.
         :param pulse_duration: Duration in seconds of each noise pulse.
+        :param sampler: Optional ImportanceSampler biasing the jamming decisions toward loss.
         """
         self.jamming_probability = jamming_probability
         self.noise_intensity = noise_intensity
         self.jamming_power_dbm = jamming_power_dbm
+        self.sampler = sampler
         # Define the range for random intervals between noise pulses
         self.pulse_interval_min, self.pulse_interval_max = pulse_interval_range
         self.pulse_duration = pulse_duration
@@ -43,9 +48,9 @@ class PulsedNoiseJammer:
         if self.is_pulse_active(current_time):
             effective_jamming_probability = min(1.0, self.jamming_probability + 0.5)
 
-        if random.random() < effective_jamming_probability:
+        if decide(effective_jamming_probability, self.sampler):
             print(f"[PulsedNoiseJammer] Pulsed jamming active. Noise intensity: {self.noise_intensity}")
-            if random.random() < self.noise_intensity:
+            if decide(self.noise_intensity, self.sampler):
                 print("[PulsedNoiseJammer] Message completely lost!")
                 return None, True
             else:
@@ -59,6 +64,23 @@ class PulsedNoiseJammer:
         """Returns the power of the jamming signal in dBm."""
         return self.jamming_power_dbm
 
+    def pulse_schedule(self, duration, rng=random):
+        """
+        Precompute the pulse windows of a run in simulated time, following the same
+        timing law as the live pulses: a pulse lasts pulse_duration and the next one
+        starts a random interval after it ends.
+        :param duration: Simulated seconds to cover.
+        :param rng: random.Random-like source of the intervals.
+        :return: (starts, ends) arrays of pulse windows.
+        """
+        starts, ends = [], []
+        t = rng.uniform(self.pulse_interval_min, self.pulse_interval_max)
+        while t < duration:
+            starts.append(t)
+            ends.append(t + self.pulse_duration)
+            t += self.pulse_duration + rng.uniform(self.pulse_interval_min, self.pulse_interval_max)
+        return np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64)
+
     def is_pulse_active(self, current_time):
         """Check if we're currently within a pulse window."""
         return self.pulse_active_until is not None and current_time <= self.pulse_active_until
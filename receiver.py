@@ -0,0 +1,168 @@
+import numpy as np
+
+
+class ReceiverQueue:
+    """
+    GCS receiver modelled as a single FIFO decoder with a finite decode rate and a
+    bounded input queue, in simulated time.
+
+    Without overflow the departure times follow in closed form from Lindley's
+    recursion, d_i = (i + 1) s + max_{j <= i}(a_j - j s), which is a cumulative
+    maximum. Arrivals are processed in chunks with that vectorised form; while
+    the queue overflows, _busy_period resolves drops in closed form as well, so
+    no step costs a Python iteration per message.
+    """
+    def __init__(self, decode_rate=1000.0, queue_capacity=100, chunk_size=1 << 16):
+        """
+        :param decode_rate: Messages decoded per second.
+        :param queue_capacity: Messages that can wait while one is being decoded.
+        :param chunk_size: Arrivals handled per vectorised pass.
+        """
+        self.decode_rate = float(decode_rate)
+        self.service_time = 1.0 / self.decode_rate
+        self.queue_capacity = int(queue_capacity)
+        self.chunk_size = chunk_size
+
+    def process(self, arrival_times):
+        """
+        Run arrivals through the receiver.
+        :param arrival_times: Arrival times in seconds (any order).
+        :return: Dict with per-arrival arrays in the input order: 'departure'
+                 (NaN if dropped), 'queue_delay' (waiting before decode, NaN if dropped)
+                 and 'dropped', plus the scalar 'utilization'.
+        """
+        arrivals = np.asarray(arrival_times, dtype=np.float64)
+        order = np.argsort(arrivals, kind='stable')
+        a = arrivals[order]
+        n = a.shape[0]
+        s = self.service_time
+
+        departure = np.full(n, np.nan)
+        start = 0
+        last_departure = -np.inf
+        while start < n:
+            end = min(start + self.chunk_size, n)
+            seg = a[start:end]
+            steps = np.arange(end - start)
+            # Closed-form departures assuming nothing overflows in this chunk
+            d = (steps + 1) * s + np.maximum(last_departure, np.maximum.accumulate(seg - steps * s))
+            previous = np.concatenate(([last_departure], d[:-1]))
+            overflow = np.flatnonzero(self._in_system(previous, seg) > self.queue_capacity)
+            if overflow.size == 0:
+                departure[start:end] = d
+                last_departure = d[-1]
+                start = end
+                continue
+
+            first = overflow[0]
+            departure[start:start + first] = d[:first]
+            last_departure = previous[first]
+            start, last_departure = self._busy_period(a, departure, start + first, last_departure)
+
+        result_departure = np.empty(n)
+        result_departure[order] = departure
+        dropped = np.isnan(result_departure)
+        queue_delay = result_departure - s - arrivals
+
+        accepted = n - int(dropped.sum())
+        span = (last_departure - a[0]) if accepted else 0.0
+        return {
+            'departure': result_departure,
+            'queue_delay': queue_delay,
+            'dropped': dropped,
+            'utilization': float(accepted * s / span) if span > 0 else 0.0,
+        }
+
+    def _in_system(self, last_departure, t):
+        # While the decoder is busy it serves back to back, so the messages still in
+        # the system at time t are those departing in (t, last_departure], s apart.
+        with np.errstate(invalid='ignore'):
+            return np.maximum(np.ceil((last_departure - t) / self.service_time - 1e-9), 0)
+
+    def _busy_period(self, arrivals, departure, index, last_departure):
+        """
+        Resolve an overflowing busy period starting at `index`, until the decoder goes idle.
+        Returns the index to resume the closed form from and the last departure.
+
+        While busy, the k-th accepted message departs at last_departure + k s, so a
+        message at t sees c(t) + k messages in the system, with c(t) the count
+        against the initial last_departure; it is accepted iff k <= K = capacity - c(t).
+        K never decreases with t and k <= K + 1 always holds (an accepted message
+        leaves at most capacity + 1 in the system), so the accepted count obeys
+        k_(i+1) = min(k_i + 1, K_i + 1), i.e. k_i = i + min(0, min_(j<i)(K_j - j)):
+        one cumulative minimum per chunk instead of one iteration per message.
+        """
+        s = self.service_time
+        n = arrivals.shape[0]
+        while index < n:
+            end = min(index + self.chunk_size, n)
+            t = arrivals[index:end]
+            steps = np.arange(end - index)
+            # Not clamped at zero: c(t) + k must stay linear in k for later arrivals
+            room = self.queue_capacity - np.ceil((last_departure - t) / s - 1e-9)
+            floor = np.minimum.accumulate(room - steps)
+            accepted_before = steps + np.minimum(0, np.concatenate(([0], floor[:-1])))
+            busy_until = last_departure + accepted_before * s
+            idle = np.flatnonzero(busy_until <= t)
+            stop = idle[0] if idle.size else end - index
+            accepted = np.flatnonzero(accepted_before[:stop] <= room[:stop])
+            departure[index + accepted] = busy_until[accepted] + s
+            if idle.size:
+                # Decoder idle: the closed form is valid again from here
+                return index + stop, busy_until[stop]
+            last_departure += (accepted_before[-1] + (accepted_before[-1] <= room[-1])) * s
+            index = end
+        return index, last_departure
+
+
+def arrival_schedule(fleet_size, duration, report_rate=2.0, jitter=0.05, rng=None):
+    """
+    Report arrival times of a fleet broadcasting periodically with random phase.
+    :param fleet_size: Number of drones.
+    :param duration: Simulated seconds.
+    :param report_rate: Reports per second per drone (ADS-B positions: 2 Hz).
+    :param jitter: Uniform timing jitter as a fraction of the report period.
+    :return: Sorted array of arrival times.
+    """
+    rng = rng or np.random.default_rng()
+    period = 1.0 / report_rate
+    reports = int(duration * report_rate)
+    phase = rng.uniform(0, period, size=(fleet_size, 1))
+    times = phase + period * np.arange(reports)[None, :]
+    times += rng.uniform(-jitter * period, jitter * period, size=times.shape)
+    return np.sort(times, axis=None)
+
+
+def summarize_queue(result):
+    """Scalar queueing metrics of a ReceiverQueue.process result."""
+    delay = result['queue_delay'][~result['dropped']]
+    return {
+        'messages': int(result['dropped'].shape[0]),
+        'drop_rate': float(result['dropped'].mean()) if result['dropped'].size else 0.0,
+        'utilization': float(result['utilization']),
+        'mean_queue_delay': float(delay.mean()) if delay.size else float('nan'),
+        'p99_queue_delay': float(np.percentile(delay, 99)) if delay.size else float('nan'),
+    }
+
+
+def sweep_fleet_size(fleet_sizes, receiver, duration=60.0, report_rate=2.0, seed=None):
+    """
+    Queueing metrics of one receiver for each fleet size.
+    :return: List of summarize_queue dicts with an added 'fleet_size'.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for fleet_size in fleet_sizes:
+        arrivals = arrival_schedule(fleet_size, duration, report_rate, rng=rng)
+        row = summarize_queue(receiver.process(arrivals))
+        row['fleet_size'] = fleet_size
+        rows.append(row)
+    return rows
+
+
+def saturation_fleet_size(rows, max_drop_rate=0.01):
+    """Smallest swept fleet size whose drop rate exceeds max_drop_rate, or None."""
+    for row in rows:
+        if row['drop_rate'] > max_drop_rate:
+            return row['fleet_size']
+    return None
@@ -0,0 +1,262 @@
+"""
+Replay of recorded flights through the channel, jammer and spoofer pipeline.
+
+Recordings hold (time, id, lat, lon, alt) samples sorted by time, either as a
+headered CSV file or as packed little-endian binary records (RECORD_DTYPE).
+Binary files are memory-mapped and both formats are read chunk by chunk, so a
+recording never has to fit in RAM. Irregular samples are linearly
+interpolated onto the simulation's transmission schedule.
+"""
+import itertools
+import numpy as np
+from adsbchannel import ADSBChannel
+from gcs import GCS
+
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('id', '<u4'), ('lat', '<f8'), ('lon', '<f8'), ('alt', '<f4')])
+
+
+def write_binary(path, time_s, ids, lat, lon, alt):
+    """Write samples as packed binary records readable by TrajectoryReplay."""
+    records = np.empty(len(time_s), dtype=RECORD_DTYPE)
+    records['time'], records['id'] = time_s, ids
+    records['lat'], records['lon'], records['alt'] = lat, lon, alt
+    records.tofile(path)
+
+
+class TrajectoryReplay:
+    """
+    Streams recorded tracks resampled to a fixed transmission interval.
+    """
+    def __init__(self, path, interval=1.0, origin=0.0, chunk_rows=1 << 20, max_gap=None, file_format=None):
+        """
+        :param path: Recording file (.csv or binary records).
+        :param interval: Transmission interval of the simulation in seconds.
+        :param origin: Time of tick 0; ticks fall on origin + k * interval.
+        :param chunk_rows: Samples read per chunk.
+        :param max_gap: Gaps between samples longer than this (seconds) are not
+                        interpolated across; the track is silent instead.
+        :param file_format: 'csv' or 'binary'; guessed from the extension by default.
+        """
+        self.path = path
+        self.interval = float(interval)
+        self.origin = float(origin)
+        self.chunk_rows = chunk_rows
+        self.max_gap = max_gap
+        self.file_format = file_format or ('csv' if path.endswith('.csv') else 'binary')
+        self.id_names = {}  # CSV ids are interned to integer codes
+
+    def samples(self):
+        """Yield raw sample chunks as (time, id, lat, lon, alt) arrays."""
+        if self.file_format == 'csv':
+            yield from self._csv_chunks()
+            return
+        records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r')
+        for start in range(0, records.shape[0], self.chunk_rows):
+            chunk = records[start:start + self.chunk_rows]
+            yield (np.asarray(chunk['time']), np.asarray(chunk['id'], dtype=np.int64),
+                   np.asarray(chunk['lat']), np.asarray(chunk['lon']),
+                   np.asarray(chunk['alt'], dtype=np.float64))
+
+    def _csv_chunks(self):
+        codes = {}
+        with open(self.path) as f:
+            next(f)  # Header: time,id,lat,lon,alt
+            while True:
+                lines = list(itertools.islice(f, self.chunk_rows))
+                if not lines:
+                    return
+                fields = [line.rstrip('\n').split(',') for line in lines if line.strip()]
+                columns = list(zip(*fields))
+                ids = np.fromiter((codes.setdefault(name, len(codes)) for name in columns[1]),
+                                  dtype=np.int64, count=len(fields))
+                self.id_names = {code: name for name, code in codes.items()}
+                yield (np.array(columns[0], dtype=np.float64), ids,
+                       np.array(columns[2], dtype=np.float64), np.array(columns[3], dtype=np.float64),
+                       np.array(columns[4], dtype=np.float64))
+
+    def ticks(self):
+        """
+        Yield batches of positions interpolated onto the transmission schedule.
+        Each batch is a dict of arrays: time, id, latitude, longitude, altitude,
+        and times never decrease within or across batches.
+
+        A track's ticks are only known once the sample after them is read, so ticks
+        are held back until the watermark: the earliest last-read sample time of the
+        open tracks, before which no track can produce another tick. With max_gap,
+        tracks silent for longer than it are closed; without it, a track that stops
+        early holds every later tick back until the end of the recording.
+        """
+        carry = {}  # id -> last (time, lat, lon, alt) seen so far
+        pending = []
+        for batch in self._interpolated(carry):
+            pending.append(batch)
+            latest = max(previous[0] for previous in carry.values())
+            open_times = [previous[0] for previous in carry.values()
+                          if self.max_gap is None or latest - previous[0] <= self.max_gap]
+            ready, pending = _split_at(pending, min(open_times))
+            if ready is not None:
+                yield ready
+        ready, _ = _split_at(pending, np.inf)
+        if ready is not None:
+            yield ready
+
+    def _interpolated(self, carry):
+        """Ticks of each chunk, sorted by time within the chunk only; updates carry."""
+        dt = self.interval
+        for t, ids, lat, lon, alt in self.samples():
+            if t.size == 0:
+                continue
+            order = np.lexsort((t, ids))
+            t, ids, lat, lon, alt = t[order], ids[order], lat[order], lon[order], alt[order]
+
+            # Previous sample of every row: the row before it for the same id, else the carry
+            first = np.ones(t.shape[0], dtype=bool)
+            first[1:] = ids[1:] != ids[:-1]
+            t0, lat0, lon0, alt0 = (np.roll(column, 1) for column in (t, lat, lon, alt))
+            has_previous = ~first
+            for row in np.flatnonzero(first):
+                previous = carry.get(int(ids[row]))
+                if previous is not None:
+                    t0[row], lat0[row], lon0[row], alt0[row] = previous
+                    has_previous[row] = True
+
+            # A sample after a gap longer than max_gap restarts its track
+            if self.max_gap is not None:
+                has_previous &= ~(t - t0 > self.max_gap)
+
+            # Ticks k with t0 < origin + k * dt <= t1 on each segment; a track's
+            # very first sample only produces a tick if it lies exactly on one.
+            k_hi = np.floor((t - self.origin) / dt).astype(np.int64)
+            k_lo = np.where(has_previous, np.floor((t0 - self.origin) / dt).astype(np.int64) + 1,
+                            np.ceil((t - self.origin) / dt).astype(np.int64))
+            counts = np.maximum(k_hi - k_lo + 1, 0)
+
+            last = np.append(first[1:], True)
+            for row in np.flatnonzero(last):
+                carry[int(ids[row])] = (t[row], lat[row], lon[row], alt[row])
+
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            segment = np.repeat(np.arange(t.shape[0]), counts)
+            k = k_lo[segment] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            tick_time = self.origin + k * dt
+            span = t[segment] - t0[segment]
+            frac = np.where(has_previous[segment] & (span > 0),
+                            (tick_time - t0[segment]) / np.where(span > 0, span, 1), 1.0)
+
+            batch_order = np.argsort(tick_time, kind='stable')
+            segment, frac, tick_time = segment[batch_order], frac[batch_order], tick_time[batch_order]
+            yield {
+                'time': tick_time,
+                'id': ids[segment],
+                'latitude': lat0[segment] + frac * (lat[segment] - lat0[segment]),
+                'longitude': lon0[segment] + frac * (lon[segment] - lon0[segment]),
+                'altitude': alt0[segment] + frac * (alt[segment] - alt0[segment]),
+            }
+
+    def drone_id(self, code):
+        """Simulation drone id for an integer track id."""
+        return self.id_names.get(code, str(code))
+
+    def messages(self):
+        """Yield message dicts in the format produced by run_simulation."""
+        for batch in self.ticks():
+            for code, t, lat, lon, alt in zip(batch['id'].tolist(), batch['time'].tolist(),
+                                              batch['latitude'].tolist(), batch['longitude'].tolist(),
+                                              batch['altitude'].tolist()):
+                yield {
+                    'drone_id': self.drone_id(code),
+                    'latitude': lat,
+                    'longitude': lon,
+                    'altitude': alt,
+                    'timestamp': t
+                }
+
+
+def _split_at(batches, watermark):
+    """
+    Merge tick batches in time order and split them at watermark.
+    :return: (batch of ticks at or before watermark or None, list of the later ones)
+    """
+    if not batches:
+        return None, []
+    merged = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    order = np.argsort(merged['time'], kind='stable')
+    cut = int(np.searchsorted(merged['time'][order], watermark, side='right'))
+    ready = {key: value[order[:cut]] for key, value in merged.items()} if cut else None
+    later = [{key: value[order[cut:]] for key, value in merged.items()}] if cut < order.shape[0] else []
+    return ready, later
+
+
+def run_replay(replay, gcs_position, channel=None, jammer=None, spoofer=None, gcs=None, exporter=None):
+    """
+    Push a replayed recording through the same channel, jammer and spoofer steps
+    as run_simulation.
+    :param gcs_position: (lat, lon) of the receiving GCS.
+    :param exporter: Optional SBSExporter or BeastExporter receiving every report that
+                     reaches the GCS; flushed at the end.
+    :return: Dict of metric series: packet_loss, snr, latency and throughput (messages
+             per simulated second since the first replayed tick).
+    """
+    channel = channel or ADSBChannel()
+    gcs = gcs or GCS(gcs_position[0], gcs_position[1])
+
+    total_messages = 0
+    lost_messages = 0
+    packet_loss_over_time = []
+    snr_values = []
+    latency_values = []
+    throughput_values = []
+    first_time = None
+
+    for original_message in replay.messages():
+        sim_time = original_message['timestamp']
+        if first_time is None:
+            first_time = sim_time
+        if exporter is not None:
+            exporter.advance(sim_time)  # Messages come in time order and arrive after they are sent
+        received_message, delay_ns, corrupted, snr_db = channel.transmit(
+            original_message, gcs_position, jammer=jammer, spoofer=spoofer, sim_time=sim_time
+        )
+        total_messages += 1
+
+        jammed = False
+        if jammer and (channel.spectrum is None or channel.spectrum.jammed(sim_time, channel.frequency)):
+            received_message, jammed = jammer.jam_signal(received_message)
+            if jammed and received_message is None:
+                lost_messages += 1
+                packet_loss_over_time.append((total_messages, lost_messages / total_messages * 100))
+                continue
+
+        if spoofer:
+            received_message, spoofed = spoofer.spoof_message(received_message)
+
+        if exporter is not None:
+            exporter.add(received_message, sim_time + delay_ns * 1e-9, corrupted, snr_db)
+        gcs.receive_update(
+            received_message['drone_id'],
+            (received_message['latitude'], received_message['longitude'], received_message['altitude']),
+            timestamp=sim_time,
+            snr_db=snr_db
+        )
+
+        if corrupted and not jammed:
+            lost_messages += 1
+
+        packet_loss_over_time.append((total_messages, lost_messages / total_messages * 100))
+        snr_values.append((total_messages, snr_db))
+        # Propagation delay in milliseconds; the recording fixes the send schedule
+        latency_values.append((total_messages, delay_ns * 1e-6))
+        # Messages per simulated second, counting the first tick as one interval
+        elapsed = sim_time - first_time + replay.interval
+        throughput_values.append((elapsed, total_messages / elapsed))
+
+    if exporter is not None:
+        exporter.flush()
+    return {
+        'packet_loss': packet_loss_over_time,
+        'snr': snr_values,
+        'latency': latency_values,
+        'throughput': throughput_values
+    }
@@ -0,0 +1,165 @@
+import math
+from statistics import NormalDist
+from simulation import run_simulation, summarize
+
+
+def t_quantile(p, df):
+    """
+    Quantile of Student's t distribution: closed form for df <= 2, otherwise a
+    Cornish-Fisher expansion around the normal quantile (within 1% for df >= 3).
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    if math.isinf(df):
+        return z
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+class RunningStat:
+    """Welford accumulator for the mean and variance of a stream of values."""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else float('inf')
+
+    def half_width(self, confidence=0.95):
+        """Half-width of the two-sided Student-t confidence interval of the mean."""
+        if self.n < 2:
+            return float('inf')
+        return t_quantile(0.5 + confidence / 2, self.n - 1) * math.sqrt(self.variance / self.n)
+
+
+class ReplicationController:
+    """
+    Runs replications of a scenario until every tracked metric's confidence
+    interval is narrow enough, or the replication budget is spent.
+    Statistics are updated incrementally after each replication.
+    """
+    def __init__(self, precision, relative=False, confidence=0.95, min_replications=5,
+                 max_replications=100, metrics=('packet_loss', 'mean_snr', 'mean_latency'), base_seed=0):
+        """
+        :param precision: Target CI half-width, either one value for all metrics or a
+                          dict per metric.
+        :param relative: Interpret precision as a fraction of the metric's mean.
+        :param confidence: Confidence level of the intervals.
+        :param min_replications: Replications always run before testing convergence.
+        :param max_replications: Budget cap.
+        :param metrics: Keys of simulation.summarize() to track.
+        :param base_seed: Replication i runs with seed base_seed + i, so scenarios
+                          share seeds replication by replication.
+        """
+        self.precision = precision
+        self.relative = relative
+        self.confidence = confidence
+        self.min_replications = max(min_replications, 2)
+        self.max_replications = max_replications
+        self.metrics = tuple(metrics)
+        self.base_seed = base_seed
+
+    def _target(self, metric, stat):
+        target = self.precision[metric] if isinstance(self.precision, dict) else self.precision
+        return target * abs(stat.mean) if self.relative else target
+
+    def converged(self, stats):
+        return all(
+            stats[metric].half_width(self.confidence) <= self._target(metric, stats[metric])
+            for metric in self.metrics
+            if not isinstance(self.precision, dict) or metric in self.precision
+        )
+
+    def _push(self, stats, skipped, values):
+        # A replicate without messages summarises to NaN; one such value would turn
+        # the whole running mean into NaN, so it is counted instead of accumulated
+        for metric in self.metrics:
+            value = values[metric]
+            if math.isfinite(value):
+                stats[metric].push(value)
+            else:
+                skipped[metric] += 1
+
+    def _estimates(self, stats, skipped):
+        return {
+            metric: {'mean': stat.mean if stat.n else float('nan'), 'half_width': stat.half_width(self.confidence),
+                     'n': stat.n, 'skipped': skipped[metric]}
+            for metric, stat in stats.items()
+        }
+
+    def run(self, scenario_params=None, runner=run_simulation, **common):
+        """
+        Replicate one scenario.
+        :param scenario_params: Keyword arguments of the scenario (jamming, spoofing, ...).
+        :param runner: Function running one replication and returning metric series.
+        :param common: Extra keyword arguments passed to every replication (routes, center, ...).
+        :return: (estimates, first_run) where estimates maps each metric to
+                 {'mean', 'half_width', 'n', 'skipped'} plus 'replications' and
+                 'converged', and first_run is the metric series of the first
+                 replication. 'skipped' counts replications whose value was not
+                 finite (e.g. no messages) and were left out of the estimate.
+        """
+        stats = {metric: RunningStat() for metric in self.metrics}
+        skipped = {metric: 0 for metric in self.metrics}
+        first_run = None
+        converged = False
+        replications = 0
+        while replications < self.max_replications:
+            data = runner(seed=self.base_seed + replications, **common, **(scenario_params or {}))
+            if first_run is None:
+                first_run = data
+            self._push(stats, skipped, summarize(data))
+            replications += 1
+            if replications >= self.min_replications and self.converged(stats):
+                converged = True
+                break
+
+        estimates = self._estimates(stats, skipped)
+        estimates['replications'] = replications
+        estimates['converged'] = converged
+        return estimates, first_run
+
+    def compare(self, baseline_params, scenario_params, runner=run_simulation, crn=True, **common):
+        """
+        Paired replications of a scenario against a baseline: replication i runs both
+        with seed base_seed + i, and the confidence intervals are those of the
+        per-replication differences (scenario - baseline). With common random numbers
+        the shared channel noise cancels, so far fewer replications are needed than
+        for two independent estimates.
+        :param crn: Pass crn to the runner so both runs draw the same channel errors.
+        :return: Estimates of the differences in the same format as run().
+        """
+        stats = {metric: RunningStat() for metric in self.metrics}
+        skipped = {metric: 0 for metric in self.metrics}
+        if crn:
+            common['crn'] = True
+        converged = False
+        replications = 0
+        while replications < self.max_replications:
+            seed = self.base_seed + replications
+            baseline = summarize(runner(seed=seed, **common, **(baseline_params or {})))
+            scenario = summarize(runner(seed=seed, **common, **(scenario_params or {})))
+            self._push(stats, skipped, {metric: scenario[metric] - baseline[metric] for metric in self.metrics})
+            replications += 1
+            if replications >= self.min_replications and self.converged(stats):
+                converged = True
+                break
+
+        estimates = self._estimates(stats, skipped)
+        estimates['replications'] = replications
+        estimates['converged'] = converged
+        return estimates
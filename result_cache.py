@@ -0,0 +1,192 @@
+"""
+Content-addressed cache of scenario results.
+
+A result is stored under the SHA-256 of its scenario parameters, seed and the
+source of every local module the simulation imports, so editing plots never
+invalidates anything while editing e.g. adsbchannel.py invalidates everything.
+
+    python result_cache.py stats
+    python result_cache.py invalidate [--key KEY]
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+DEFAULT_CACHE_DIR = '.result_cache'
+DEFAULT_MAX_BYTES = 1 << 30
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Arguments that change how a run is executed but not its results
+IGNORED_ARGUMENTS = ('checkpoint_path', 'checkpoint_interval')
+# A caller-supplied GCS, mesh, importance sampler or exporter is mutable input/output
+# state and a spectrum grid is a large array; runs given any of them always execute
+UNKEYABLE_ARGUMENTS = ('gcs', 'spectrum', 'relay', 'sampler', 'exporter')
+# Arguments given either as plain config (keyed as is) or as a live object (never keyed)
+CONFIG_ARGUMENTS = ('terrain', 'fading', 'corruption_model')
+# Object arguments keyed by the attributes that determine their effect on the results
+KEYED_ARGUMENTS = {'receiver': ('decode_rate', 'queue_capacity')}
+
+_source_versions = {}
+
+
+def _local_imports(path):
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return {name for name in names if os.path.exists(os.path.join(SOURCE_DIR, name + '.py'))}
+
+
+def source_version(entry_module='simulation'):
+    """Hash of the source of entry_module and every local module it imports, transitively."""
+    if entry_module not in _source_versions:
+        seen, pending = set(), [entry_module]
+        while pending:
+            name = pending.pop()
+            if name not in seen:
+                seen.add(name)
+                pending.extend(_local_imports(os.path.join(SOURCE_DIR, name + '.py')))
+        digest = hashlib.sha256()
+        for name in sorted(seen):
+            digest.update(name.encode())
+            with open(os.path.join(SOURCE_DIR, name + '.py'), 'rb') as f:
+                digest.update(f.read())
+        _source_versions[entry_module] = digest.hexdigest()
+    return _source_versions[entry_module]
+
+
+class ResultCache:
+    """
+    On-disk cache of run results with least-recently-used eviction by total size.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, entry_module='simulation'):
+        """
+        :param cache_dir: Directory holding one file per cached result.
+        :param max_bytes: Total size above which the least recently used entries are evicted.
+        :param entry_module: Module whose (transitive) source versions the results.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entry_module = entry_module
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, params, seed):
+        """Cache key of a run; params must be JSON-serialisable."""
+        blob = json.dumps({'params': params, 'seed': seed, 'source': source_version(self.entry_module)},
+                          sort_keys=True, default=list)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        """Return the stored result, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)  # Refresh recency for LRU eviction
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """List (path, size, mtime) of every cached result."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Delete least recently used results until the cache fits in max_bytes."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def invalidate(self, key=None):
+        """Remove one entry, or every entry when key is None. Returns the number removed."""
+        if key is not None:
+            try:
+                os.remove(self._path(key))
+                return 1
+            except FileNotFoundError:
+                return 0
+        entries = self.entries()
+        for path, _, _ in entries:
+            os.remove(path)
+        return len(entries)
+
+    def wrap(self, runner):
+        """
+        Wrap a run function (e.g. simulation.run_simulation) so that seeded calls
+        are served from the cache. Unseeded runs are not reproducible and always execute.
+        """
+        def cached_runner(**kwargs):
+            if (kwargs.get('seed') is None or any(kwargs.get(name) is not None for name in UNKEYABLE_ARGUMENTS)
+                    or not all(isinstance(kwargs.get(name), (type(None), str, dict)) for name in CONFIG_ARGUMENTS)):
+                return runner(**kwargs)
+            seed = kwargs['seed']
+            params = {name: _argument_key(name, value) for name, value in kwargs.items()
+                      if name not in IGNORED_ARGUMENTS and name != 'seed'}
+            key = self.key(params, seed)
+            result = self.get(key)
+            if result is None:
+                result = runner(**kwargs)
+                self.put(key, result)
+            return result
+        return cached_runner
+
+
+def _argument_key(name, value):
+    attributes = KEYED_ARGUMENTS.get(name)
+    if attributes is None or value is None:
+        return value
+    return {'type': type(value).__name__, **{attribute: getattr(value, attribute) for attribute in attributes}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the scenario result cache.")
+    parser.add_argument('command', choices=('stats', 'invalidate'))
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help="Cache directory")
+    parser.add_argument('--key', help="Invalidate only this entry")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(args.dir)
+    if args.command == 'invalidate':
+        print(f"Removed {cache.invalidate(args.key)} cached result(s)")
+    else:
+        entries = cache.entries()
+        print(f"{len(entries)} cached result(s), {sum(size for _, size, _ in entries)} bytes, "
+              f"source version {source_version()[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 import random
+import numpy as np
+from drone import CLIMB_ENERGY_FACTOR
 
 class RouteGenerator:
-    def __init__(self, center_lat, center_lon, num_routes=3, waypoints_per_route=5, max_offset=0.01):
+    def __init__(self, center_lat, center_lon, num_routes=3, waypoints_per_route=5, max_offset=0.01,
+                 optimize=False):
         """
         Generate random routes around a centralized point.
 
@@ -10,12 +13,15 @@ class RouteGenerator:
         :param num_routes: Number of different routes to generate.
         :param waypoints_per_route: Number of waypoints per route.
         :param max_offset: Maximum latitude/longitude variation (~0.01 = ~1km).
+        :param optimize: Reorder each route's waypoints to minimise battery usage
+                         (see optimize_waypoint_order).
         """
         self.center_lat = center_lat
         self.center_lon = center_lon
         self.num_routes = num_routes
         self.waypoints_per_route = waypoints_per_route
         self.max_offset = max_offset
+        self.optimize = optimize
 
     def generate_routes(self):
         """
@@ -39,4 +45,112 @@ class RouteGenerator:
 
             routes.append(route)
 
+        if self.optimize:
+            routes = optimize_waypoint_order(routes)
         return routes
+
+
+def _energy_matrices(points, consume_rate, speed):
+    """
+    Battery usage between every pair of waypoints of every route, with the cost
+    model of Drone.calculate_battery_usage.
+    :param points: (R, W, 3) array of (lat, lon, alt).
+    :return: (R, W, W) array.
+    """
+    lat = np.radians(points[:, :, 0])
+    lon = np.radians(points[:, :, 1])
+    delta_phi = lat[:, None, :] - lat[:, :, None]
+    delta_lambda = lon[:, None, :] - lon[:, :, None]
+    a = (np.sin(delta_phi / 2) ** 2
+         + np.cos(lat[:, :, None]) * np.cos(lat[:, None, :]) * np.sin(delta_lambda / 2) ** 2)
+    distance = 6371000 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    climb = np.abs(points[:, None, :, 2] - points[:, :, None, 2])
+    return consume_rate * distance / speed + climb * CLIMB_ENERGY_FACTOR
+
+
+def _nearest_neighbor_tours(cost):
+    """Greedy tours starting at waypoint 0 of every route."""
+    routes, count = cost.shape[0], cost.shape[1]
+    rows = np.arange(routes)
+    tours = np.zeros((routes, count), dtype=np.int64)
+    visited = np.zeros((routes, count), dtype=bool)
+    visited[:, 0] = True
+    for step in range(1, count):
+        candidates = np.where(visited, np.inf, cost[rows, tours[:, step - 1]])
+        tours[:, step] = candidates.argmin(axis=1)
+        visited[rows, tours[:, step]] = True
+    return tours
+
+
+def _two_opt(cost, tours, max_passes=1000):
+    """
+    Best-improvement 2-opt on open paths with a fixed first waypoint, applied to
+    all routes at once: each pass reverses the best segment of every route that
+    still improves.
+    """
+    routes, count = tours.shape
+    rows = np.arange(routes)[:, None, None]
+    i = np.arange(1, count)[:, None]
+    j = np.arange(1, count)[None, :]
+    valid = (j > i)[None]
+    positions = np.arange(count)
+    for _ in range(max_passes):
+        before_i = tours[:, :-1][:, :, None]  # t[i-1]
+        at_i = tours[:, 1:][:, :, None]  # t[i]
+        at_j = tours[:, 1:][:, None, :]  # t[j]
+        after_j = np.concatenate((tours[:, 2:], tours[:, -1:]), axis=1)[:, None, :]  # t[j+1]
+        # Reversing t[i..j] replaces edges (i-1, i) and (j, j+1) by (i-1, j) and (i, j+1);
+        # the path is open, so there is no (j, j+1) edge when j is the last waypoint
+        has_next = (j < count - 1)[None]
+        delta = (cost[rows, before_i, at_j] - cost[rows, before_i, at_i]
+                 + np.where(has_next, cost[rows, at_i, after_j] - cost[rows, at_j, after_j], 0))
+        delta = np.where(valid, delta, 0)
+        best = delta.reshape(routes, -1).argmin(axis=1)
+        improving = delta.reshape(routes, -1)[np.arange(routes), best] < -1e-12
+        if not improving.any():
+            break
+        first = best[improving] // (count - 1) + 1
+        last = best[improving] % (count - 1) + 1
+        inside = (positions >= first[:, None]) & (positions <= last[:, None])
+        source = np.where(inside, first[:, None] + last[:, None] - positions, positions)
+        tours[improving] = np.take_along_axis(tours[improving], source, axis=1)
+    return tours
+
+
+def optimize_waypoint_order(routes, consume_rate=0.05, speed=10.0, max_passes=1000):
+    """
+    Reorder the waypoints of each route to minimise the battery usage of flying
+    them, keeping the first waypoint as the start. Nearest-neighbour tours and the
+    given order are both improved with 2-opt and the cheaper is kept; routes of
+    equal length are optimised together.
+    :param routes: List of routes (lists of (lat, lon, alt)).
+    :param consume_rate: Battery consumption in Ah per second of flight.
+    :param speed: Cruise speed in m/s; with consume_rate, weighs distance against climbing.
+    :return: New list of reordered routes.
+    """
+    result = list(routes)
+    by_length = {}
+    for index, route in enumerate(routes):
+        by_length.setdefault(len(route), []).append(index)
+    for length, indices in by_length.items():
+        if length < 3:
+            continue
+        points = np.array([routes[index] for index in indices], dtype=np.float64)
+        cost = _energy_matrices(points, consume_rate, speed)
+        # 2-opt from the given order as well, so no route comes out worse than it went in
+        starts = np.concatenate((_nearest_neighbor_tours(cost), np.tile(np.arange(length), (len(indices), 1))))
+        tours = _two_opt(np.concatenate((cost, cost)), starts, max_passes)
+        rows = np.arange(tours.shape[0])[:, None]
+        energy = cost[rows % len(indices), tours[:, :-1], tours[:, 1:]].sum(axis=1).reshape(2, -1)
+        tours = tours.reshape(2, len(indices), length)[energy.argmin(axis=0), np.arange(len(indices))]
+        for index, tour in zip(indices, tours.tolist()):
+            result[index] = [routes[index][k] for k in tour]
+    return result
+
+
+def route_energy(route, consume_rate=0.05, speed=10.0):
+    """Battery usage of flying a route's waypoints in order, under the same cost model."""
+    if len(route) < 2:
+        return 0.0
+    cost = _energy_matrices(np.asarray([route], dtype=np.float64), consume_rate, speed)[0]
+    return float(cost[np.arange(len(route) - 1), np.arange(1, len(route))].sum())
@@ -0,0 +1,117 @@
+"""
+Shared storage of route waypoints for large fleets.
+
+Every distinct route is stored once in a single contiguous float64 array, and
+drones hold a RouteView (route id plus optional offset) instead of their own
+list of tuples. A RouteView behaves like the list a Drone expects, so it can be
+passed as `route` unchanged.
+"""
+import numpy as np
+
+
+class RouteStore:
+    """
+    Interned waypoint storage: identical routes share one block of rows in
+    `waypoints` ((capacity, 3) float64 of lat, lon, alt).
+    """
+    def __init__(self, initial_capacity=1024):
+        self.waypoints = np.empty((initial_capacity, 3), dtype=np.float64)
+        self.size = 0  # Rows of `waypoints` in use
+        self.starts = []
+        self.lengths = []
+        self._interned = {}  # waypoint bytes -> route id
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, route):
+        """
+        Store a route, or find the identical route already stored.
+        :param route: Sequence of (lat, lon, alt) waypoints.
+        :return: Route id.
+        """
+        points = np.asarray(route, dtype=np.float64).reshape(-1, 3)
+        key = points.tobytes()
+        route_id = self._interned.get(key)
+        if route_id is not None:
+            return route_id
+
+        if self.size + points.shape[0] > self.waypoints.shape[0]:
+            grown = np.empty((max(2 * self.waypoints.shape[0], self.size + points.shape[0]), 3))
+            grown[:self.size] = self.waypoints[:self.size]
+            self.waypoints = grown
+        self.waypoints[self.size:self.size + points.shape[0]] = points
+        route_id = len(self.starts)
+        self.starts.append(self.size)
+        self.lengths.append(points.shape[0])
+        self.size += points.shape[0]
+        self._interned[key] = route_id
+        return route_id
+
+    def add_routes(self, routes):
+        """Store several routes; returns their ids."""
+        return [self.add(route) for route in routes]
+
+    def points(self, route_id):
+        """Waypoints of a route as a read-only (n, 3) view into the store."""
+        start = self.starts[route_id]
+        points = self.waypoints[start:start + self.lengths[route_id]]
+        points.flags.writeable = False
+        return points
+
+    def view(self, route_id, offset=None):
+        """
+        Route as seen by one drone.
+        :param offset: Optional (dlat, dlon, dalt) added to every waypoint.
+        """
+        return RouteView(self, route_id, offset)
+
+    def views(self, route_ids, offsets=None):
+        """RouteViews for a fleet; offsets is an optional (n, 3) array or sequence."""
+        if offsets is None:
+            return [RouteView(self, route_id, None) for route_id in route_ids]
+        return [RouteView(self, route_id, tuple(offset))
+                for route_id, offset in zip(route_ids, np.asarray(offsets, dtype=np.float64).tolist())]
+
+    @property
+    def nbytes(self):
+        """Bytes of waypoint storage in use."""
+        return self.size * self.waypoints.itemsize * 3
+
+
+class RouteView:
+    """
+    A stored route with an optional offset, indexable like a list of
+    (lat, lon, alt) tuples.
+    """
+    __slots__ = ('store', 'route_id', 'offset')
+
+    def __init__(self, store, route_id, offset=None):
+        self.store = store
+        self.route_id = route_id
+        self.offset = offset
+
+    def __len__(self):
+        return self.store.lengths[self.route_id]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = self.store.lengths[self.route_id]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("route index out of range")
+        lat, lon, alt = self.store.waypoints[self.store.starts[self.route_id] + index].tolist()
+        if self.offset is None:
+            return lat, lon, alt
+        return lat + self.offset[0], lon + self.offset[1], alt + self.offset[2]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def as_array(self):
+        """Waypoints with the offset applied, as a new (n, 3) array."""
+        points = self.store.points(self.route_id)
+        return points + np.asarray(self.offset) if self.offset is not None else points.copy()
@@ -0,0 +1,130 @@
+"""
+Headless entry point: run the scenarios of a JSON/YAML config file.
+
+    python run_scenarios.py scenarios.json --output-dir results --plots
+
+Plotting libraries are only imported when --plots is given.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from simulation import DEFAULT_CENTER, DEFAULT_ROUTES, DEFAULT_SCENARIOS, generate_routes, run_simulation, summarize
+from replication import ReplicationController
+from result_cache import DEFAULT_CACHE_DIR, ResultCache
+
+
+def load_config(path):
+    """Read a scenario config from a .json, .yaml or .yml file."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml  # Optional dependency, only needed for YAML configs
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def run_config(config, checkpoint_dir=None, cache=None):
+    """
+    Run every scenario of a config dict with shared routes.
+    With a "replication" section, each scenario is replicated until its
+    confidence intervals reach the requested precision; if it names a
+    "baseline" scenario, every other scenario is also compared with it in
+    paired replications ('vs_baseline' in its summary). "crn": true runs
+    every scenario with common random numbers, from "seed" or the replication seeds.
+    :param cache: Optional ResultCache serving seeded runs.
+    :return: (results, summary) dicts keyed by scenario name: metric series of
+             one run, and scalar metrics (or CI estimates when replicating).
+    """
+    center = tuple(config.get('center', DEFAULT_CENTER))
+    seed = config.get('seed')
+    routes = config.get('waypoints')
+    if routes is None:
+        if seed is not None:
+            random.seed(seed)
+        routes = generate_routes(center, **{**DEFAULT_ROUTES, **config.get('routes', {})})
+
+    runner = cache.wrap(run_simulation) if cache is not None else run_simulation
+    crn = config.get('crn', False)
+    if crn and seed is None and not config.get('replication'):
+        raise ValueError("'crn' needs a 'seed' shared by the scenarios")
+    controller = None
+    baseline = None
+    if config.get('replication'):
+        if checkpoint_dir:
+            # Replications are short seeded runs; a single checkpoint per scenario
+            # would be resumed by the wrong replicate
+            raise ValueError("Checkpointing is not supported together with a 'replication' section")
+        replication = dict(config['replication'])
+        baseline = replication.pop('baseline', None)
+        controller = ReplicationController(**{'base_seed': seed or 0, **replication})
+
+    scenarios = config.get('scenarios', DEFAULT_SCENARIOS)
+
+    results, summary = {}, {}
+    for scenario, params in scenarios.items():
+        print(f"Running scenario: {scenario}")
+        if controller is not None:
+            summary[scenario], results[scenario] = controller.run(params, runner=runner,
+                                                                        routes=routes, center=center, crn=crn)
+            if baseline is not None and scenario != baseline:
+                summary[scenario]['vs_baseline'] = controller.compare(scenarios[baseline], params, runner=runner,
+                                                                      crn=crn, routes=routes, center=center)
+            continue
+        checkpoint_path = None
+        if checkpoint_dir:
+            checkpoint_path = os.path.join(checkpoint_dir, _safe_name(scenario) + '.ckpt')
+        results[scenario] = runner(routes=routes, center=center, seed=seed,
+                                   checkpoint_path=checkpoint_path, crn=crn, **params)
+        summary[scenario] = summarize(results[scenario])
+    return results, summary
+
+
+def write_plots(results, output_dir, per_scenario=False):
+    import matplotlib
+    matplotlib.use('Agg')
+    from plots import render_all
+
+    render_all(results, output_dir, per_scenario=per_scenario)
+
+
+def _safe_name(name):
+    return ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run drone ADS-B attack scenarios headless.")
+    parser.add_argument('config', nargs='?', help="JSON or YAML scenario file (default: built-in scenarios)")
+    parser.add_argument('--output-dir', default='results', help="Directory for summaries and plots")
+    parser.add_argument('--plots', action='store_true', help="Render plots (imports matplotlib)")
+    parser.add_argument('--per-scenario-plots', action='store_true',
+                        help="With --plots, also render one set of figures per scenario")
+    parser.add_argument('--checkpoint-dir', help="Checkpoint long scenarios into this directory")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Result cache directory")
+    parser.add_argument('--no-cache', action='store_true', help="Always recompute scenarios")
+    parser.add_argument('--invalidate-cache', action='store_true', help="Empty the result cache first")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config) if args.config else {}
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.checkpoint_dir:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir)
+        if args.invalidate_cache:
+            cache.invalidate()
+
+    results, summary = run_config(config, checkpoint_dir=args.checkpoint_dir, cache=cache)
+
+    with open(os.path.join(args.output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    if args.plots:
+        write_plots(results, args.output_dir, per_scenario=args.per_scenario_plots)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
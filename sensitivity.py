@@ -0,0 +1,198 @@
+"""
+Global sensitivity analysis of scenario parameters with Sobol indices.
+
+Parameters are drawn from a scrambled Sobol sequence over user-given ranges
+(Saltelli's design: base matrices A and B plus, for each parameter, A with
+that column taken from B), the N * (d + 2) runs are executed in parallel, and
+first-order (Saltelli 2010) and total (Jansen) indices are estimated for each
+output metric. Row k of every matrix runs with the same seed, so the
+simulation's own noise largely cancels out of the differences.
+
+    python sensitivity.py sensitivity.json --output-dir results
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from run_scenarios import load_config
+from simulation import run_simulation, summarize
+
+SOBOL_BITS = 30
+
+# Joe & Kuo (new-joe-kuo-6.21201) primitive polynomials and initial direction
+# numbers for dimensions 2..21: (degree s, coefficients a, m_1..m_s)
+JOE_KUO = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+MAX_DIMENSIONS = len(JOE_KUO) + 1
+
+
+def direction_numbers(dims, bits=SOBOL_BITS):
+    """(dims, bits) array of Sobol direction numbers v_k scaled to `bits` bits."""
+    if dims > MAX_DIMENSIONS:
+        raise ValueError(f"Sobol sequence supports at most {MAX_DIMENSIONS} dimensions")
+    v = np.zeros((dims, bits), dtype=np.uint64)
+    v[0] = [1 << (bits - 1 - k) for k in range(bits)]  # First dimension: van der Corput
+    for d in range(1, dims):
+        s, a, m = JOE_KUO[d - 1]
+        m = list(m)
+        for k in range(s, bits):
+            value = m[k - s] ^ (m[k - s] << s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    value ^= m[k - j] << j
+            m.append(value)
+        v[d] = [m[k] << (bits - 1 - k) for k in range(bits)]
+    return v
+
+
+def _scramble(v, rng, bits=SOBOL_BITS):
+    """Random linear matrix scrambling of the direction numbers of each dimension."""
+    dims = v.shape[0]
+    scrambled = np.zeros_like(v)
+    for d in range(dims):
+        # Lower-triangular GF(2) matrix with unit diagonal, bits indexed from the MSB
+        lower = np.tril(rng.integers(0, 2, size=(bits, bits), dtype=np.uint64), -1) | np.eye(bits, dtype=np.uint64)
+        bit_values = (v[d, None, :] >> (bits - 1 - np.arange(bits, dtype=np.uint64))[:, None]) & np.uint64(1)
+        new_bits = (lower @ bit_values) & np.uint64(1)  # (bits, bits): row i = bit i of each v_k
+        scrambled[d] = (new_bits << (bits - 1 - np.arange(bits, dtype=np.uint64))[:, None]).sum(axis=0)
+    return scrambled
+
+
+def sobol_points(n, dims, scramble=True, seed=None, bits=SOBOL_BITS):
+    """
+    First n points of a (scrambled) Sobol sequence in [0, 1)^dims.
+    Scrambling is a random linear matrix scramble plus a random digital shift;
+    n a power of two gives a balanced design.
+    """
+    v = direction_numbers(dims, bits)
+    shift = np.zeros(dims, dtype=np.uint64)
+    if scramble:
+        rng = np.random.default_rng(seed)
+        v = _scramble(v, rng, bits)
+        shift = rng.integers(0, 1 << bits, size=dims, dtype=np.uint64)
+    index = np.arange(n, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    x = np.zeros((n, dims), dtype=np.uint64)
+    for k in range(bits):
+        bit_set = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+        x[bit_set] ^= v[:, k]
+    return ((x ^ shift) / float(1 << bits)).astype(np.float64)
+
+
+def saltelli_design(ranges, n, seed=None):
+    """
+    Saltelli sample matrices for the given parameter ranges.
+    :param ranges: Dict of parameter name -> (low, high).
+    :param n: Base sample size.
+    :return: (names, A, B, AB) with A and B (n, d) and AB (d, n, d) in parameter units.
+    """
+    names = list(ranges)
+    low = np.array([ranges[name][0] for name in names], dtype=np.float64)
+    high = np.array([ranges[name][1] for name in names], dtype=np.float64)
+    d = len(names)
+    points = low + (high - low) * sobol_points(n, 2 * d, seed=seed).reshape(n, 2, d)
+    a, b = points[:, 0], points[:, 1]
+    ab = np.repeat(a[None], d, axis=0)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    return names, a, b, ab
+
+
+def sobol_indices(f_a, f_b, f_ab):
+    """
+    First-order and total Sobol indices.
+    :param f_a: (n,) outputs on A.
+    :param f_b: (n,) outputs on B.
+    :param f_ab: (d, n) outputs on AB_i.
+    :return: (first, total) arrays of length d.
+    """
+    variance = np.var(np.concatenate((f_a, f_b)))
+    if variance == 0:
+        return np.zeros(f_ab.shape[0]), np.zeros(f_ab.shape[0])
+    first = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    return first, total
+
+
+def _evaluate(task):
+    runner, fixed, params, seed, outputs = task
+    summary = summarize(runner(seed=seed, **fixed, **params))
+    return [summary[output] for output in outputs]
+
+
+def analyze(ranges, n=64, outputs=('packet_loss', 'mean_snr'), workers=None, seed=0,
+            runner=run_simulation, **fixed):
+    """
+    Sobol sensitivity analysis of run_simulation.
+    :param ranges: Dict of run_simulation argument -> (low, high), e.g.
+                   {'jamming_probability': (0, 1), 'noise_intensity': (0, 1)}.
+    :param n: Base sample size; n * (len(ranges) + 2) runs are executed.
+    :param outputs: Keys of simulation.summarize() to analyse.
+    :param workers: Worker processes (None: one per core).
+    :param seed: Seeds the scramble; row k of the design runs with seed + k.
+    :param fixed: Arguments shared by every run (jamming=True, routes=..., ...).
+    :return: Dict output -> parameter -> {'first', 'total'}, plus 'runs'.
+    """
+    names, a, b, ab = saltelli_design(ranges, n, seed)
+    matrices = [a, b] + list(ab)
+    tasks = [(runner, fixed, dict(zip(names, row.tolist())), seed + k, tuple(outputs))
+             for matrix in matrices for k, row in enumerate(matrix)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        values = np.array(list(pool.map(_evaluate, tasks, chunksize=max(len(tasks) // 64, 1))))
+    values = values.reshape(len(matrices), n, len(outputs))
+
+    result = {'runs': len(tasks)}
+    for o, output in enumerate(outputs):
+        first, total = sobol_indices(values[0, :, o], values[1, :, o], values[2:, :, o])
+        result[output] = {name: {'first': float(first[i]), 'total': float(total[i])}
+                          for i, name in enumerate(names)}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sobol sensitivity analysis of scenario parameters.")
+    parser.add_argument('config', help="JSON/YAML file with 'ranges' and optional 'samples', "
+                                       "'seed', 'outputs', 'workers' and 'fixed'")
+    parser.add_argument('--output-dir', default='results', help="Directory for sensitivity.json")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    ranges = {name: tuple(bounds) for name, bounds in config['ranges'].items()}
+    result = analyze(ranges, n=config.get('samples', 64),
+                     outputs=tuple(config.get('outputs', ('packet_loss', 'mean_snr'))),
+                     workers=config.get('workers'), seed=config.get('seed', 0), **config.get('fixed', {}))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, 'sensitivity.json'), 'w') as f:
+        json.dump(result, f, indent=2)
+    for output in result:
+        if output != 'runs':
+            for name, indices in result[output].items():
+                print(f"{output:>12} {name:>24}: S1={indices['first']:.3f} ST={indices['total']:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+import os
+import random
+import time
+import numpy as np
+from drone import Drone
+from route import RouteGenerator
+from gcs import GCS
+from adsbchannel import ADSBChannel
+from baseband import CalibrationTable
+from adsb_frame import encode_messages
+from direc_jammer import DirectionalJammer
+from spoofer import Spoofer
+from checkpoint import save_checkpoint, load_checkpoint
+from crn import CommonRandomNumbers
+from fading import FadingModel
+from terrain import TerrainModel
+
+# Define central location (e.g., Washington, D.C.)
+DEFAULT_CENTER = (38.8977, -77.0365)  # White House location
+
+DEFAULT_ROUTES = {"num_routes": 2, "waypoints_per_route": 5, "max_offset": 0.02}
+
+# Simulation scenarios
+DEFAULT_SCENARIOS = {
+    "No Attacks": {"jamming": False, "spoofing": False},
+    "Only Spoofing": {"jamming": False, "spoofing": True},
+    "Only Directional Jamming": {"jamming": True, "spoofing": False},
+    "Directional jamming wave Jamming and Spoofing": {"jamming": True, "spoofing": True},
+    "Aggressive Spoofing": {"jamming": False, "spoofing": True, "spoof_probability": 0.7}
+}
+
+
+def generate_routes(center=DEFAULT_CENTER, num_routes=2, waypoints_per_route=5, max_offset=0.02, optimize=False):
+    """Generate the routes flown in every scenario of a run."""
+    route_gen = RouteGenerator(center[0], center[1], num_routes=num_routes,
+                               waypoints_per_route=waypoints_per_route, max_offset=max_offset,
+                               optimize=optimize)
+    return route_gen.generate_routes()
+
+
+# Function to initialize drones
+def initialize_drones(routes):
+    return [
+        Drone(
+            id=f"{i+1}",
+            drone_type=f"type{i+1}",
+            acceleration_rate=2.0,
+            climb_rate=3.0,
+            speed=10.0 + i*5,
+            position_error=2.0,
+            altitude_error=1.0,
+            battery_consume_rate=0.05,
+            battery_capacity=10.0 + i*5,
+            route=routes[i]
+        )
+        for i in range(len(routes))
+    ]
+
+
+# Function to run a simulation scenario
+def run_simulation(jamming=False, spoofing=False, spoof_probability=0.3,
+                   jamming_probability=0.4, noise_intensity=0.8,
+                   routes=None, center=DEFAULT_CENTER, gcs=None, seed=None, receiver=None,
+                   checkpoint_path=None, checkpoint_interval=300.0, spectrum=None, relay=None,
+                   crn=False, sampler=None, exporter=None, frame_level=False, terrain=None,
+                   fading=None, corruption_model='threshold'):
+    """
+    Fly every drone along its route and push its position reports through the
+    channel, jammer and spoofer to the GCS. The fleet advances together in 1 s
+    ticks, and each drone still flying sends one report per tick.
+    :param routes: Routes to fly; generated around `center` if omitted.
+    :param gcs: GCS receiving the reports; a plain GCS at `center` if omitted.
+    :param seed: Seed for the global `random` generator.
+    :param receiver: Optional ReceiverQueue modelling the GCS decoder. When set, latency is
+                     propagation plus queueing delay in simulated time, overflow drops count
+                     as lost packets, and queue_delay, queue_drops and utilization are reported.
+    :param checkpoint_path: If set, state is saved there every `checkpoint_interval`
+                            seconds, and an existing checkpoint is resumed from. Every
+                            metric is computed in simulated time, so a resumed run
+                            returns exactly the results of an uninterrupted one.
+    :param spectrum: Optional SpectrumGrid over simulated time. When set, the jammer's
+                     interference and message loss only apply while it emits in the
+                     channel's band.
+    :param relay: Optional MeshNetwork, updated with the fleet's positions every tick.
+                  Reports whose direct link to the GCS is jammed or below the mesh's
+                  minimum SNR are forwarded over other drones when a relay path exists.
+                  Every hop goes through the channel and, in band, the jammer; a hop
+                  that loses or corrupts the report makes it a lost message.
+    :param crn: Common random numbers: channel errors and corruption offsets are drawn
+                per message from `seed`, so scenarios run with the same seed see the
+                same channel and differ only by what their attacks change. Needs a seed.
+    :param sampler: Optional ImportanceSampler. Channel corruption and jamming decisions are
+                    biased toward loss, and the result gains an 'importance' record (drone_id,
+                    lost and message_weight per message, plus run_weight) for
+                    importance.estimate_losses().
+    :param exporter: Optional SBSExporter or BeastExporter receiving every report that
+                     reaches the GCS, corrupted or not, in reception-time order; flushed at
+                     the end of the run. Not supported with checkpoint_path.
+    :param frame_level: Deliver reports to the GCS as DF17 frames: corrupted reports get
+                        bits flipped and are rejected by the GCS's CRC check instead of
+                        updating its picture with noisy positions.
+    :param terrain: Optional TerrainModel, or the directory of its SRTM tiles. The obstruction
+                    loss of every drone-GCS link is computed once per tick for the whole fleet.
+    :param fading: Optional FadingModel, or a dict of FadingModel arguments (seeded with
+                   `seed` unless it names its own). Every link's gain is drawn once per tick
+                   for the whole fleet.
+    :param corruption_model: How the channel decides that a frame is corrupted (see
+                             ADSBChannel): 'threshold', 'ber', a model such as a baseband
+                             CalibrationTable, or a dict of CalibrationTable arguments
+                             (snr_db and detection_rate lists) for scenario configs.
+    :return: Dict of metric series: packet_loss, snr, latency (propagation delay in ms)
+             and throughput (messages per simulated second).
+    """
+    gcs_pos = (center[0], center[1])
+    if crn and seed is None:
+        raise ValueError("Common random numbers need a seed shared by the compared runs")
+    if exporter is not None and checkpoint_path:
+        # A resumed run cannot take back what the exporter already sent
+        raise ValueError("An exporter cannot be used together with checkpointing")
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        state = load_checkpoint(checkpoint_path)
+        channel, jammer, spoofer, drones = state['channel'], state['jammer'], state['spoofer'], state['drones']
+        gcs, active, sim_clock = state['gcs'], state['active'], state['sim_clock']
+        total_messages, lost_messages = state['total_messages'], state['lost_messages']
+        packet_loss_over_time, snr_values, latency_values, throughput_values = state['metrics']
+        arrivals = state['arrivals']
+        importance = state.get('importance')
+        frame_rng = state.get('frame_rng')
+        if sampler is not None and channel.sampler is not None:
+            # The channel and jammer hold the saved copy of the sampler; continue the
+            # caller's from its state so the weights reach the caller and the results
+            vars(sampler).update(vars(channel.sampler))
+            channel.sampler = sampler
+            if jammer is not None:
+                jammer.sampler = sampler
+        sampler = channel.sampler
+    else:
+        if seed is not None:
+            random.seed(seed)
+        if routes is None:
+            routes = generate_routes(center, **DEFAULT_ROUTES)
+        gcs = gcs or GCS(center[0], center[1])
+
+        if sampler is not None:
+            sampler.reset()
+        if isinstance(terrain, str):
+            terrain = TerrainModel(terrain)
+        if isinstance(fading, dict):
+            fading = FadingModel(**{'seed': seed, **fading})
+        if isinstance(corruption_model, dict):
+            corruption_model = CalibrationTable(**corruption_model)
+        channel = ADSBChannel(spectrum=spectrum, crn=CommonRandomNumbers(seed) if crn else None,
+                              sampler=sampler, terrain=terrain, fading=fading, corruption_model=corruption_model)
+        jammer = DirectionalJammer(
+            target_position=gcs_pos,
+            jamming_probability=jamming_probability,
+            noise_intensity=noise_intensity,
+            sampler=sampler
+        ) if jamming else None
+        spoofer = Spoofer(spoof_probability=spoof_probability, fake_drone_id="FAKE-DRONE") if spoofing else None
+
+        drones = initialize_drones(routes)
+        active = [drone.id for drone in drones]  # Drones still flying
+        frame_rng = None
+        if frame_level:
+            frame_rng = np.random.default_rng(seed)
+            gcs.register_drones(active + ([spoofer.fake_drone_id] if spoofer else []))
+        # Simulated seconds since the start; every drone advances 1 s per tick
+        sim_clock = 0
+
+        total_messages = 0
+        lost_messages = 0
+        packet_loss_over_time = []
+        snr_values = []
+        latency_values = []
+        throughput_values = []
+        arrivals = []  # (message number, simulated send time, propagation delay) at the GCS
+        importance = {'drone_id': [], 'lost': [], 'message_weight': []} if sampler is not None else None
+    last_checkpoint = time.time()
+    by_id = {drone.id: drone for drone in drones}
+
+    while active:
+        if checkpoint_path and time.time() - last_checkpoint >= checkpoint_interval:
+            save_checkpoint(checkpoint_path, {
+                'channel': channel, 'jammer': jammer, 'spoofer': spoofer,
+                'drones': drones, 'gcs': gcs, 'active': active, 'sim_clock': sim_clock,
+                'total_messages': total_messages, 'lost_messages': lost_messages,
+                'metrics': (packet_loss_over_time, snr_values, latency_values, throughput_values),
+                'arrivals': arrivals, 'importance': importance, 'frame_rng': frame_rng
+            })
+            last_checkpoint = time.time()
+
+        # Advance the whole fleet first, so every report of the tick sees the same moment
+        flying = [drone_id for drone_id in active if by_id[drone_id].calculate_navigation(1) not in (-1, -2, 0)]
+        if relay is not None and len(flying) < len(active):
+            relay.remove(set(active).difference(flying))
+        active = flying
+        if not active:
+            break
+        sim_clock += 1
+        if exporter is not None:
+            exporter.advance(sim_clock)  # Every report of this tick arrives at sim_clock or later
+        positions = {drone_id: by_id[drone_id].current_position for drone_id in active}
+        if relay is not None:
+            relay.update(active, [positions[drone_id] for drone_id in active])
+        link_gains = None
+        if channel.terrain is not None or channel.fading is not None:
+            # One vectorised lookup for every link of the tick
+            link_gains = dict(zip(active, channel.link_gains_db(
+                active, [positions[drone_id] for drone_id in active], gcs_pos).tolist()))
+
+        for drone_id in active:
+            position = positions[drone_id]
+            original_message = {
+                'drone_id': drone_id,
+                'latitude': position[0],
+                'longitude': position[1],
+                'altitude': position[2],
+                'timestamp': sim_clock
+            }
+            report = dict(original_message) if relay is not None else None
+            if sampler is not None:
+                sampler.start_message()
+
+            received_message, delay_ns, corrupted, snr_db = channel.transmit(
+                original_message, gcs_pos, jammer=jammer, spoofer=spoofer, sim_time=sim_clock,
+                link_gain_db=None if link_gains is None else link_gains[drone_id]
+            )
+            total_messages += 1
+
+            jammed = False
+            in_band = spectrum is None or spectrum.jammed(sim_clock, channel.frequency)
+            if jamming and jammer and in_band:
+                received_message, jammed = jammer.jam_signal(received_message)
+
+            # Only reports the direct link could not carry go over the mesh: jammed ones
+            # and those below its SNR threshold, and every hop can fail in turn
+            if relay is not None and (jammed or snr_db < relay.min_snr_db):
+                hops = relay.relay(drone_id, position, -np.inf if received_message is None else snr_db)
+                if hops is not None:
+                    relayed = _relay_report(report, hops, positions, gcs_pos, channel,
+                                            jammer if jamming and in_band else None, sim_clock)
+                    if relayed is None:
+                        received_message, jammed = None, False
+                    else:
+                        received_message, delay_ns = relayed
+                        jammed, corrupted = False, False
+            if received_message is None:
+                lost_messages += 1
+                packet_loss_over_time.append((total_messages, lost_messages / total_messages * 100))
+                if importance is not None:
+                    _record_importance(importance, sampler, drone_id, True)
+                continue
+
+            if spoofing and spoofer:
+                received_message, spoofed = spoofer.spoof_message(received_message)
+
+            if receiver is not None:
+                arrivals.append((total_messages, sim_clock, delay_ns * 1e-9))
+            if exporter is not None:
+                exporter.add(received_message, sim_clock + delay_ns * 1e-9, corrupted, snr_db)
+
+            if frame_level:
+                # Bit errors from the channel's corruption decision; the GCS drops frames failing CRC
+                rng = frame_rng if channel.crn is None else np.random.default_rng(
+                    channel.crn.key(drone_id, sim_clock, 'frame'))
+                frame = channel.corrupt_frames(encode_messages([received_message], odd=[sim_clock & 1]),
+                                               [corrupted], rng=rng)
+                gcs.receive_frames(frame, [sim_clock], [snr_db])
+            else:
+                gcs.receive_update(
+                    received_message['drone_id'],
+                    (
+                        received_message['latitude'],
+                        received_message['longitude'],
+                        received_message['altitude']
+                    ),
+                    timestamp=sim_clock,
+                    snr_db=snr_db
+                )
+
+            if corrupted and not (jamming and jammed):
+                lost_messages += 1
+            if importance is not None:
+                _record_importance(importance, sampler, drone_id, corrupted and not (jamming and jammed))
+
+            packet_loss_over_time.append((total_messages, lost_messages / total_messages * 100))
+            snr_values.append((total_messages, snr_db))
+
+            # Latency (propagation, in milliseconds) and throughput (messages per
+            # simulated second) are in simulated time, so a resumed run reproduces them
+            latency_values.append((total_messages, delay_ns * 1e-6))
+            throughput_values.append((sim_clock, total_messages / sim_clock))
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if exporter is not None:
+        exporter.flush()
+    results = {
+        'packet_loss': packet_loss_over_time,
+        'snr': snr_values,
+        'latency': latency_values,
+        'throughput': throughput_values
+    }
+    if receiver is not None:
+        _apply_receiver(results, receiver, arrivals)
+    if importance is not None:
+        results['importance'] = {**importance, 'run_weight': sampler.run_weight}
+    return results
+
+
+def _relay_report(report, hops, positions, gcs_pos, channel, jammer, sim_clock):
+    """
+    Forward a report along a relay path, each hop through the channel and the jammer.
+    :param hops: Drone ids from the sender to 'GCS', as returned by MeshNetwork.relay.
+    :param positions: Current position of every flying drone.
+    :param jammer: Jammer acting on the hops, or None.
+    :return: (report, total propagation delay in ns), or None if a hop lost or corrupted it.
+    """
+    delay_ns = 0.0
+    for sender, destination in zip(hops[:-1], hops[1:]):
+        lat, lon, alt = positions[sender]
+        target = gcs_pos if destination == 'GCS' else tuple(positions[destination][:2])
+        # Keyed by the link, so common random numbers differ between hops
+        hop = {**report, 'drone_id': (report['drone_id'], sender, destination),
+               'latitude': lat, 'longitude': lon, 'altitude': alt}
+        received, hop_delay_ns, corrupted, _ = channel.transmit(hop, target, jammer=jammer, sim_time=sim_clock)
+        if corrupted:
+            return None
+        if jammer is not None:
+            _, jammed = jammer.jam_signal(received)
+            if jammed:
+                return None
+        delay_ns += hop_delay_ns
+    return report, delay_ns
+
+
+def _record_importance(importance, sampler, drone_id, lost):
+    importance['drone_id'].append(drone_id)
+    importance['lost'].append(lost)
+    importance['message_weight'].append(sampler.message_weight)
+
+
+def _apply_receiver(results, receiver, arrivals):
+    """
+    Queue every report that reached the GCS through the receiver model in
+    simulated time. The GCS is updated as reports are generated, so this runs
+    once all arrival times are known; overflow drops therefore affect the metrics
+    but not the positions the GCS already displayed.
+    """
+    if not arrivals:
+        results.update(queue_delay=[], queue_drops=0, utilization=0.0)
+        return
+    numbers, send_times, propagation = (np.asarray(column) for column in zip(*arrivals))
+    queue = receiver.process(send_times + propagation)
+    accepted = ~queue['dropped']
+
+    latency_ms = (propagation + queue['queue_delay'] + receiver.service_time) * 1000
+    results['latency'] = list(zip(numbers[accepted].tolist(), latency_ms[accepted].tolist()))
+    results['queue_delay'] = list(zip(numbers[accepted].tolist(), (queue['queue_delay'][accepted] * 1000).tolist()))
+    results['queue_drops'] = int(queue['dropped'].sum())
+    results['utilization'] = queue['utilization']
+
+    # Rebuild the packet-loss series with overflow drops counted as losses
+    counts, loss_pct = (np.asarray(column, dtype=np.float64) for column in zip(*results['packet_loss']))
+    lost = np.diff(np.round(loss_pct * counts / 100), prepend=0) > 0
+    lost[numbers[queue['dropped']] - 1] = True
+    results['packet_loss'] = list(zip(counts.astype(int).tolist(),
+                                      (np.cumsum(lost) / counts * 100).tolist()))
+
+
+def summarize(data):
+    """Reduce the metric series of one scenario run to scalar statistics."""
+    def mean_of(series):
+        return float(np.mean([value for _, value in series])) if series else float('nan')
+
+    return {
+        'messages': data['packet_loss'][-1][0] if data['packet_loss'] else 0,
+        'packet_loss': data['packet_loss'][-1][1] if data['packet_loss'] else float('nan'),
+        'mean_snr': mean_of(data['snr']),
+        'mean_latency': mean_of(data['latency']),
+        'mean_throughput': mean_of(data['throughput']),
+        **({'queue_drops': data['queue_drops'], 'utilization': data['utilization'],
+            'mean_queue_delay': mean_of(data['queue_delay'])} if 'queue_drops' in data else {})
+    }
@@ -0,0 +1,123 @@
+"""
+Time-frequency spectrum occupancy grid of the jammers in a run.
+
+Every jammer's schedule (hops, pulses or a continuous carrier) is rasterised
+once into a (time slot x frequency bin) array of interference power in mW.
+The array is stored as a running sum over frequency, so the interference a
+transmission sees in its own band and time slot is two lookups and a
+difference, and a batch of transmissions is one fancy-indexing call.
+"""
+import numpy as np
+
+
+class SpectrumGrid:
+    """
+    Interference power received at the GCS per time slot and frequency bin.
+    """
+    def __init__(self, duration, time_step=0.1, freq_min=900e6, freq_max=1100e6, freq_step=1e6):
+        """
+        :param duration: Simulated seconds covered; later times use the last slot.
+        :param time_step: Slot length in seconds.
+        :param freq_min: Lower edge of the first frequency bin in Hz.
+        :param freq_max: Upper edge of the last frequency bin in Hz.
+        :param freq_step: Bin width in Hz.
+        """
+        self.duration = duration
+        self.time_step = time_step
+        self.freq_min = freq_min
+        self.freq_step = freq_step
+        self.num_slots = max(int(np.ceil(duration / time_step)), 1)
+        self.num_bins = max(int(np.ceil((freq_max - freq_min) / freq_step)), 1)
+        self.power_mw = np.zeros((self.num_slots, self.num_bins))
+        self._cumulative = None  # Running sum over frequency, rebuilt after changes
+
+    def _spectral_rows(self, center_frequencies, bandwidth):
+        """Fraction of an emitter's power falling in each bin, per center frequency."""
+        edges = self.freq_min + self.freq_step * np.arange(self.num_bins + 1)
+        low = np.asarray(center_frequencies, dtype=np.float64)[:, None] - bandwidth / 2
+        high = low + bandwidth
+        overlap = np.clip(np.minimum(edges[None, 1:], high) - np.maximum(edges[None, :-1], low), 0, None)
+        return overlap / bandwidth
+
+    def add_emission(self, starts, ends, center_frequencies, bandwidth, power_dbm):
+        """
+        Add emission windows to the grid.
+        :param starts: Window start times in seconds.
+        :param ends: Window end times in seconds.
+        :param center_frequencies: Center frequency of each window in Hz.
+        :param bandwidth: Emission bandwidth in Hz.
+        :param power_dbm: Received interference power in dBm.
+        """
+        starts = np.clip(np.asarray(starts, dtype=np.float64), 0, self.num_slots * self.time_step)
+        ends = np.clip(np.asarray(ends, dtype=np.float64), 0, self.num_slots * self.time_step)
+        keep = ends > starts
+        starts, ends = starts[keep], ends[keep]
+        if starts.size == 0:
+            return
+        rows = self._spectral_rows(np.broadcast_to(center_frequencies, keep.shape)[keep], bandwidth)
+
+        # Every slot a window touches, weighted by the fraction of the slot it covers
+        first = np.floor(starts / self.time_step).astype(np.int64)
+        last = np.minimum(np.ceil(ends / self.time_step).astype(np.int64), self.num_slots) - 1
+        counts = last - first + 1
+        window = np.repeat(np.arange(starts.size), counts)
+        slot = first[window] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        covered = (np.minimum(ends[window], (slot + 1) * self.time_step)
+                   - np.maximum(starts[window], slot * self.time_step)) / self.time_step
+        # Edges on a slot boundary can round into the neighbouring slot; it gets nothing
+        covered[covered < 1e-9] = 0.0
+
+        np.add.at(self.power_mw, slot, (10 ** (power_dbm / 10)) * covered[:, None] * rows[window])
+        self._cumulative = None
+
+    def add_jammer(self, jammer, frequency=1090e6, bandwidth=2e6, rng=None):
+        """
+        Rasterise a jammer's schedule: hops for jammers with hop_schedule, pulse
+        windows at `frequency` for jammers with pulse_schedule, otherwise a
+        continuous carrier at `frequency`.
+        :param rng: random.Random-like source passed to the schedule methods.
+        """
+        kwargs = {'rng': rng} if rng is not None else {}
+        power_dbm = jammer.jamming_signal_power()
+        if hasattr(jammer, 'hop_schedule'):
+            hop_times, frequencies = jammer.hop_schedule(self.duration, **kwargs)
+            ends = np.append(hop_times[1:], self.duration)
+            self.add_emission(hop_times, ends, frequencies, bandwidth, power_dbm)
+        elif hasattr(jammer, 'pulse_schedule'):
+            starts, ends = jammer.pulse_schedule(self.duration, **kwargs)
+            self.add_emission(starts, ends, frequency, bandwidth, power_dbm)
+        else:
+            self.add_emission([0.0], [self.duration], frequency, bandwidth, power_dbm)
+
+    def _cumulative_power(self):
+        if self._cumulative is None:
+            self._cumulative = np.zeros((self.num_slots, self.num_bins + 1))
+            np.cumsum(self.power_mw, axis=1, out=self._cumulative[:, 1:])
+        return self._cumulative
+
+    def _band_edge(self, cumulative, slots, frequency):
+        # Power density is uniform within a bin, so the running sum is linear between edges
+        x = np.clip((frequency - self.freq_min) / self.freq_step, 0, self.num_bins)
+        i = np.minimum(np.floor(x).astype(np.int64), self.num_bins - 1)
+        return cumulative[slots, i] + (x - i) * (cumulative[slots, i + 1] - cumulative[slots, i])
+
+    def interference_mw(self, times, frequencies, bandwidth=1e6):
+        """
+        Interference power in mW within [f - bandwidth/2, f + bandwidth/2] during the
+        slot of each time. Accepts scalars or arrays.
+        """
+        cumulative = self._cumulative_power()
+        times = np.asarray(times, dtype=np.float64)
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        slots = np.clip((times / self.time_step).astype(np.int64), 0, self.num_slots - 1)
+        return (self._band_edge(cumulative, slots, frequencies + bandwidth / 2)
+                - self._band_edge(cumulative, slots, frequencies - bandwidth / 2))
+
+    def interference_dbm(self, times, frequencies, bandwidth=1e6):
+        """interference_mw in dBm (-inf where the band is clear)."""
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(self.interference_mw(times, frequencies, bandwidth))
+
+    def jammed(self, times, frequencies, bandwidth=1e6):
+        """Whether any jammer emits in the band during each time slot."""
+        return self.interference_mw(times, frequencies, bandwidth) > 0
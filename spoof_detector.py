@@ -0,0 +1,133 @@
+from collections import deque, namedtuple
+from adsbchannel import ADSBChannel
+
+Alert = namedtuple('Alert', ['timestamp', 'drone_id', 'kind', 'detail'])
+
+
+class _DroneState:
+    """Fixed-size per-drone state: limits plus the last plausible report."""
+    __slots__ = ('max_speed', 'max_climb_rate', 'time', 'lat', 'lon', 'alt', 'rejected')
+
+    def __init__(self, max_speed, max_climb_rate):
+        self.max_speed = max_speed
+        self.max_climb_rate = max_climb_rate
+        self.time = None
+        self.lat = self.lon = self.alt = None
+        self.rejected = 0
+
+
+class SpoofDetector:
+    """
+    Streaming plausibility checks on position reports arriving at the GCS.
+
+    Every report is compared only against the last plausible report of the same
+    drone, so the cost per message is constant regardless of fleet size. Checks:
+    unknown ids, duplicated ids (two emitters claiming one id), implied horizontal
+    speed, climb rate, and SNR too strong for the claimed distance.
+    """
+    def __init__(self, gcs_position, channel=None, tx_power_dbm=50, bandwidth_hz=1e6,
+                 speed_tolerance=1.5, position_slack=10.0, altitude_slack=5.0,
+                 duplicate_interval=0.05, snr_tolerance_db=10.0, resync_after=5, max_alerts=10000):
+        """
+        :param gcs_position: (lat, lon) of the receiving GCS.
+        :param channel: ADSBChannel whose link budget predicts the expected SNR.
+        :param tx_power_dbm: Transmit power assumed for genuine drones.
+        :param bandwidth_hz: Receiver bandwidth used for the noise floor.
+        :param speed_tolerance: Multiplier on the registered limits before alerting.
+        :param position_slack: Horizontal position error allowance in meters.
+        :param altitude_slack: Vertical position error allowance in meters.
+        :param duplicate_interval: Reports from one id closer than this (seconds) with
+                                   different positions are flagged as duplicates.
+        :param snr_tolerance_db: Allowed excess of measured over expected SNR.
+        :param resync_after: Consecutive implausible reports after which the reference is reset.
+        :param max_alerts: Number of most recent alerts retained.
+        """
+        self.gcs_lat, self.gcs_lon = gcs_position[0], gcs_position[1]
+        self.channel = channel or ADSBChannel()
+        self.speed_tolerance = speed_tolerance
+        self.position_slack = position_slack
+        self.altitude_slack = altitude_slack
+        self.duplicate_interval = duplicate_interval
+        self.snr_tolerance_db = snr_tolerance_db
+        self.resync_after = resync_after
+
+        # Everything in the link budget except path loss is constant per detector
+        noise_power_dbm = self.channel.thermal_noise_power(bandwidth_hz)
+        self._snr_offset_db = float(tx_power_dbm - (noise_power_dbm + self.channel.noise_figure_db))
+
+        self.states = {}
+        self.alerts = deque(maxlen=max_alerts)
+        self.alert_counts = {}
+
+    def register_drone(self, drone_id, max_speed, max_climb_rate):
+        """Declare a legitimate drone and its kinematic limits (m/s)."""
+        self.states[drone_id] = _DroneState(max_speed, max_climb_rate)
+
+    def register_fleet(self, drones):
+        """Register every Drone of a fleet using its speed and climb rate."""
+        for drone in drones:
+            self.register_drone(drone.id, drone.speed, drone.climb_rate)
+
+    def expected_snr(self, lat, lon):
+        """Free-space SNR a genuine drone at (lat, lon) would produce at the GCS."""
+        distance = self.channel.haversine_distance(lat, lon, self.gcs_lat, self.gcs_lon)
+        return self._snr_offset_db - float(self.channel.free_space_path_loss(distance))
+
+    def _raise(self, alerts, timestamp, drone_id, kind, detail):
+        alert = Alert(timestamp, drone_id, kind, detail)
+        alerts.append(alert)
+        self.alerts.append(alert)
+        self.alert_counts[kind] = self.alert_counts.get(kind, 0) + 1
+
+    def check(self, drone_id, position, timestamp, snr_db=None):
+        """
+        Run all checks on one report.
+        :param position: Claimed (lat, lon, alt).
+        :param timestamp: Report time in seconds (simulation or wall clock).
+        :param snr_db: Measured SNR of the report, if known.
+        :return: List of Alerts raised by this report (empty if plausible).
+        """
+        alerts = []
+        lat, lon, alt = position[0], position[1], position[2]
+
+        if snr_db is not None:
+            expected = self.expected_snr(lat, lon)
+            # Jamming legitimately lowers SNR, so only a signal stronger than the
+            # claimed distance allows is suspicious (a nearby transmitter).
+            if snr_db > expected + self.snr_tolerance_db:
+                self._raise(alerts, timestamp, drone_id, 'snr_inconsistent',
+                            {'measured_db': float(snr_db), 'expected_db': expected})
+
+        state = self.states.get(drone_id)
+        if state is None:
+            self._raise(alerts, timestamp, drone_id, 'unknown_id', None)
+            return alerts
+
+        if state.time is not None:
+            dt = timestamp - state.time
+            horizontal = self.channel.haversine_distance(state.lat, state.lon, lat, lon)
+            vertical = abs(alt - state.alt)
+
+            if dt < self.duplicate_interval:
+                if horizontal > self.position_slack or vertical > self.altitude_slack:
+                    self._raise(alerts, timestamp, drone_id, 'duplicate_id',
+                                {'interval_s': dt, 'separation_m': float(horizontal)})
+            else:
+                max_horizontal = state.max_speed * self.speed_tolerance * dt + self.position_slack
+                if horizontal > max_horizontal:
+                    self._raise(alerts, timestamp, drone_id, 'implied_speed',
+                                {'speed_mps': float(horizontal / dt), 'limit_mps': state.max_speed})
+                max_vertical = state.max_climb_rate * self.speed_tolerance * dt + self.altitude_slack
+                if vertical > max_vertical:
+                    self._raise(alerts, timestamp, drone_id, 'climb_rate',
+                                {'climb_mps': vertical / dt, 'limit_mps': state.max_climb_rate})
+
+        kinematic = any(a.kind != 'snr_inconsistent' for a in alerts)
+        if kinematic and state.rejected < self.resync_after:
+            state.rejected += 1
+        else:
+            # Only plausible reports move the reference, unless the drone has
+            # genuinely relocated and every report disagrees with the stale one.
+            state.time, state.lat, state.lon, state.alt = timestamp, lat, lon, alt
+            state.rejected = 0
+        return alerts
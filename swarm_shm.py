@@ -0,0 +1,271 @@
+"""
+Multi-process swarm stepping over shared memory.
+
+The state of every drone lives in one multiprocessing.shared_memory block laid
+out as NumPy arrays (SwarmArrays). Worker processes each own a contiguous shard
+of drones and advance it with a vectorised version of Drone.calculate_navigation,
+in lockstep with the parent through a barrier. The parent, the GCS or any other
+process attached to the block reads positions straight from the arrays, so no
+drone state is ever pickled between processes.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from drone import CLIMB_ENERGY_FACTOR
+from route_store import RouteStore, RouteView
+
+EARTH_RADIUS = 6371000
+
+# Per-drone arrays: name, trailing shape, dtype
+DRONE_FIELDS = (
+    ('position', (3,), np.float64),
+    ('offset', (3,), np.float64),
+    ('speed', (), np.float64),
+    ('climb_rate', (), np.float64),
+    ('position_error', (), np.float64),
+    ('altitude_error', (), np.float64),
+    ('battery_consume_rate', (), np.float64),
+    ('battery', (), np.float64),
+    ('route_start', (), np.int64),
+    ('route_length', (), np.int64),
+    ('route_index', (), np.int64),
+    ('status', (), np.int64),  # Last calculate_navigation status; only 1 keeps moving
+)
+
+
+def _layout(num_drones, num_waypoints):
+    fields = [(name, (num_drones,) + shape, dtype) for name, shape, dtype in DRONE_FIELDS]
+    fields += [('waypoints', (num_waypoints, 3), np.float64), ('control', (2,), np.float64)]
+    layout, offset = [], 0
+    for name, shape, dtype in fields:
+        layout.append((name, shape, dtype, offset))
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8  # 8-byte aligned
+    return layout, max(offset, 8)
+
+
+class SwarmArrays:
+    """
+    NumPy views of a swarm's shared-memory block. Created by the owner and
+    attached by name everywhere else.
+    """
+    def __init__(self, num_drones, num_waypoints, name=None, shared_tracker=False):
+        """
+        :param name: Name of an existing block to attach to; a new block is created if omitted.
+        :param shared_tracker: The attaching process shares the owner's resource tracker:
+                               the owner itself or one of its multiprocessing children.
+        """
+        layout, size = _layout(num_drones, num_waypoints)
+        self.num_drones = num_drones
+        self.num_waypoints = num_waypoints
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        elif sys.version_info >= (3, 13):
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Before 3.13 attaching registers the block with the process's resource tracker,
+            # which unlinks it under the owner (and warns of a leak) when the process exits.
+            # In the owner's tracker that only re-adds an existing entry, and unregistering
+            # would drop the owner's, so only processes with their own tracker unregister
+            self.shm = shared_memory.SharedMemory(name=name)
+            if not shared_tracker:
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self._fields = [name for name, _, _, _ in layout]
+        for field, shape, dtype, offset in layout:
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+
+    @property
+    def spec(self):
+        """Arguments that attach another process to this block."""
+        return self.num_drones, self.num_waypoints, self.shm.name
+
+    def close(self):
+        for field in self._fields:
+            delattr(self, field)  # Views must go before the buffer can be released
+        self.shm.close()
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = (np.sin(np.radians(lat2 - lat1) / 2) ** 2
+         + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def step_navigation(arrays, lo, hi, delta_time):
+    """
+    Advance drones lo..hi-1 by delta_time seconds, exactly as
+    Drone.calculate_navigation does one drone at a time.
+    """
+    status = arrays.status[lo:hi]
+    idx = lo + np.flatnonzero(status == 1)
+    if idx.size == 0:
+        return
+    a = arrays
+    current = a.position[idx]
+    target = a.waypoints[a.route_start[idx] + a.route_index[idx]] + a.offset[idx]
+    lat1, lon1, alt1 = current.T
+    lat2, lon2, alt2 = target.T
+
+    distance = _haversine(lat1, lon1, lat2, lon2)
+    alt_difference = alt2 - alt1
+    move_distance = np.minimum(a.speed[idx] * delta_time, distance)
+    move_altitude = (np.minimum(a.climb_rate[idx] * delta_time, np.abs(alt_difference))
+                     * np.where(alt_difference > 0, 1, -1))
+    ratio = np.where(distance > 0, move_distance / np.where(distance > 0, distance, 1), 0)
+    new_lat = lat1 + ratio * (lat2 - lat1)
+    new_lon = lon1 + ratio * (lon2 - lon1)
+    new_alt = alt1 + move_altitude
+
+    energy_used = (a.battery_consume_rate[idx] * (move_distance / a.speed[idx])
+                   + np.abs(move_altitude) * CLIMB_ENERGY_FACTOR)
+    battery = np.maximum(0, a.battery[idx] - energy_used)
+    a.battery[idx] = battery
+    depleted = battery == 0
+
+    arrived = (~depleted & (_haversine(new_lat, new_lon, lat2, lon2) <= a.position_error[idx])
+               & (np.abs(new_alt - alt2) <= a.altitude_error[idx]))
+    moving = ~depleted & ~arrived
+    a.position[idx[moving]] = np.stack((new_lat, new_lon, new_alt), axis=1)[moving]
+    a.position[idx[arrived]] = target[arrived]
+    a.route_index[idx[arrived]] += 1
+    finished = arrived & (a.route_index[idx] >= a.route_length[idx])
+    a.status[idx[depleted]] = -2
+    a.status[idx[finished]] = 0
+
+
+def _worker(spec, lo, hi, barrier, timeout):
+    arrays = SwarmArrays(*spec, shared_tracker=True)
+    try:
+        while True:
+            barrier.wait(timeout)  # Tick start
+            if arrays.control[1]:
+                break
+            try:
+                step_navigation(arrays, lo, hi, arrays.control[0])
+            except BaseException:
+                barrier.abort()  # Fail the tick now rather than at the parent's timeout
+                raise
+            barrier.wait(timeout)  # Tick done
+    except threading.BrokenBarrierError:
+        pass  # The parent gave up on the swarm, or another worker failed
+    finally:
+        arrays.close()
+
+
+class SharedSwarm:
+    """
+    A fleet of drones stepped in lockstep by worker processes over shared memory.
+    """
+    def __init__(self, drones, workers=None, timeout=60.0):
+        """
+        :param drones: Drone objects giving the initial state; their routes may be
+                       lists of waypoints or RouteViews.
+        :param workers: Worker processes; os.cpu_count() if omitted, 0 steps in-process.
+        :param timeout: Seconds anyone waits at the tick barrier. A worker that fails or
+                        hangs, or a parent that neither ticks nor closes for this long,
+                        breaks the barrier: the workers exit and tick() raises RuntimeError.
+        """
+        store = RouteStore()
+        route_ids, offsets = [], []
+        for drone in drones:
+            route = drone.route
+            if isinstance(route, RouteView):
+                route_ids.append(store.add(route.store.points(route.route_id)))
+                offsets.append(route.offset or (0.0, 0.0, 0.0))
+            else:
+                route_ids.append(store.add(route))
+                offsets.append((0.0, 0.0, 0.0))
+
+        self.ids = [drone.id for drone in drones]
+        self.arrays = a = SwarmArrays(len(drones), max(store.size, 1))
+        a.waypoints[:store.size] = store.waypoints[:store.size]
+        a.offset[:] = offsets
+        a.route_start[:] = np.asarray(store.starts)[route_ids] if drones else 0
+        a.route_length[:] = np.asarray(store.lengths)[route_ids] if drones else 0
+        for field in ('speed', 'climb_rate', 'position_error', 'altitude_error', 'battery_consume_rate'):
+            getattr(a, field)[:] = [getattr(drone, field) for drone in drones]
+        a.battery[:] = [drone.battery_remaining for drone in drones]
+        a.route_index[:] = [drone.route_index for drone in drones]
+        a.position[:] = [drone.current_position or (np.nan, np.nan, np.nan) for drone in drones]
+        a.status[:] = np.where((a.route_length >= 2) & (a.route_index < a.route_length), 1, -1)
+        a.status[a.battery <= 0] = -2
+        a.control[:] = 0
+
+        workers = os.cpu_count() if workers is None else workers
+        self.timeout = timeout
+        self.processes = []
+        self.barrier = None
+        self.closed = False
+        if workers > 0:
+            bounds = np.linspace(0, len(drones), workers + 1).astype(int)
+            self.barrier = multiprocessing.Barrier(workers + 1)
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                process = multiprocessing.Process(target=_worker,
+                                                  args=(a.spec, int(lo), int(hi), self.barrier, timeout),
+                                                  daemon=True)
+                process.start()
+                self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def positions(self):
+        """(N, 3) shared array of current positions, updated in place every tick."""
+        return self.arrays.position
+
+    @property
+    def status(self):
+        """(N,) shared array of navigation status codes (see Drone.calculate_navigation)."""
+        return self.arrays.status
+
+    def tick(self, delta_time=1.0):
+        """Advance every drone by delta_time seconds; returns the number still moving."""
+        if self.barrier is None:
+            if self.processes:
+                raise RuntimeError("Swarm workers were stopped after a failed tick")
+            step_navigation(self.arrays, 0, self.arrays.num_drones, delta_time)
+        else:
+            # A killed worker never acknowledges its wake-up, which would block the
+            # barrier's release without timeout, so liveness is checked first
+            if not all(process.is_alive() for process in self.processes):
+                self._stop_workers()
+                raise RuntimeError("A swarm worker exited")
+            self.arrays.control[0] = delta_time
+            try:
+                self.barrier.wait(self.timeout)
+                self.barrier.wait(self.timeout)
+            except threading.BrokenBarrierError:
+                self._stop_workers()
+                raise RuntimeError("Swarm workers failed or did not finish the tick within %s s"
+                                   % self.timeout) from None
+        return int(np.count_nonzero(self.arrays.status == 1))
+
+    def _stop_workers(self):
+        for process in self.processes:
+            process.terminate()
+            process.join()
+        self.barrier = None
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        if self.barrier is not None:
+            if all(process.is_alive() for process in self.processes):
+                self.arrays.control[1] = 1
+                try:
+                    self.barrier.wait(self.timeout)
+                    for process in self.processes:
+                        process.join(self.timeout)
+                except threading.BrokenBarrierError:
+                    pass
+            self._stop_workers()
+        if not self.closed:
+            self.arrays.close()
+            self.arrays.shm.unlink()
+            self.closed = True
@@ -1,5 +1,7 @@
 import random
 import time
+import numpy as np
+from importance import decide
 
 class SweepingJammer:
     """
@@ -12,7 +14,8 @@ class SweepingJammer:
         noise_intensity=0.7,
         jamming_power_dbm=-70,
         hop_interval=2.0,
-        frequency_list=None
+        frequency_list=None,
+        sampler=None
     ):
         """
         :param jamming_probability: Probability of blocking each message entirely.
@@ -20,10 +23,12 @@ class SweepingJammer:
         :param jamming_power_dbm: Power level of the jamming signal (in dBm).
         :param hop_interval: Time in seconds between frequency hops.
         :param frequency_list: List of possible frequencies for the jammer to hop through.
+        :param sampler: Optional ImportanceSampler biasing the jamming decisions toward loss.
         """
         self.jamming_probability = jamming_probability
         self.noise_intensity = noise_intensity
         self.jamming_power_dbm = jamming_power_dbm
+        self.sampler = sampler
         self.hop_interval = hop_interval
         self.frequency_list = frequency_list or [907e6, 915e6, 920e6, 925e6]
         self.current_frequency = random.choice(self.frequency_list)
@@ -36,9 +41,9 @@ class SweepingJammer:
         """
         self._maybe_hop_frequency()
 
-        if random.random() < self.jamming_probability:
+        if decide(self.jamming_probability, self.sampler):
             print(f"[SweepingJammer] Jamming on frequency {self.current_frequency}")
-            if random.random() < self.noise_intensity:
+            if decide(self.noise_intensity, self.sampler):
                 print("[SweepingJammer] Message completely lost!")
                 return None, True
             else:
@@ -52,6 +57,18 @@ class SweepingJammer:
         """Returns the power of the jamming signal in dBm."""
         return self.jamming_power_dbm
 
+    def hop_schedule(self, duration, rng=random):
+        """
+        Precompute the hops of a run in simulated time, starting from the current frequency.
+        :param duration: Simulated seconds to cover.
+        :param rng: random.Random-like source of the hop choices.
+        :return: (hop_times, frequencies) arrays; frequencies[k] is held from hop_times[k]
+                 until the next hop.
+        """
+        hop_times = np.arange(0, duration, self.hop_interval)
+        frequencies = [self.current_frequency] + [rng.choice(self.frequency_list) for _ in hop_times[1:]]
+        return hop_times, np.asarray(frequencies, dtype=np.float64)
+
     def _maybe_hop_frequency(self):
         """
         Switches to a different frequency if the hop interval has elapsed.
@@ -0,0 +1,186 @@
+"""
+Terrain line-of-sight and obstruction loss from SRTM elevation tiles.
+
+Tiles are the usual 1x1 degree .hgt files (e.g. N38W078.hgt: big-endian int16
+heights in metres, rows from north to south, 1201 or 3601 samples per side).
+They are memory-mapped on first use and kept in a small LRU cache. Links are
+checked in bulk by sampling terrain along every ray, and the loss of the most
+obstructing point is taken as a single knife edge (ITU-R P.526).
+"""
+import math
+import os
+from collections import OrderedDict
+import numpy as np
+
+EARTH_RADIUS = 6371000.0
+EFFECTIVE_EARTH_FACTOR = 4.0 / 3.0  # Standard atmospheric refraction
+HGT_VOID = -32768
+
+
+def tile_name(lat_index, lon_index):
+    """SRTM file name of the tile whose south-west corner is (lat_index, lon_index)."""
+    return (f"{'N' if lat_index >= 0 else 'S'}{abs(lat_index):02d}"
+            f"{'E' if lon_index >= 0 else 'W'}{abs(lon_index):03d}.hgt")
+
+
+def knife_edge_loss(v):
+    """Diffraction loss in dB of a single knife edge with Fresnel-Kirchhoff parameter v."""
+    v = np.asarray(v, dtype=np.float64)
+    loss = 6.9 + 20 * np.log10(np.sqrt((v - 0.1) ** 2 + 1) + v - 0.1)
+    return np.where(v > -0.78, loss, 0.0)
+
+
+class TerrainModel:
+    """
+    Line-of-sight and diffraction loss over DEM terrain. Antenna heights are
+    given above ground level; missing tiles are treated as sea level.
+    """
+    def __init__(self, tile_dir, max_tiles=16, samples_per_ray=64, frequency=1090e6,
+                 receiver_height=10.0, position_quantum=1e-5, altitude_quantum=1.0, memo_size=100000):
+        """
+        :param tile_dir: Directory of .hgt tiles.
+        :param max_tiles: Tiles kept memory-mapped at once.
+        :param samples_per_ray: Terrain samples taken between the two ends of a link.
+        :param frequency: Carrier frequency in Hz.
+        :param receiver_height: GCS antenna height above ground in metres.
+        :param position_quantum: Link end points are rounded to this many degrees before
+                                 lookup, so nearly identical geometry is computed once.
+        :param altitude_quantum: Same rounding for heights, in metres.
+        :param memo_size: Link results kept in the memo.
+        """
+        self.tile_dir = tile_dir
+        self.max_tiles = max_tiles
+        self.samples_per_ray = samples_per_ray
+        self.wavelength = 3e8 / frequency
+        self.receiver_height = receiver_height
+        self.position_quantum = position_quantum
+        self.altitude_quantum = altitude_quantum
+        self.memo_size = memo_size
+        self._tiles = OrderedDict()
+        self._memo = OrderedDict()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def __getstate__(self):
+        # Memory maps are reopened on demand rather than pickled as arrays
+        state = self.__dict__.copy()
+        state['_tiles'] = OrderedDict()
+        return state
+
+    def _tile(self, lat_index, lon_index):
+        key = (lat_index, lon_index)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        path = os.path.join(self.tile_dir, tile_name(lat_index, lon_index))
+        if os.path.exists(path):
+            side = int(math.isqrt(os.path.getsize(path) // 2))
+            tile = np.memmap(path, dtype='>i2', mode='r', shape=(side, side))
+        else:
+            tile = None
+        self._tiles[key] = tile
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def elevation(self, lat, lon):
+        """Bilinearly interpolated ground elevation in metres at arrays of points."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        lat_index = np.floor(lat).astype(np.int64)
+        lon_index = np.floor(lon).astype(np.int64)
+        heights = np.zeros(lat.shape)
+        keys = lat_index * 1000 + lon_index
+        for key in np.unique(keys):
+            in_tile = keys == key
+            tile = self._tile(int(lat_index[in_tile][0]), int(lon_index[in_tile][0]))
+            if tile is None:
+                continue
+            last = tile.shape[0] - 1
+            # Row 0 is the northern edge of the tile
+            row = (lat_index[in_tile] + 1 - lat[in_tile]) * last
+            col = (lon[in_tile] - lon_index[in_tile]) * last
+            r0 = np.clip(np.floor(row).astype(np.int64), 0, last - 1)
+            c0 = np.clip(np.floor(col).astype(np.int64), 0, last - 1)
+            fr, fc = row - r0, col - c0
+            corners = [np.asarray(tile[r0 + dr, c0 + dc], dtype=np.float64) for dr in (0, 1) for dc in (0, 1)]
+            for corner in corners:
+                corner[corner == HGT_VOID] = 0.0
+            heights[in_tile] = ((1 - fr) * ((1 - fc) * corners[0] + fc * corners[1])
+                                + fr * ((1 - fc) * corners[2] + fc * corners[3]))
+        return heights
+
+    def obstruction(self, tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height):
+        """
+        Line of sight and obstruction loss of many links at once.
+        Heights are above ground level at each end.
+        :return: (line_of_sight bool array, loss_db array)
+        """
+        tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height)))
+        links = tx_lat.shape
+        tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height = (
+            a.reshape(-1, 1) for a in (tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height))
+
+        # Equirectangular link length; links here are tens of kilometres at most
+        mean_lat = np.radians((tx_lat + rx_lat) / 2)
+        dy = np.radians(rx_lat - tx_lat) * EARTH_RADIUS
+        dx = np.radians(rx_lon - tx_lon) * EARTH_RADIUS * np.cos(mean_lat)
+        distance = np.maximum(np.hypot(dx, dy), 1e-3)
+
+        ends = self.elevation(np.concatenate((tx_lat, rx_lat)), np.concatenate((tx_lon, rx_lon)))
+        tx_abs = ends[:tx_lat.shape[0]] + tx_height
+        rx_abs = ends[tx_lat.shape[0]:] + rx_height
+
+        f = (np.arange(1, self.samples_per_ray + 1) / (self.samples_per_ray + 1))[None, :]
+        ground = self.elevation(tx_lat + f * (rx_lat - tx_lat), tx_lon + f * (rx_lon - tx_lon))
+        d1 = f * distance
+        d2 = distance - d1
+        bulge = d1 * d2 / (2 * EFFECTIVE_EARTH_FACTOR * EARTH_RADIUS)
+        clearance = ground + bulge - (tx_abs + f * (rx_abs - tx_abs))
+
+        v = clearance * np.sqrt(2 * distance / (self.wavelength * d1 * d2))
+        worst = v.max(axis=1)
+        line_of_sight = clearance.max(axis=1) <= 0
+        return line_of_sight.reshape(links), knife_edge_loss(worst).reshape(links)
+
+    def link_losses(self, tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height=None):
+        """
+        Obstruction loss in dB of many links, memoized on quantized geometry.
+        :param rx_height: Receiver antenna height; receiver_height by default.
+        """
+        rx_height = self.receiver_height if rx_height is None else rx_height
+        q, qa = self.position_quantum, self.altitude_quantum
+        ends = np.broadcast_arrays(
+            np.round(np.asarray(tx_lat) / q), np.round(np.asarray(tx_lon) / q), np.round(np.asarray(tx_height) / qa),
+            np.round(np.asarray(rx_lat) / q), np.round(np.asarray(rx_lon) / q), np.round(np.asarray(rx_height) / qa))
+        links = ends[0].shape
+        geometry = np.stack(ends, axis=-1).reshape(-1, 6)
+        keys = [tuple(row) for row in geometry.astype(np.int64).tolist()]
+
+        losses = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            loss = self._memo.get(key)
+            if loss is None:
+                missing.append(i)
+            else:
+                self._memo.move_to_end(key)
+                losses[i] = loss
+        self.memo_hits += len(keys) - len(missing)
+        self.memo_misses += len(missing)
+
+        if missing:
+            g = geometry[missing]
+            _, computed = self.obstruction(g[:, 0] * q, g[:, 1] * q, g[:, 2] * qa,
+                                           g[:, 3] * q, g[:, 4] * q, g[:, 5] * qa)
+            losses[missing] = computed
+            for i, loss in zip(missing, computed.tolist()):
+                self._memo[keys[i]] = loss
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return losses.reshape(links)
+
+    def link_loss(self, tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height=None):
+        """Obstruction loss in dB of a single link."""
+        return float(self.link_losses(tx_lat, tx_lon, tx_height, rx_lat, rx_lon, rx_height))
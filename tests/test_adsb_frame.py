@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from adsbchannel import ADSBChannel
+from adsb_frame import (FRAME_BYTES, check_crc, cpr_decode_global, cpr_encode, crc24,
+                        decode_airborne_position, encode_airborne_position, encode_messages,
+                        flip_bit_count, icao_address)
+from gcs import GCS
+from importance import ImportanceSampler
+from simulation import DEFAULT_CENTER, generate_routes, run_simulation
+
+# Airborne position pair of ICAO 40621D from "The 1090 MHz Riddle"
+EVEN = bytes.fromhex('8D40621D58C382D690C8AC2863A7')
+ODD = bytes.fromhex('8D40621D58C386435CC412692AD6')
+
+
+def frames_of(*messages):
+    return np.frombuffer(b''.join(messages), dtype=np.uint8).reshape(-1, FRAME_BYTES)
+
+
+def crc24_bitwise(frame):
+    crc = 0
+    for byte in frame[:11]:
+        crc ^= byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= 0x1FFF409
+    return crc & 0xFFFFFF
+
+
+def test_reference_frames_decode():
+    frames = frames_of(EVEN, ODD)
+    assert check_crc(frames).all()
+    decoded = decode_airborne_position(frames, 52.258, 3.918)
+    assert decoded['icao'].tolist() == [0x40621D, 0x40621D]
+    assert decoded['odd'].tolist() == [0, 1]
+    np.testing.assert_allclose(decoded['latitude'][0], 52.2572, atol=1e-4)
+    np.testing.assert_allclose(decoded['longitude'][0], 3.91937, atol=1e-4)
+    np.testing.assert_allclose(decoded['altitude'], 38000 * 0.3048)
+    lat, lon, valid = cpr_decode_global(*cpr_encode([52.2572], [3.91937], [0]), *cpr_encode([52.2572], [3.91937], [1]),
+                                        [False])
+    assert valid[0]
+    np.testing.assert_allclose([lat[0], lon[0]], [52.2572, 3.91937], atol=1e-4)
+
+
+def test_table_crc_matches_bitwise_crc():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(64, FRAME_BYTES), dtype=np.uint8)
+    assert crc24(frames).tolist() == [crc24_bitwise(frame.tolist()) for frame in frames]
+
+
+def test_encode_decode_round_trip():
+    rng = np.random.default_rng(1)
+    count = 200
+    lat = 38.9 + rng.uniform(-0.5, 0.5, count)
+    lon = -77.0 + rng.uniform(-0.5, 0.5, count)
+    alt = rng.uniform(0, 3000, count)
+    icao = rng.integers(0, 1 << 24, count)
+    frames = encode_airborne_position(icao, lat, lon, alt, np.arange(count) & 1)
+    decoded = decode_airborne_position(frames, 38.9, -77.0)
+    assert decoded['crc_ok'].all()
+    assert decoded['icao'].tolist() == icao.tolist()
+    np.testing.assert_allclose(decoded['latitude'], lat, atol=1e-4)
+    np.testing.assert_allclose(decoded['longitude'], lon, atol=1e-4)
+    np.testing.assert_allclose(decoded['altitude'], alt, atol=25 * 0.3048 / 2 + 1e-9)
+
+
+@pytest.mark.parametrize('bits', [1, 2, 3])
+def test_flipped_bits_fail_parity(bits):
+    frames = encode_messages([{'drone_id': str(i), 'latitude': 38.9, 'longitude': -77.0, 'altitude': 100.0}
+                              for i in range(500)])
+    flipped = flip_bit_count(frames, bits, np.random.default_rng(bits))
+    assert (np.unpackbits(flipped ^ frames, axis=1).sum(axis=1) == bits).all()
+    assert not check_crc(flipped).any()
+
+
+def test_icao_address():
+    assert icao_address('12') == 12
+    assert icao_address('FAKE-DRONE') == icao_address('FAKE-DRONE') < 1 << 24
+
+
+def test_gcs_rejects_corrupted_frames_and_maps_ids_back():
+    ids = ['1', '2', 'FAKE-DRONE', '4']
+    messages = [{'drone_id': drone_id, 'latitude': 38.9 + 0.001 * i, 'longitude': -77.0, 'altitude': 100.0 + i}
+                for i, drone_id in enumerate(ids)]
+    corrupted = np.array([False, True, False, True])
+    frames = ADSBChannel().corrupt_frames(encode_messages(messages), corrupted, rng=np.random.default_rng(0))
+
+    gcs = GCS(38.9, -77.0)
+    gcs.register_drones(ids[:3])
+    accepted = gcs.receive_frames(frames, timestamps=[1.0] * 4)
+    assert accepted.tolist() == (~corrupted).tolist()
+    assert (gcs.frames_received, gcs.frames_rejected) == (4, 2)
+    assert set(gcs.drone_positions) == {'1', 'FAKE-DRONE'}
+    np.testing.assert_allclose(gcs.drone_positions['FAKE-DRONE'], (38.902, -77.0, 102.0), atol=5)
+
+    # Unregistered addresses keep their hex ICAO
+    gcs.receive_frames(encode_messages(messages[3:]))
+    assert '000004' in gcs.drone_positions
+
+
+def test_frame_level_simulation_rejects_what_the_channel_corrupts():
+    routes = generate_routes(DEFAULT_CENTER, num_routes=2, waypoints_per_route=3)
+    gcs = GCS(*DEFAULT_CENTER)
+    # A biased sampler makes corruption common enough to count
+    results = run_simulation(routes=routes, seed=1, gcs=gcs, frame_level=True,
+                             sampler=ImportanceSampler(min_probability=0.3))
+    messages, loss_pct = results['packet_loss'][-1]
+    assert gcs.frames_received == messages
+    assert gcs.frames_rejected == round(messages * loss_pct / 100) > 0
+    assert set(gcs.drone_positions) == {'1', '2'}
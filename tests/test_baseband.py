@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from adsb_frame import encode_airborne_position
+from baseband import (BURST_SAMPLES, PREAMBLE, BasebandScene, CalibrationTable, OverlapSaveFilter,
+                      detect_stream, detection_rate, lowpass_taps, modulate)
+from cw_jammer import ContinuousWaveJammer
+
+
+def frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return encode_airborne_position(rng.integers(0, 1 << 24, count), rng.uniform(-80, 80, count),
+                                    rng.uniform(-180, 180, count), rng.uniform(0, 3000, count),
+                                    np.arange(count) & 1)
+
+
+def test_modulation_puts_one_pulse_in_every_bit_cell():
+    bursts = modulate(frames(3))
+    assert bursts.shape == (3, BURST_SAMPLES)
+    np.testing.assert_array_equal(bursts[:, :PREAMBLE.shape[0]], np.broadcast_to(PREAMBLE, (3, 16)))
+    cells = bursts[:, PREAMBLE.shape[0]:].reshape(3, -1, 2)
+    np.testing.assert_array_equal(cells.sum(axis=2), 1)
+    np.testing.assert_array_equal(np.packbits(cells[:, :, 0].astype(np.uint8), axis=1), frames(3))
+
+
+def test_overlap_save_matches_direct_convolution():
+    taps = lowpass_taps(400e3, num_taps=31)
+    assert taps.sum() == pytest.approx(1.0)
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(5000) + 1j * rng.standard_normal(5000)
+    overlap_save = OverlapSaveFilter(taps, fft_size=128)
+    out = np.concatenate([overlap_save.process(block) for block in np.array_split(x, [7, 700, 701, 3000])])
+    np.testing.assert_allclose(out, np.convolve(x, taps)[:x.shape[0]], atol=1e-12)
+
+
+def test_detector_recovers_bursts_across_block_boundaries():
+    sent = frames(20, seed=2)
+    starts = 300 + 517 * np.arange(20)
+    scene = BasebandScene(seed=3)
+    scene.add_bursts(starts / 2e6, sent, snr_db=25.0)
+    index, found = detect_stream(scene, 12000, block_size=1000)
+    np.testing.assert_array_equal(index, starts)
+    np.testing.assert_array_equal(found, sent)
+
+
+def test_detection_falls_with_snr_and_under_jamming():
+    strong = detection_rate(20.0, bursts=100, seed=4)
+    weak = detection_rate(3.0, bursts=100, seed=4)
+    jammed = detection_rate(20.0, jammer=ContinuousWaveJammer(), jnr_db=25.0, bursts=100, seed=4)
+    assert strong == 1.0
+    assert weak < 0.5
+    assert jammed < 0.5
+
+
+def test_calibration_table():
+    clean = CalibrationTable([0, 10, 20], [0.2, 0.8, 1.0])
+    jammed = CalibrationTable([0, 10, 20], [0.1, 0.4, 0.5])
+    assert clean.frame_error_rate(5.0) == pytest.approx(0.5)
+    assert clean.frame_error_rate(30.0) == pytest.approx(0.0)
+    assert jammed.jamming_probability(clean) == pytest.approx(0.5)
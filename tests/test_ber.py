@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pytest
+
+from adsbchannel import ADSBChannel
+from baseband import CalibrationTable
+from ber import BERTable, default_table
+from run_scenarios import run_config
+from simulation import run_simulation
+
+ROUTES = [[(38.9, -77.03, 100.0), (38.91, -77.03, 120.0)], [(38.89, -77.04, 100.0), (38.9, -77.05, 150.0)]]
+
+
+def test_table_matches_the_closed_forms():
+    snr_db = np.array([-5.0, 0.0, 7.3, 12.0])
+    snr = 10 ** (snr_db / 10)
+    noncoherent = BERTable()
+    coherent = BERTable(detection='coherent')
+    np.testing.assert_allclose(noncoherent.bit_error_rate(snr_db), 0.5 * np.exp(-snr / 2))
+    np.testing.assert_allclose(coherent.bit_error_rate(snr_db),
+                               [0.5 * math.erfc(math.sqrt(x / 2)) for x in snr])
+    np.testing.assert_allclose(noncoherent.frame_error_rate(snr_db),
+                               1 - (1 - 0.5 * np.exp(-snr / 2)) ** 112)
+    assert noncoherent.frame_error_rate(0.004) == noncoherent.frame_error_rate(0.0)  # Nearest grid point
+
+
+def test_frame_errors_fall_with_snr():
+    table = default_table()
+    fer = table.frame_error_rate(np.arange(-10, 30, 0.5))
+    assert np.all(np.diff(fer) <= 0)
+    assert fer[0] == pytest.approx(1.0)
+    assert fer[-1] < 1e-12
+    # Coherent detection needs less SNR for the same frame error rate
+    assert BERTable(detection='coherent').frame_error_rate(10.0) < table.frame_error_rate(10.0)
+    # Out-of-range SNRs use the table ends
+    assert table.frame_error_rate(-100.0) == table.frame_error_rate(-20.0)
+    assert table.frame_error_rate(100.0) == table.frame_error_rate(40.0)
+    assert default_table() is table
+
+
+def test_unknown_detection_is_rejected():
+    with pytest.raises(ValueError):
+        BERTable(detection='optimal')
+
+
+def test_channel_draws_corruption_from_the_table():
+    channel = ADSBChannel(corruption_model='ber')
+    snr_db = np.full(20000, 12.0)
+    expected = default_table().frame_error_rate(12.0)
+    np.testing.assert_allclose(channel.frame_error_probability(snr_db), expected)
+    rate = channel.corrupted_mask(snr_db, np.random.default_rng(0)).mean()
+    assert rate == pytest.approx(expected, abs=4 * math.sqrt(expected * (1 - expected) / snr_db.size))
+
+
+def loss(results):
+    return results['packet_loss'][-1][1]
+
+
+def test_simulation_selects_the_corruption_model():
+    # Links near the GCS have a huge SNR: only the threshold model's flat error rate loses frames
+    assert loss(run_simulation(routes=ROUTES, seed=4, corruption_model='ber')) == 0.0
+    assert loss(run_simulation(routes=ROUTES, seed=4)) > 0.0
+    half = {'snr_db': [-10.0, 200.0], 'detection_rate': [0.5, 0.5]}
+    assert loss(run_simulation(routes=ROUTES, seed=4, corruption_model=half)) == pytest.approx(50, abs=10)
+    assert loss(run_simulation(routes=ROUTES, seed=4, corruption_model=CalibrationTable(**half))) == \
+        loss(run_simulation(routes=ROUTES, seed=4, corruption_model=half))
+
+
+def test_scenario_config_selects_the_corruption_model():
+    config = {'seed': 4, 'routes': {'num_routes': 2, 'waypoints_per_route': 3},
+              'scenarios': {'ber': {'corruption_model': 'ber'}}}
+    assert run_config(config)[1]['ber']['packet_loss'] == 0.0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from checkpoint import load_checkpoint, save_checkpoint
+from gcs import GCS
+from importance import ImportanceSampler
+from simulation import DEFAULT_CENTER, generate_routes, run_simulation
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FailingGCS(GCS):
+    """Raises once, after a number of reports, as if the run had been killed."""
+    fail_after = None
+
+    def receive_update(self, *args, **kwargs):
+        if FailingGCS.fail_after is not None:
+            FailingGCS.fail_after -= 1
+            if FailingGCS.fail_after < 0:
+                FailingGCS.fail_after = None
+                raise Interrupted
+        return super().receive_update(*args, **kwargs)
+
+
+class PulsedJammer:
+    def __init__(self):
+        self.next_pulse_time = 100.0
+        self.frequencies = np.arange(3.0)
+
+
+def test_roundtrip_keeps_arrays_and_rebases_nested_schedules(tmp_path):
+    path = str(tmp_path / 'state.ckpt')
+    jammer = PulsedJammer()
+    state = {'grid': {'emitters': [jammer]}, 'values': np.arange(10.0), 'alias': jammer}
+    save_checkpoint(path, state)
+    restored = load_checkpoint(path, rebase_clock=False)
+    np.testing.assert_array_equal(restored['values'], np.arange(10.0))
+    assert restored['alias'] is restored['grid']['emitters'][0]
+
+    restored = load_checkpoint(path)
+    rebased = restored['grid']['emitters'][0]
+    assert rebased.next_pulse_time > 100.0
+    np.testing.assert_array_equal(rebased.frequencies, np.arange(3.0))
+
+
+@pytest.mark.parametrize('scenario', [{}, {'jamming': True, 'spoofing': True}])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, scenario):
+    routes = generate_routes(DEFAULT_CENTER, num_routes=3, waypoints_per_route=3)
+    expected = run_simulation(routes=routes, seed=7, gcs=GCS(*DEFAULT_CENTER), **scenario)
+
+    path = str(tmp_path / 'run.ckpt')
+    FailingGCS.fail_after = len(expected['snr']) // 2
+    with pytest.raises(Interrupted):
+        run_simulation(routes=routes, seed=7, gcs=FailingGCS(*DEFAULT_CENTER), checkpoint_path=path,
+                       checkpoint_interval=0.0, **scenario)
+    resumed = run_simulation(routes=routes, seed=7, checkpoint_path=path, checkpoint_interval=0.0, **scenario)
+    assert resumed == expected
+
+
+def test_resumed_run_continues_the_importance_sampler(tmp_path):
+    routes = generate_routes(DEFAULT_CENTER, num_routes=3, waypoints_per_route=3)
+    scenario = {'jamming': True, 'jamming_probability': 0.05}
+    reference = ImportanceSampler(min_probability=0.3)
+    expected = run_simulation(routes=routes, seed=7, gcs=GCS(*DEFAULT_CENTER), sampler=reference, **scenario)
+
+    path = str(tmp_path / 'run.ckpt')
+    FailingGCS.fail_after = len(expected['snr']) // 2
+    with pytest.raises(Interrupted):
+        run_simulation(routes=routes, seed=7, gcs=FailingGCS(*DEFAULT_CENTER), checkpoint_path=path,
+                       checkpoint_interval=0.0, sampler=ImportanceSampler(min_probability=0.3), **scenario)
+    sampler = ImportanceSampler(min_probability=0.3)
+    resumed = run_simulation(routes=routes, seed=7, checkpoint_path=path, checkpoint_interval=0.0,
+                             sampler=sampler, **scenario)
+    assert resumed == expected
+    assert expected['importance']['run_weight'] != 1.0
+    assert sampler.decisions == reference.decisions
+    assert sampler.run_weight == reference.run_weight
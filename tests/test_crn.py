@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from adsbchannel import ADSBChannel
+from crn import CommonRandomNumbers
+from run_scenarios import run_config
+from simulation import run_simulation
+
+MESSAGE = {'drone_id': '1', 'latitude': 38.9, 'longitude': -77.03, 'altitude': 100.0}
+
+
+def test_streams_depend_only_on_seed_and_key():
+    a, b = CommonRandomNumbers(3), CommonRandomNumbers(3)
+    assert a.uniform('1', 5) == b.uniform('1', 5)
+    assert a.uniform('1', 5) != a.uniform('1', 6)
+    assert a.uniform('1', 5) != CommonRandomNumbers(4).uniform('1', 5)
+    assert 0.0 <= a.uniform('x') < 1.0
+    assert a.generator('1', 5).random() == b.generator('1', 5).random()
+
+
+def test_channel_draws_ignore_other_consumers_of_randomness():
+    # Every message is corrupted, so the draws decide the corruption offsets
+    channel = ADSBChannel(error_rate=1.0, crn=CommonRandomNumbers(11))
+    first = channel.transmit(dict(MESSAGE), (38.8977, -77.0365), sim_time=5)[0]
+    for _ in range(17):
+        random.random()  # e.g. a jammer drawing in one scenario only
+    second = channel.transmit(dict(MESSAGE), (38.8977, -77.0365), sim_time=5)[0]
+    assert first == second
+    assert channel.transmit(dict(MESSAGE), (38.8977, -77.0365), sim_time=6)[0] != first
+
+
+def test_common_random_numbers_need_a_seed():
+    with pytest.raises(ValueError):
+        run_simulation(crn=True)
+    with pytest.raises(ValueError):
+        run_config({'crn': True, 'scenarios': {'clear': {}}})
+
+
+def test_compare_pairs_seeds_and_shares_random_numbers():
+    from replication import ReplicationController
+
+    calls = []
+
+    def runner(seed, crn=False, attack=0.0, **common):
+        calls.append((seed, crn))
+        noise = random.Random(seed).random()  # Shared by both runs of a replication
+        return {'packet_loss': [(1, noise + attack)], 'snr': [(1, 1.0)], 'latency': [], 'throughput': []}
+
+    controller = ReplicationController(precision=0.01, min_replications=3, metrics=('packet_loss',))
+    estimates = controller.compare({}, {'attack': 5.0}, runner=runner)
+    assert estimates['converged'] and estimates['replications'] == 3
+    assert estimates['packet_loss']['mean'] == pytest.approx(5.0)
+    assert calls == [(seed, True) for seed in (0, 0, 1, 1, 2, 2)]
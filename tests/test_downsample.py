@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from downsample import as_xy, box_stats, lttb, minmax_downsample
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    kx, ky = lttb(x, y, 200)
+    assert kx.shape == (200,)
+    assert kx[0] == 0 and kx[-1] == 9999
+    assert np.all(np.diff(kx) > 0)
+    assert 50.0 in ky
+
+
+def test_short_series_pass_through():
+    x, y = as_xy([(0, 1), (1, 2)])
+    assert lttb(x, y, 10)[0] is x
+    assert as_xy([])[0].shape == (0,)
+
+
+def test_minmax_is_exact_envelope():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=5000)
+    x = np.arange(5000.0)
+    kx, ky = minmax_downsample(x, y, 50)
+    assert kx.shape[0] <= 100
+    for bucket in range(50):
+        inside = (x * 50 // 5000 == bucket)
+        kept = ky[(kx * 50 // 5000) == bucket]
+        assert kept.min() == y[inside].min() and kept.max() == y[inside].max()
+
+
+def test_box_stats_match_numpy():
+    rng = np.random.default_rng(1)
+    values = np.append(rng.normal(size=1000), [np.nan, 40.0, -40.0])
+    stats = box_stats(values, label='s', max_fliers=1)
+    finite = values[np.isfinite(values)]
+    assert stats['med'] == pytest.approx(np.median(finite))
+    assert stats['mean'] == pytest.approx(finite.mean())
+    assert len(stats['fliers']) == 1
+    assert stats['whislo'] >= stats['q1'] - 1.5 * (stats['q3'] - stats['q1'])
+    assert box_stats([np.nan]) is None
+
+
+def test_figures_render_from_reduced_results(tmp_path):
+    pytest.importorskip('matplotlib')
+    import matplotlib
+    matplotlib.use('Agg')
+    from plots import reduce_results, render_all
+
+    series = [(i, float(i % 7)) for i in range(50000)]
+    results = {'a': {'packet_loss': series, 'latency': series, 'throughput': series, 'snr': series}}
+    reduced = reduce_results(results, max_points=500)
+    assert len(reduced['a']['latency']) == 500
+    paths = render_all(results, str(tmp_path), workers=1)
+    assert len(paths) == 4 and all((tmp_path / path.split('/')[-1]).stat().st_size > 0 for path in paths)
@@ -0,0 +1,93 @@
+import io
+
+import numpy as np
+import pytest
+
+from adsb_frame import FRAME_BYTES, decode_airborne_position, icao_address
+from export import BEAST_CLOCK_HZ, BEAST_ESCAPE, BeastExporter, BufferedSink, SBSExporter, beast_records
+from simulation import DEFAULT_CENTER, generate_routes, run_simulation
+
+PAYLOAD_BYTES = 6 + 1 + FRAME_BYTES
+
+
+def parse_beast(data):
+    """Unescaped (timestamp ticks, signal level, frame) of every Mode-S long record."""
+    records, i = [], 0
+    while i < len(data):
+        assert data[i] == BEAST_ESCAPE and data[i + 1] == ord('3')
+        i += 2
+        payload = bytearray()
+        while len(payload) < PAYLOAD_BYTES:
+            byte = data[i]
+            if byte == BEAST_ESCAPE:
+                assert data[i + 1] == BEAST_ESCAPE
+                i += 1
+            payload.append(byte)
+            i += 1
+        records.append((int.from_bytes(payload[:6], 'big'), payload[6], bytes(payload[7:])))
+    return records
+
+
+def test_beast_escapes_every_0x1a_after_the_record_marker():
+    frames = np.full((2, FRAME_BYTES), BEAST_ESCAPE, dtype=np.uint8)
+    frames[1, :] = 0x00
+    timestamps = np.array([BEAST_ESCAPE / BEAST_CLOCK_HZ, 1.0])  # 48-bit counter 0x00000000001a
+    data = beast_records(frames, timestamps, np.array([BEAST_ESCAPE, 7], dtype=np.uint8))
+    # Record 1: 14 frame bytes, the level and one timestamp byte are doubled
+    assert len(data) == 2 * (2 + PAYLOAD_BYTES) + FRAME_BYTES + 2
+    (ticks, level, frame), second = parse_beast(data)
+    assert ticks == BEAST_ESCAPE and level == BEAST_ESCAPE and frame == bytes(frames[0])
+    assert second == (int(BEAST_CLOCK_HZ), 7, bytes(FRAME_BYTES))
+
+
+def test_beast_round_trip_through_decoder():
+    out = io.BytesIO()
+    exporter = BeastExporter(BufferedSink(out), batch_size=3)
+    reports = [('7', 2.5, 38.91, -77.02, 300.0), ('7', 1.5, 38.90, -77.03, 250.0),
+               ('12', 2.0, 38.88, -77.05, 120.0), ('12', 0.5, 38.89, -77.04, 100.0)]
+    for drone_id, timestamp, lat, lon, alt in reports:
+        exporter.add({'drone_id': drone_id, 'latitude': lat, 'longitude': lon, 'altitude': alt},
+                     timestamp, snr_db=30.0)
+    exporter.close()
+
+    records = parse_beast(out.getvalue())
+    assert exporter.records == len(records) == 4
+    frames = np.frombuffer(b''.join(frame for _, _, frame in records), dtype=np.uint8).reshape(-1, FRAME_BYTES)
+    decoded = decode_airborne_position(frames, *DEFAULT_CENTER)
+    assert decoded['crc_ok'].all()
+
+    # Each batch comes out in time order
+    expected = sorted(reports[:3], key=lambda report: report[1]) + reports[3:]
+    assert [ticks for ticks, _, _ in records] == [int(report[1] * BEAST_CLOCK_HZ) for report in expected]
+    assert decoded['icao'].tolist() == [icao_address(report[0]) for report in expected]
+    np.testing.assert_allclose(decoded['latitude'], [report[2] for report in expected], atol=1e-4)
+    np.testing.assert_allclose(decoded['longitude'], [report[3] for report in expected], atol=1e-4)
+    np.testing.assert_allclose(decoded['altitude'], [report[4] for report in expected], atol=8.0)
+
+
+def test_corrupted_frames_fail_parity():
+    out = io.BytesIO()
+    with BeastExporter(BufferedSink(out), seed=1) as exporter:
+        for corrupted in (False, True):
+            exporter.add({'drone_id': '1', 'latitude': 38.9, 'longitude': -77.0, 'altitude': 100.0},
+                         1.0, corrupted=corrupted)
+    frames = np.frombuffer(b''.join(frame for _, _, frame in parse_beast(out.getvalue())), dtype=np.uint8)
+    assert decode_airborne_position(frames.reshape(-1, FRAME_BYTES), *DEFAULT_CENTER)['crc_ok'].tolist() == \
+        [True, False]
+
+
+def test_simulation_stream_is_in_time_order():
+    out = io.BytesIO()
+    routes = generate_routes(DEFAULT_CENTER, num_routes=3, waypoints_per_route=3)
+    exporter = SBSExporter(BufferedSink(out), batch_size=4, epoch=0.0)
+    run_simulation(routes=routes, seed=2, exporter=exporter)
+    lines = out.getvalue().decode('ascii').splitlines()
+    assert len(lines) == exporter.records > 0
+    stamps = [line.split(',')[6] + line.split(',')[7] for line in lines]
+    assert stamps == sorted(stamps)
+
+
+def test_exporter_refused_with_checkpoints(tmp_path):
+    with pytest.raises(ValueError):
+        run_simulation(exporter=SBSExporter(BufferedSink(io.BytesIO())),
+                       checkpoint_path=str(tmp_path / 'run.ckpt'))
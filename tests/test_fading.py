@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from adsbchannel import ADSBChannel
+from fading import FadingModel
+from simulation import DEFAULT_CENTER, run_simulation
+
+ROUTE = [(38.9, -77.03, 100.0), (38.905, -77.03, 120.0)]
+
+
+def sequence(model, key, n):
+    return np.array([model.gain_db(key) for _ in range(n)])
+
+
+def test_single_and_batched_gains_agree_across_blocks():
+    single = FadingModel(seed=5, block_size=8)
+    batched = FadingModel(seed=5, block_size=8)
+    keys = [('1', 'gcs'), ('2', 'gcs'), ('3', 'gcs')]
+    expected = np.array([[single.gain_db(key) for key in keys] for _ in range(30)])
+    got = np.array([batched.gains_db(keys) for _ in range(30)])
+    np.testing.assert_allclose(got, expected)
+
+
+def test_growing_keeps_existing_links_unchanged():
+    alone = sequence(FadingModel(seed=2, block_size=4), 'a', 12)
+    crowded = FadingModel(seed=2, block_size=4, initial_capacity=1)
+    gains = []
+    for i in range(12):
+        gains.append(crowded.gain_db('a'))
+        crowded.gains_db([f'other-{i}-{j}' for j in range(3)])
+    assert len(crowded.index) == 37
+    np.testing.assert_allclose(gains, alone)
+
+
+def test_rayleigh_gain_has_unit_mean_power():
+    model = FadingModel(seed=0, block_size=64)
+    keys = list(range(500))
+    power = 10 ** (np.array([model.gains_db(keys) for _ in range(64)]) / 10)
+    assert power.mean() == pytest.approx(1.0, rel=0.05)
+    # Rayleigh power is exponential: about 10 % of samples fade below -10 dB
+    assert np.mean(power < 0.1) == pytest.approx(1 - np.exp(-0.1), abs=0.02)
+
+
+def test_line_of_sight_reduces_fading_depth():
+    keys = list(range(200))
+    rayleigh_model, rician_model = FadingModel(seed=1), FadingModel(k_factor=20.0, seed=1)
+    rayleigh = np.array([rayleigh_model.gains_db(keys) for _ in range(50)])
+    rician = np.array([rician_model.gains_db(keys) for _ in range(50)])
+    assert rician.std() < rayleigh.std() / 3
+    assert rician.min() > -10
+
+
+def test_gains_follow_the_doppler_spread():
+    static = sequence(FadingModel(doppler_hz=0.0, seed=3), 'a', 20)
+    assert np.ptp(static) == 0
+
+    # Sampled much faster than the Doppler period, consecutive gains barely move
+    slow = sequence(FadingModel(doppler_hz=0.01, sample_interval=1.0, seed=3), 'a', 200)
+    fast = sequence(FadingModel(doppler_hz=10.0, sample_interval=1.0, seed=3), 'a', 200)
+    assert np.abs(np.diff(slow)).mean() < np.abs(np.diff(fast)).mean() / 5
+
+
+def test_channel_draws_one_gain_per_link_and_tick():
+    channel = ADSBChannel(fading=FadingModel(seed=6, block_size=4))
+    reference = FadingModel(seed=6, block_size=4)
+    for _ in range(10):
+        gains = channel.link_gains_db(['1', '2'], [ROUTE[0], ROUTE[1]], DEFAULT_CENTER)
+        np.testing.assert_allclose(gains, reference.gains_db([('1', DEFAULT_CENTER), ('2', DEFAULT_CENTER)]))
+
+
+def test_simulation_applies_the_fading_of_each_tick():
+    plain = run_simulation(routes=[ROUTE], seed=3)['snr']
+    faded = run_simulation(routes=[ROUTE], seed=3, fading={'k_factor': 2.0})['snr']
+    assert faded == run_simulation(routes=[ROUTE], seed=3, fading={'k_factor': 2.0})['snr']
+    # Without attacks the SNR only differs by the link's fading gain, drawn once per tick
+    expected = sequence(FadingModel(k_factor=2.0, seed=3), ('1', DEFAULT_CENTER), len(plain))
+    np.testing.assert_allclose([b - a for (_, a), (_, b) in zip(plain, faded)], expected, atol=1e-5)
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from importance import (ImportanceSampler, decide, estimate_losses, longest_loss_burst, run_importance,
+                        weighted_bursts, weighted_estimate)
+from simulation import run_simulation
+
+ROUTES = [[(38.9, -77.03, 100.0), (38.901, -77.03, 110.0)]]
+LOSS_PROBABILITY = 0.02
+
+
+def bernoulli_runner(seed, sampler, drones=3, messages=40):
+    """Stand-in for run_simulation: every message is lost independently with LOSS_PROBABILITY."""
+    rng = random.Random(seed)
+    sampler.reset()
+    record = {'drone_id': [], 'lost': [], 'message_weight': []}
+    for _ in range(messages):
+        for drone_id in range(drones):
+            sampler.start_message()
+            record['drone_id'].append(drone_id)
+            record['lost'].append(sampler.decide(LOSS_PROBABILITY, rng))
+            record['message_weight'].append(sampler.message_weight)
+    return {'importance': {**record, 'run_weight': sampler.run_weight}}
+
+
+def test_proposal_raises_only_rare_probabilities():
+    sampler = ImportanceSampler(min_probability=0.2)
+    assert sampler.proposal(0.01) == 0.2
+    assert sampler.proposal(0.5) == 0.5
+    assert sampler.proposal(0.0) == 0.0 and sampler.proposal(1.0) == 1.0
+    assert ImportanceSampler(min_probability=0.95).proposal(0.01) == 0.9
+
+
+def test_likelihood_ratios_are_unbiased():
+    sampler, rng = ImportanceSampler(min_probability=0.25), random.Random(0)
+    weighted, events = 0.0, 0
+    for _ in range(20000):
+        sampler.start_message()
+        event = sampler.decide(0.01, rng)
+        events += event
+        weighted += event * sampler.message_weight
+    assert events / 20000 == pytest.approx(0.25, abs=0.01)
+    assert weighted / 20000 == pytest.approx(0.01, rel=0.05)
+    assert sampler.decisions == 20000
+
+
+def test_decide_without_a_sampler():
+    rng = random.Random(1)
+    assert sum(decide(0.3, rng=rng) for _ in range(10000)) == pytest.approx(3000, abs=150)
+    assert not decide(0.0) and decide(1.0)
+
+
+def test_bursts_are_counted_per_drone():
+    drone_ids = [1, 2, 1, 2, 1, 2, 1, 1, 1, 1]
+    lost = [True, True, True, False, True, True, False, True, True, True]
+    assert longest_loss_burst(drone_ids, lost) == 3
+    assert weighted_bursts(drone_ids, lost, [1.0] * len(lost), 3) == 2.0
+    assert weighted_bursts(drone_ids, lost, [1.0] * len(lost), 4) == 0.0
+
+
+def test_weighted_estimate():
+    estimate = weighted_estimate([1.0, 0.0, 1.0, 0.0], [0.5, 2.0, 0.5, 2.0])
+    assert estimate['mean'] == pytest.approx(0.25)
+    assert estimate['effective_sample_size'] == pytest.approx(25 / 8.5)
+    assert weighted_estimate([], [])['n'] == 0
+
+
+def test_rare_bursts_are_estimated_without_bias():
+    p, burst_length, messages, drones = LOSS_PROBABILITY, 3, 40, 3
+    exact_bursts = drones * (p ** burst_length + (messages - burst_length) * (1 - p) * p ** burst_length)
+    estimates = run_importance(runs=400, burst_length=burst_length, min_probability=0.3,
+                               runner=bernoulli_runner)
+    loss = estimates['loss_probability']
+    bursts = estimates['bursts_per_run']
+    assert abs(loss['mean'] - p) <= loss['half_width']
+    assert abs(bursts['mean'] - exact_bursts) <= 1.5 * bursts['half_width']
+    assert bursts['half_width'] < exact_bursts  # Plain sampling would almost never see a burst
+
+
+def test_simulation_records_message_weights():
+    result = run_simulation(routes=ROUTES, jamming=True, jamming_probability=0.01, seed=2,
+                            sampler=ImportanceSampler(min_probability=0.3))
+    record = result['importance']
+    assert len(record['lost']) == len(record['message_weight']) == result['packet_loss'][-1][0]
+    assert any(record['lost'])
+    assert all(weight > 0 for weight in record['message_weight'])
+    assert estimate_losses([record])['loss_probability']['n'] == 1
@@ -0,0 +1,100 @@
+import heapq
+import math
+
+import pytest
+
+from mesh import GCS_NODE, MeshNetwork
+from simulation import DEFAULT_CENTER, _relay_report, generate_routes, run_simulation
+
+CENTER = (38.8977, -77.0365)
+METERS_PER_DEGREE = 111195.0
+
+
+def north(meters, alt=100.0):
+    return (CENTER[0] + meters / METERS_PER_DEGREE, CENTER[1], alt)
+
+
+def reference_distances(mesh):
+    dist = {GCS_NODE: 0.0}
+    heap = [(0.0, GCS_NODE)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for other, cost in mesh.adjacency[node].items():
+            if d + cost < dist.get(other, math.inf):
+                dist[other] = d + cost
+                heapq.heappush(heap, (dist[other], other))
+    return dist
+
+
+def chain_mesh():
+    # Only drone a reaches the GCS directly; b and c relay through their predecessor
+    mesh = MeshNetwork(CENTER, link_range=1500.0, min_snr_db=-200.0)
+    mesh.update(['a', 'b', 'c'], [north(1000), north(2200), north(3400)],
+                gcs_snr_db=[40.0, -math.inf, -math.inf])
+    return mesh
+
+
+def test_relay_path_follows_chain():
+    mesh = chain_mesh()
+    assert mesh.path('c') == ['c', 'b', 'a', 'GCS']
+    assert mesh.relay('a', north(1000), 40.0) is None  # Direct link, no relay
+    assert mesh.relay('b', north(2200), -math.inf) == ['b', 'a', 'GCS']
+
+
+def test_incremental_repair_matches_dijkstra():
+    mesh = chain_mesh()
+    mesh.update(['b'], [north(5000)], gcs_snr_db=[-math.inf])  # b leaves, c loses its path
+    assert mesh.path('c') is None
+    mesh.update(['d'], [north(2300)], gcs_snr_db=[-math.inf])
+    assert mesh.path('c') == ['c', 'd', 'a', 'GCS']
+    expected = reference_distances(mesh)
+    for node in mesh.index.values():
+        assert mesh.dist[node] == pytest.approx(expected.get(node, math.inf))
+
+
+def test_removed_drone_no_longer_relays():
+    mesh = chain_mesh()
+    assert mesh.remove(['a']) == 2
+    assert mesh.path('b') is None and mesh.path('c') is None
+    mesh.update(['a'], [north(1000)], gcs_snr_db=[40.0])
+    assert mesh.path('c') == ['c', 'b', 'a', 'GCS']
+
+
+class FakeChannel:
+    def __init__(self, corrupt_hop):
+        self.corrupt_hop = corrupt_hop
+        self.hops = []
+
+    def transmit(self, message, target, jammer=None, sim_time=None):
+        self.hops.append(message['drone_id'])
+        return message, 10.0, len(self.hops) == self.corrupt_hop, 30.0
+
+
+def test_any_failed_hop_loses_the_report():
+    report = {'drone_id': 'c', 'latitude': 0.0, 'longitude': 0.0, 'altitude': 0.0}
+    positions = {'c': north(3400), 'b': north(2200), 'a': north(1000)}
+    hops = ['c', 'b', 'a', 'GCS']
+    channel = FakeChannel(corrupt_hop=None)
+    assert _relay_report(report, hops, positions, CENTER, channel, None, 1) == (report, 30.0)
+    assert len(channel.hops) == 3
+    assert _relay_report(report, hops, positions, CENTER, FakeChannel(corrupt_hop=2), None, 1) is None
+
+
+class CountingMesh(MeshNetwork):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.relayed = 0
+
+    def relay(self, drone_id, position, direct_snr_db):
+        self.relayed += 1
+        return super().relay(drone_id, position, direct_snr_db)
+
+
+def test_clear_reports_are_not_relayed():
+    routes = generate_routes(DEFAULT_CENTER, num_routes=3, waypoints_per_route=3)
+    mesh = CountingMesh(DEFAULT_CENTER, link_range=5000.0)
+    result = run_simulation(routes=routes, seed=1, relay=mesh)
+    assert result['packet_loss']
+    assert mesh.relayed == 0  # Random corruption at a good SNR is not a relay case
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from receiver import ReceiverQueue, arrival_schedule, saturation_fleet_size, sweep_fleet_size
+
+
+def lindley_with_drops(arrivals, service_time, capacity):
+    """Reference FIFO queue, one message at a time."""
+    departures = []
+    last = -np.inf
+    for t in sorted(arrivals):
+        waiting = sum(1 for d in departures if not np.isnan(d) and d > t + 1e-12)
+        if waiting > capacity:
+            departures.append(np.nan)
+            continue
+        last = max(last, t) + service_time
+        departures.append(last)
+    return np.array(departures)
+
+
+@pytest.mark.parametrize('chunk_size', [7, 1 << 16])
+def test_matches_reference_queue_under_overload(chunk_size):
+    rng = np.random.default_rng(3)
+    arrivals = np.sort(rng.uniform(0, 2.0, size=600))
+    receiver = ReceiverQueue(decode_rate=200.0, queue_capacity=4, chunk_size=chunk_size)
+    result = receiver.process(arrivals)
+    expected = lindley_with_drops(arrivals, receiver.service_time, receiver.queue_capacity)
+    assert result['dropped'].any()
+    np.testing.assert_array_equal(result['dropped'], np.isnan(expected))
+    np.testing.assert_allclose(result['departure'], expected, atol=1e-9)
+
+
+def test_results_follow_input_order():
+    arrivals = np.array([0.3, 0.0, 0.1])
+    result = ReceiverQueue(decode_rate=10.0, queue_capacity=10).process(arrivals)
+    np.testing.assert_allclose(result['departure'], [0.4, 0.1, 0.2])
+    np.testing.assert_allclose(result['queue_delay'], [0.0, 0.0, 0.0], atol=1e-12)
+
+
+def test_saturation_found_in_sweep():
+    receiver = ReceiverQueue(decode_rate=100.0, queue_capacity=10)
+    rows = sweep_fleet_size([10, 40, 80], receiver, duration=10.0, seed=0)
+    assert rows[0]['drop_rate'] == 0.0
+    assert saturation_fleet_size(rows) == 80
+    assert len(arrival_schedule(5, 10.0)) == 100
@@ -0,0 +1,142 @@
+import io
+
+import numpy as np
+import pytest
+
+from export import BufferedSink, SBSExporter
+from replay import TrajectoryReplay, run_replay, write_binary
+
+
+def recording(rng):
+    """Two tracks sampled at irregular times, interleaved and sorted by time."""
+    tracks = []
+    for track_id, start in ((7, 0.0), (9, 0.4)):
+        t = start + np.cumsum(rng.uniform(0.2, 1.7, size=40))
+        tracks.append((t, np.full(t.shape, track_id), 50 + 1e-3 * t, 4 + 2e-3 * t, 100 + 3 * t))
+    columns = [np.concatenate(parts) for parts in zip(*tracks)]
+    order = np.argsort(columns[0], kind='stable')
+    return [column[order] for column in columns]
+
+
+def collect(replay):
+    batches = list(replay.ticks())
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+def by_track(ticks):
+    order = np.lexsort((ticks['time'], ticks['id']))
+    return {key: value[order] for key, value in ticks.items()}
+
+
+@pytest.fixture
+def samples():
+    return recording(np.random.default_rng(4))
+
+
+def test_ticks_interpolate_onto_the_schedule(tmp_path, samples):
+    path = str(tmp_path / 'flight.bin')
+    write_binary(path, *samples)
+    ticks = by_track(collect(TrajectoryReplay(path, interval=1.0)))
+
+    t, ids, lat, lon, alt = samples
+    for track_id in (7, 9):
+        mine = ticks['id'] == track_id
+        track_t = t[ids == track_id]
+        expected = np.arange(np.ceil(track_t[0]), np.floor(track_t[-1]) + 1)
+        np.testing.assert_allclose(ticks['time'][mine], expected)
+        np.testing.assert_allclose(ticks['latitude'][mine], np.interp(expected, track_t, lat[ids == track_id]))
+        np.testing.assert_allclose(ticks['altitude'][mine], np.interp(expected, track_t, alt[ids == track_id]),
+                                   rtol=1e-6)
+
+
+def test_chunking_does_not_change_the_ticks(tmp_path, samples):
+    path = str(tmp_path / 'flight.bin')
+    write_binary(path, *samples)
+    whole = by_track(collect(TrajectoryReplay(path)))
+    chunked = by_track(collect(TrajectoryReplay(path, chunk_rows=7)))
+    for key in whole:
+        np.testing.assert_allclose(chunked[key], whole[key])
+
+
+def test_csv_and_binary_recordings_agree(tmp_path, samples):
+    binary = str(tmp_path / 'flight.bin')
+    write_binary(binary, *samples)
+    csv = tmp_path / 'flight.csv'
+    t, ids, lat, lon, alt = samples
+    alt = alt.astype(np.float32).astype(np.float64)  # As stored in the binary records
+    rows = ''.join(f'{a!r},D{b},{c!r},{d!r},{e!r}\n'
+                   for a, b, c, d, e in zip(t.tolist(), ids.tolist(), lat.tolist(), lon.tolist(), alt.tolist()))
+    csv.write_text('time,id,lat,lon,alt\n' + rows)
+
+    replay = TrajectoryReplay(str(csv), chunk_rows=11)
+    from_csv = collect(replay)
+    from_binary = collect(TrajectoryReplay(binary))
+    assert sorted({replay.drone_id(code) for code in from_csv['id'].tolist()}) == ['D7', 'D9']
+    names = np.array([replay.drone_id(code) for code in from_csv['id'].tolist()])
+    for track_id in (7, 9):
+        mine_csv = names == f'D{track_id}'
+        mine_binary = from_binary['id'] == track_id
+        for key in ('time', 'latitude', 'longitude', 'altitude'):
+            np.testing.assert_allclose(from_csv[key][mine_csv], from_binary[key][mine_binary])
+
+
+def test_max_gap_silences_long_gaps(tmp_path):
+    path = str(tmp_path / 'gap.bin')
+    write_binary(path, [0.0, 1.0, 2.0, 10.0, 11.0], [1] * 5, [50.0] * 5, [4.0] * 5, [100.0] * 5)
+    times = collect(TrajectoryReplay(path, max_gap=3.0))['time']
+    np.testing.assert_allclose(times, [0.0, 1.0, 2.0, 10.0, 11.0])
+    assert collect(TrajectoryReplay(path))['time'].size == 12
+
+
+def test_run_replay_reports_every_message(tmp_path, samples):
+    path = str(tmp_path / 'flight.bin')
+    write_binary(path, *samples)
+    replay = TrajectoryReplay(path)
+    sent = sum(1 for _ in replay.messages())
+    results = run_replay(replay, (50.0, 4.0))
+    assert len(results['packet_loss']) == sent
+    assert len(results['latency']) == len(results['snr']) <= sent
+    assert all(delay > 0 for _, delay in results['latency'])
+
+
+def sparse_recording():
+    """A dense track sampled every 0.3 s and a sparse one sampled every 20 s."""
+    dense_t = np.arange(0.0, 60.0, 0.3)
+    sparse_t = np.arange(0.0, 61.0, 20.0)
+    t = np.concatenate((dense_t, sparse_t))
+    ids = np.concatenate((np.full(dense_t.shape, 1), np.full(sparse_t.shape, 2)))
+    order = np.argsort(t, kind='stable')
+    return t[order], ids[order], 50 + 1e-4 * t[order], np.full(t.shape, 4.0), np.full(t.shape, 100.0)
+
+
+@pytest.mark.parametrize('max_gap', [None, 30.0])
+def test_ticks_stay_in_time_order_across_chunks(tmp_path, max_gap):
+    path = str(tmp_path / 'sparse.bin')
+    write_binary(path, *sparse_recording())
+    whole = by_track(collect(TrajectoryReplay(path, max_gap=max_gap)))
+    replay = TrajectoryReplay(path, chunk_rows=50, max_gap=max_gap)
+    times = np.concatenate([batch['time'] for batch in replay.ticks()])
+    assert np.all(np.diff(times) >= 0)
+    chunked = by_track(collect(replay))
+    for key in whole:
+        np.testing.assert_allclose(chunked[key], whole[key])
+    assert [m['timestamp'] for m in replay.messages()] == sorted(times.tolist())
+
+
+def test_run_replay_is_in_simulated_time(tmp_path):
+    path = str(tmp_path / 'sparse.bin')
+    write_binary(path, *sparse_recording())
+    replay = TrajectoryReplay(path, chunk_rows=50)
+    first, second = run_replay(replay, (50.0, 4.0)), run_replay(replay, (50.0, 4.0))
+    assert first['throughput'] == second['throughput']
+    # Two tracks ticking every second from t = 0
+    assert first['throughput'][0] == (1.0, 1.0)
+    assert first['throughput'][-1][1] == pytest.approx(2.0, rel=0.05)
+
+    out = io.BytesIO()
+    exporter = SBSExporter(BufferedSink(out), batch_size=8, epoch=0.0)
+    run_replay(replay, (50.0, 4.0), exporter=exporter)
+    lines = out.getvalue().decode('ascii').splitlines()
+    assert len(lines) == exporter.records > 0
+    stamps = [line.split(',')[6] + line.split(',')[7] for line in lines]
+    assert stamps == sorted(stamps)
@@ -0,0 +1,63 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from replication import ReplicationController, RunningStat, t_quantile
+from run_scenarios import run_config
+
+
+def test_t_quantile_matches_tables():
+    assert t_quantile(0.975, 1) == pytest.approx(12.706, rel=1e-3)
+    assert t_quantile(0.975, 2) == pytest.approx(4.303, rel=1e-3)
+    assert t_quantile(0.975, 10) == pytest.approx(2.228, rel=1e-2)
+    assert t_quantile(0.975, math.inf) == pytest.approx(1.960, rel=1e-3)
+
+
+def test_running_stat_matches_statistics():
+    rng = random.Random(1)
+    values = [rng.gauss(5, 2) for _ in range(50)]
+    stat = RunningStat()
+    for value in values:
+        stat.push(value)
+    assert stat.mean == pytest.approx(statistics.fmean(values))
+    assert stat.variance == pytest.approx(statistics.variance(values))
+
+
+def _series(loss, snr):
+    if loss is None:
+        return {'packet_loss': [], 'snr': [], 'latency': [], 'throughput': []}
+    return {'packet_loss': [(1, loss)], 'snr': [(1, snr)], 'latency': [(1, 1.0)], 'throughput': [(1, 1.0)]}
+
+
+def test_replicates_without_messages_are_skipped():
+    def runner(seed, **params):
+        # Every third replicate sends nothing and summarises to NaN
+        return _series(None if seed % 3 == 0 else 0.1 + 0.01 * (seed % 2), 20.0)
+
+    controller = ReplicationController(precision=0.1, min_replications=6, max_replications=6,
+                                       metrics=('packet_loss', 'mean_snr'))
+    estimates, _ = controller.run(runner=runner)
+    assert estimates['replications'] == 6
+    assert estimates['packet_loss']['n'] == 4
+    assert estimates['packet_loss']['skipped'] == 2
+    assert estimates['packet_loss']['mean'] == pytest.approx(0.105)
+    assert estimates['mean_snr']['mean'] == pytest.approx(20.0)
+
+
+def test_stops_once_converged():
+    def runner(seed, **params):
+        return _series(0.2 + 0.001 * random.Random(seed).random(), 20.0)
+
+    controller = ReplicationController(precision=0.01, min_replications=5, max_replications=50,
+                                       metrics=('packet_loss',))
+    estimates, _ = controller.run(runner=runner)
+    assert estimates['converged']
+    assert estimates['replications'] == 5
+
+
+def test_checkpoints_rejected_with_replication(tmp_path):
+    config = {'scenarios': {'clear': {}}, 'replication': {'precision': 0.1}}
+    with pytest.raises(ValueError):
+        run_config(config, checkpoint_dir=str(tmp_path))
@@ -0,0 +1,70 @@
+import os
+
+from receiver import ReceiverQueue
+from result_cache import ResultCache, source_version
+
+
+def counting_runner(calls):
+    def runner(**kwargs):
+        calls.append(kwargs)
+        return {'value': kwargs.get('jamming', False), 'payload': 'x' * 1000}
+    return runner
+
+
+def test_seeded_runs_are_served_from_cache(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    runner = cache.wrap(counting_runner(calls))
+    first = runner(seed=1, jamming=True)
+    assert runner(seed=1, jamming=True, checkpoint_path='ignored.ckpt') == first
+    assert len(calls) == 1 and (cache.hits, cache.misses) == (1, 1)
+    runner(seed=2, jamming=True)
+    runner(seed=1, jamming=False)
+    assert len(calls) == 3
+
+
+def test_unkeyable_runs_always_execute(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    runner = cache.wrap(counting_runner(calls))
+    runner(seed=None)
+    runner(seed=None)
+    runner(seed=1, gcs=object())
+    runner(seed=1, gcs=object())
+    runner(seed=1, terrain=object())  # A live model rather than its tile directory
+    runner(seed=1, fading=object())
+    assert len(calls) == 6
+    assert cache.entries() == []
+
+
+def test_receivers_are_keyed_by_their_parameters(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    runner = cache.wrap(counting_runner(calls))
+    runner(seed=1, receiver=ReceiverQueue(decode_rate=100.0))
+    runner(seed=1, receiver=ReceiverQueue(decode_rate=100.0, chunk_size=16))
+    assert len(calls) == 1
+    runner(seed=1, receiver=ReceiverQueue(decode_rate=200.0))
+    runner(seed=1, receiver=ReceiverQueue(decode_rate=100.0, queue_capacity=5))
+    runner(seed=1)
+    assert len(calls) == 4
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=2500)
+    runner = cache.wrap(counting_runner([]))
+    runner(seed=1)
+    runner(seed=2)
+    paths = sorted(cache.entries(), key=lambda entry: entry[2])
+    os.utime(paths[0][0], (0, 0))
+    os.utime(paths[1][0], (1, 1))
+    runner(seed=1)  # Hit: refreshes seed 1
+    runner(seed=3)  # Over budget: seed 2 goes
+    keys = {os.path.basename(path) for path, _, _ in cache.entries()}
+    assert keys == {cache.key({}, 1) + '.pkl', cache.key({}, 3) + '.pkl'}
+    assert cache.invalidate() == 2
+
+
+def test_source_version_follows_local_imports():
+    assert source_version('simulation') == source_version('simulation')
+    assert source_version('simulation') != source_version('crn')
@@ -0,0 +1,70 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from route import RouteGenerator, optimize_waypoint_order, route_energy
+
+
+def random_route(rng, count):
+    return [(38.9 + rng.uniform(-0.01, 0.01), -77.0 + rng.uniform(-0.01, 0.01), rng.uniform(80, 200))
+            for _ in range(count)]
+
+
+def reversals(route):
+    """Every route obtained by reversing one segment after the fixed start."""
+    for i in range(1, len(route)):
+        for j in range(i + 1, len(route)):
+            yield route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+
+
+def test_route_energy_sums_distance_and_climb():
+    # 0.01 degrees of latitude is about 1112 m
+    route = [(38.0, -77.0, 100.0), (38.01, -77.0, 100.0), (38.01, -77.0, 150.0)]
+    assert route_energy(route, consume_rate=0.05, speed=10.0) == pytest.approx(
+        0.05 * 1111.95 / 10 + 50 * 0.05, rel=1e-4)
+    assert route_energy(route[:1]) == 0.0
+
+
+def test_optimized_routes_are_reordered_and_cheaper():
+    rng = random.Random(1)
+    routes = [random_route(rng, 7) for _ in range(5)] + [random_route(rng, 4), random_route(rng, 2)]
+    optimized = optimize_waypoint_order(routes)
+    assert optimized[-1] == routes[-1]
+    for route, better in zip(routes, optimized):
+        assert better[0] == route[0]
+        assert sorted(better) == sorted(route)
+        # 2-opt optimum: no single segment reversal improves it
+        neighbours = [route_energy(candidate) for candidate in reversals(better)]
+        assert min(neighbours, default=np.inf) >= route_energy(better) - 1e-9
+
+
+def test_optimizing_never_makes_a_route_worse():
+    rng = random.Random(5)
+    routes = [random_route(rng, 7) for _ in range(2000)]
+    for route, better in zip(routes, optimize_waypoint_order(routes)):
+        assert route_energy(better) <= route_energy(route) + 1e-12
+
+
+def test_small_routes_reach_the_optimum():
+    rng = random.Random(2)
+    for _ in range(10):
+        route = random_route(rng, 6)
+        best = min(route_energy([route[0], *rest]) for rest in itertools.permutations(route[1:]))
+        assert route_energy(optimize_waypoint_order([route])[0]) == pytest.approx(best, rel=0.05)
+
+
+def test_collinear_waypoints_are_flown_in_order():
+    line = [(38.0 + 0.001 * k, -77.0, 100.0) for k in range(8)]
+    shuffled = [line[0]] + random.Random(3).sample(line[1:], 7)
+    assert optimize_waypoint_order([shuffled]) == [line]
+
+
+def test_generator_can_optimize():
+    random.seed(4)
+    plain = RouteGenerator(38.9, -77.0, num_routes=4, waypoints_per_route=8).generate_routes()
+    random.seed(4)
+    optimized = RouteGenerator(38.9, -77.0, num_routes=4, waypoints_per_route=8, optimize=True).generate_routes()
+    assert optimized == optimize_waypoint_order(plain)
+    assert sum(map(route_energy, optimized)) < sum(map(route_energy, plain))
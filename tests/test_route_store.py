@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from drone import Drone
+from route_store import RouteStore
+
+ROUTE = [(40.0, -75.0, 10.0), (40.001, -75.0, 20.0), (40.002, -75.001, 30.0)]
+OTHER = [(41.0, -74.0, 50.0), (41.001, -74.0, 60.0)]
+
+
+def test_identical_routes_are_stored_once():
+    store = RouteStore(initial_capacity=2)
+    ids = store.add_routes([ROUTE, OTHER, list(ROUTE), np.array(OTHER)])
+    assert ids == [0, 1, 0, 1]
+    assert len(store) == 2
+    assert store.size == 5
+    assert store.nbytes == 5 * 3 * 8
+    np.testing.assert_array_equal(store.points(0), ROUTE)
+    np.testing.assert_array_equal(store.points(1), OTHER)
+
+
+def test_points_are_read_only_views():
+    store = RouteStore()
+    route_id = store.add(ROUTE)
+    points = store.points(route_id)
+    assert np.shares_memory(points, store.waypoints)
+    with pytest.raises(ValueError):
+        points[0, 0] = 0.0
+
+
+def test_views_behave_like_waypoint_lists():
+    store = RouteStore()
+    plain, shifted = store.views([store.add(ROUTE)] * 2, offsets=[(0, 0, 0), (0.5, -0.5, 5)])
+    assert len(plain) == 3
+    assert list(plain) == ROUTE
+    assert plain[-1] == ROUTE[-1]
+    assert plain[1:] == ROUTE[1:]
+    with pytest.raises(IndexError):
+        plain[3]
+    assert shifted[0] == pytest.approx((40.5, -75.5, 15.0))
+    np.testing.assert_allclose(shifted.as_array(), np.array(ROUTE) + (0.5, -0.5, 5))
+    assert store.view(0).offset is None
+
+
+def test_drones_fly_route_views_like_lists():
+    store = RouteStore()
+    view = store.view(store.add(ROUTE), offset=(0.001, 0.0, 0.0))
+    shifted = [(lat + 0.001, lon, alt) for lat, lon, alt in ROUTE]
+    with_view = Drone(1, 'quad', 1, 2, 10, 2, 1, 0.01, 100, view)
+    with_list = Drone(2, 'quad', 1, 2, 10, 2, 1, 0.01, 100, shifted)
+    status = 1
+    while status == 1:
+        status = with_view.calculate_navigation(1)
+        assert with_list.calculate_navigation(1) == status
+        assert with_view.current_position == pytest.approx(with_list.current_position)
+    assert status == 0
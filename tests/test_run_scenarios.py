@@ -0,0 +1,34 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+from run_scenarios import main, run_config
+
+CONFIG = {
+    'seed': 3,
+    'routes': {'num_routes': 2, 'waypoints_per_route': 3},
+    'scenarios': {'clear': {}, 'spoofed': {'spoofing': True, 'spoof_probability': 0.5}},
+}
+
+
+def test_cli_writes_summary_without_plotting(tmp_path):
+    config = tmp_path / 'scenarios.json'
+    config.write_text(json.dumps(CONFIG))
+    output = tmp_path / 'out'
+    assert main([str(config), '--output-dir', str(output), '--no-cache']) == 0
+    summary = json.loads((output / 'summary.json').read_text())
+    assert set(summary) == {'clear', 'spoofed'}
+    assert summary['clear']['messages'] > 0
+    assert not list(output.glob('*.png'))
+
+
+def test_seeded_config_is_reproducible():
+    assert run_config(CONFIG)[1] == run_config(CONFIG)[1]
+
+
+def test_core_import_does_not_load_plotting():
+    code = "import sys, run_scenarios, simulation, gcs; print('matplotlib' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=str(pathlib.Path(__file__).resolve().parents[1]))
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+import sensitivity
+from sensitivity import MAX_DIMENSIONS, analyze, saltelli_design, sobol_indices, sobol_points
+
+
+def additive_runner(seed=None, x=0.0, y=0.0, z=0.0):
+    """Stand-in for run_simulation: packet loss x + 2 y, z has no effect."""
+    return {'packet_loss': [(1, x + 2 * y)], 'snr': [(1, 10.0)], 'latency': [], 'throughput': []}
+
+
+def test_unscrambled_sequence_starts_with_the_reference_points():
+    points = sobol_points(4, 2, scramble=False)
+    np.testing.assert_array_equal(points, [[0, 0], [0.5, 0.5], [0.75, 0.25], [0.25, 0.75]])
+
+
+@pytest.mark.parametrize('scramble', [False, True])
+def test_every_dimension_is_stratified(scramble):
+    n = 256
+    points = sobol_points(n, MAX_DIMENSIONS, scramble=scramble, seed=1)
+    assert points.min() >= 0 and points.max() < 1
+    for column in points.T:
+        assert sorted(np.floor(column * n).astype(int).tolist()) == list(range(n))
+
+
+def test_scrambling_is_seeded():
+    np.testing.assert_array_equal(sobol_points(8, 3, seed=2), sobol_points(8, 3, seed=2))
+    assert not np.array_equal(sobol_points(8, 3, seed=2), sobol_points(8, 3, seed=3))
+    with pytest.raises(ValueError):
+        sobol_points(8, MAX_DIMENSIONS + 1)
+
+
+def test_design_swaps_one_column_per_parameter():
+    names, a, b, ab = saltelli_design({'x': (0, 1), 'y': (10, 20)}, 16, seed=0)
+    assert names == ['x', 'y']
+    assert a.shape == b.shape == (16, 2) and ab.shape == (2, 16, 2)
+    assert ((a[:, 1] >= 10) & (a[:, 1] < 20)).all()
+    np.testing.assert_array_equal(ab[0], np.column_stack((b[:, 0], a[:, 1])))
+    np.testing.assert_array_equal(ab[1], np.column_stack((a[:, 0], b[:, 1])))
+
+
+def test_indices_of_an_additive_function():
+    # Var(x + 2 y) = 1/12 + 4/12, so x explains a fifth and y four fifths
+    names, a, b, ab = saltelli_design({'x': (0, 1), 'y': (0, 1), 'z': (0, 1)}, 1024, seed=0)
+    f = lambda m: m[..., 0] + 2 * m[..., 1]
+    first, total = sobol_indices(f(a), f(b), f(ab))
+    np.testing.assert_allclose(first, [0.2, 0.8, 0.0], atol=0.03)
+    np.testing.assert_allclose(total, [0.2, 0.8, 0.0], atol=0.03)
+    first, total = sobol_indices(np.ones(4), np.ones(4), np.ones((2, 4)))
+    assert not first.any() and not total.any()
+
+
+def test_analyze_runs_the_design_in_parallel():
+    result = analyze({'x': (0, 1), 'y': (0, 1), 'z': (0, 1)}, n=256, outputs=('packet_loss', 'mean_snr'),
+                     workers=2, runner=additive_runner)
+    assert result['runs'] == 256 * 5
+    assert result['packet_loss']['y']['first'] == pytest.approx(0.8, abs=0.05)
+    assert result['packet_loss']['z']['total'] == pytest.approx(0.0, abs=1e-12)
+    assert result['mean_snr']['x'] == {'first': 0.0, 'total': 0.0}
+
+
+def test_main_writes_the_indices(tmp_path):
+    config = tmp_path / 'sensitivity.json'
+    config.write_text(json.dumps({
+        'ranges': {'jamming_probability': [0, 1]}, 'samples': 4, 'workers': 2,
+        'fixed': {'jamming': True, 'routes': [[[38.9, -77.03, 100], [38.901, -77.03, 110]]]},
+    }))
+    assert sensitivity.main([str(config), '--output-dir', str(tmp_path / 'out')]) == 0
+    written = json.loads((tmp_path / 'out' / 'sensitivity.json').read_text())
+    assert written['runs'] == 4 * 3
+    assert set(written['packet_loss']) == {'jamming_probability'}
@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from adsbchannel import ADSBChannel
+from cw_jammer import ContinuousWaveJammer
+from pls_ns_jammer import PulsedNoiseJammer
+from spectrum import SpectrumGrid
+from simulation import DEFAULT_CENTER, run_simulation
+from swp_jammer import SweepingJammer
+
+ROUTE = [(38.9, -77.03, 100.0), (38.903, -77.03, 120.0)]
+
+
+def test_continuous_carrier_fills_its_band():
+    grid = SpectrumGrid(10.0)
+    grid.add_jammer(ContinuousWaveJammer(jamming_power_dbm=-70), frequency=1090e6, bandwidth=2e6)
+    # A 1 MHz receiver band sees half of a 2 MHz emission, a wider one all of it
+    assert float(grid.interference_dbm(3.0, 1090e6)) == pytest.approx(-70 - 10 * np.log10(2))
+    assert float(grid.interference_dbm(3.0, 1090e6, bandwidth=4e6)) == pytest.approx(-70)
+    # Band edges in the middle of a bin take the matching share of it
+    assert float(grid.interference_mw(3.0, 1089.25e6, bandwidth=0.5e6)) == pytest.approx(0.25e-7)
+    assert not grid.jammed(3.0, 1000.5e6)
+    assert grid.interference_dbm(3.0, 1000.5e6) == -np.inf
+
+
+def test_partial_slots_are_weighted_by_coverage():
+    grid = SpectrumGrid(1.0, time_step=0.1)
+    grid.add_emission([0.05, 0.3], [0.1, 0.5], 1000.5e6, 1e6, 0.0)
+    mw = grid.interference_mw(np.arange(10) * 0.1 + 0.01, 1000.5e6)
+    np.testing.assert_allclose(mw, [0.5, 0, 0, 1, 1, 0, 0, 0, 0, 0])
+    assert grid.jammed(np.arange(10) * 0.1 + 0.01, 1000.5e6).tolist() == [True, False, False, True, True] + [False] * 5
+    # Emissions add up, and later queries see them
+    grid.add_emission([0.0], [1.0], 1000.5e6, 1e6, 0.0)
+    assert float(grid.interference_mw(0.95, 1000.5e6)) == pytest.approx(1.0)
+    assert float(grid.interference_mw(5.0, 1000.5e6)) == pytest.approx(1.0)  # Past the end: last slot
+
+
+def test_pulses_jam_only_inside_their_windows():
+    jammer = PulsedNoiseJammer(pulse_interval_range=(1.0, 3.0), pulse_duration=0.5)
+    starts, ends = jammer.pulse_schedule(60.0, rng=random.Random(3))
+    grid = SpectrumGrid(60.0, time_step=0.1)
+    grid.add_jammer(jammer, frequency=1090e6, rng=random.Random(3))
+
+    times = np.arange(600) * 0.1 + 0.05  # Slot centres
+    inside = ((times[:, None] > starts[None, :] - 0.05) & (times[:, None] < ends[None, :] + 0.05)).any(axis=1)
+    np.testing.assert_array_equal(grid.jammed(times, 1090e6), inside)
+
+
+def test_hops_follow_the_schedule():
+    jammer = SweepingJammer(hop_interval=2.0)
+    hop_times, frequencies = jammer.hop_schedule(20.0, rng=random.Random(5))
+    grid = SpectrumGrid(20.0)
+    grid.add_jammer(jammer, bandwidth=1e6, rng=random.Random(5))
+
+    for hop_time, frequency in zip(hop_times, frequencies):
+        t = hop_time + 1.0
+        assert grid.jammed(t, frequency + 0.5e6)
+        others = [f for f in jammer.frequency_list if f != frequency]
+        assert not grid.jammed(np.full(len(others), t), np.array(others) + 0.5e6).any()
+
+
+def test_grid_only_applies_with_an_active_jammer():
+    jammer = ContinuousWaveJammer(jamming_power_dbm=-60)
+    grid = SpectrumGrid(100.0)
+    grid.add_jammer(jammer)
+    message = {'drone_id': '1', 'latitude': 38.9, 'longitude': -77.03, 'altitude': 100.0}
+
+    plain = ADSBChannel().transmit(dict(message), DEFAULT_CENTER, sim_time=5)[3]
+    channel = ADSBChannel(spectrum=grid)
+    assert channel.transmit(dict(message), DEFAULT_CENTER, sim_time=5)[3] == plain
+    assert channel.transmit(dict(message), DEFAULT_CENTER, jammer=jammer, sim_time=5)[3] < plain - 10
+
+    # A scenario without jamming is unaffected by the grid
+    with_grid = run_simulation(routes=[ROUTE], seed=1, spectrum=grid)
+    assert with_grid['snr'] == run_simulation(routes=[ROUTE], seed=1)['snr']
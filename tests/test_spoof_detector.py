@@ -0,0 +1,38 @@
+import numpy as np
+from gcs import GCS
+from spoof_detector import SpoofDetector
+
+GCS_POSITION = (38.8977, -77.0365)
+
+
+def make_detector():
+    detector = SpoofDetector(GCS_POSITION)
+    detector.register_drone('1', max_speed=15.0, max_climb_rate=3.0)
+    return detector
+
+
+def test_flags_implied_speed_and_unknown_ids():
+    detector = make_detector()
+    assert detector.check('1', (38.90, -77.03, 100.0), 0.0) == []
+    assert detector.check('1', (38.9001, -77.03, 100.0), 1.0) == []
+    kinds = [alert.kind for alert in detector.check('1', (38.95, -77.03, 100.0), 2.0)]
+    assert kinds == ['implied_speed']
+    assert [alert.kind for alert in detector.check('FAKE', (38.90, -77.03, 100.0), 2.0)] == ['unknown_id']
+
+
+def test_snr_too_strong_for_distance():
+    detector = make_detector()
+    position = (38.95, -77.03, 100.0)
+    expected = detector.expected_snr(position[0], position[1])
+    assert detector.check('1', position, 0.0, snr_db=expected) == []
+    kinds = [alert.kind for alert in detector.check('1', position, 1.0, snr_db=expected + 30)]
+    assert kinds == ['snr_inconsistent']
+
+
+def test_batch_ingest_forwards_snr_to_the_detector():
+    detector = make_detector()
+    gcs = GCS(*GCS_POSITION, detector=detector)
+    positions = np.array([[38.95, -77.03, 100.0], [38.9501, -77.03, 100.0]])
+    expected = detector.expected_snr(38.95, -77.03)
+    gcs.receive_updates(['1', '1'], positions, np.array([0.0, 1.0]), snr_db=[expected, expected + 30])
+    assert detector.alert_counts == {'snr_inconsistent': 1}
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from drone import Drone
+from swarm_shm import SharedSwarm, SwarmArrays
+
+ROUTE = [(40.0, -75.0, 10.0), (40.001, -75.0, 20.0), (40.002, -75.001, 30.0)]
+
+
+def make_drones(count):
+    return [Drone(i, 'quad', 1, 2, 10, 2, 1, 0.01, 100, ROUTE) for i in range(count)]
+
+
+def test_matches_sequential_drones():
+    drones = make_drones(4)
+    with SharedSwarm(drones, workers=0) as swarm:
+        moving = len(drones)
+        while moving:
+            moving = swarm.tick()
+            statuses = [drone.calculate_navigation(1) for drone in drones]
+            np.testing.assert_allclose(swarm.positions, [drone.current_position for drone in drones])
+            assert swarm.status.tolist() == statuses
+        assert statuses == [0] * len(drones)
+
+
+def test_workers_step_in_lockstep_and_share_memory():
+    with SharedSwarm(make_drones(6), workers=0) as reference, \
+            SharedSwarm(make_drones(6), workers=2, timeout=10) as swarm:
+        reader = SwarmArrays(*swarm.arrays.spec, shared_tracker=True)
+        for _ in range(5):
+            swarm.tick()
+            reference.tick()
+        np.testing.assert_allclose(reader.position, reference.positions)
+        reader.close()
+
+
+def test_dead_worker_fails_the_tick():
+    swarm = SharedSwarm(make_drones(2), workers=1, timeout=5)
+    try:
+        swarm.tick()
+        swarm.processes[0].terminate()
+        swarm.processes[0].join()
+        with pytest.raises(RuntimeError):
+            swarm.tick()
+        with pytest.raises(RuntimeError):
+            swarm.tick()
+    finally:
+        swarm.close()
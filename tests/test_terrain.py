@@ -0,0 +1,113 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from adsbchannel import ADSBChannel
+from simulation import DEFAULT_CENTER, run_simulation
+from terrain import TerrainModel, knife_edge_loss, tile_name
+
+SIDE = 101  # Samples per tile side; real tiles have 1201 or 3601
+
+
+def write_tile(directory, lat_index, lon_index, heights):
+    heights.astype('>i2').tofile(str(directory / tile_name(lat_index, lon_index)))
+
+
+def ridge_tile(height):
+    """A tile at sea level with a north-south ridge along longitude 4.5."""
+    heights = np.zeros((SIDE, SIDE))
+    heights[:, SIDE // 2 - 1:SIDE // 2 + 2] = height
+    return heights
+
+
+def test_tile_names():
+    assert tile_name(38, -78) == 'N38W078.hgt'
+    assert tile_name(-5, 4) == 'S05E004.hgt'
+
+
+def test_knife_edge_loss():
+    assert float(knife_edge_loss(0.0)) == pytest.approx(6.0, abs=0.1)
+    assert float(knife_edge_loss(-1.0)) == 0.0
+    assert np.all(np.diff(knife_edge_loss(np.linspace(-0.7, 3, 20))) > 0)
+
+
+def test_elevation_is_bilinear(tmp_path):
+    # Heights rise 1 m per row going south and 2 m per column going east
+    rows, cols = np.mgrid[0:SIDE, 0:SIDE]
+    heights = rows + 2 * cols
+    heights[0, 0] = -32768  # Voids read as sea level
+    write_tile(tmp_path, 50, 4, heights)
+    terrain = TerrainModel(str(tmp_path))
+
+    lat = np.array([50.75, 50.5, 50.05])
+    lon = np.array([4.25, 4.5, 4.905])
+    expected = (51 - lat) * (SIDE - 1) + 2 * (lon - 4) * (SIDE - 1)
+    np.testing.assert_allclose(terrain.elevation(lat, lon), expected)
+    assert terrain.elevation([51.0], [4.0])[0] == 0.0
+    assert terrain.elevation([10.5], [10.5])[0] == 0.0  # Missing tile
+
+
+def test_ridge_blocks_low_links(tmp_path):
+    write_tile(tmp_path, 50, 4, ridge_tile(500))
+    terrain = TerrainModel(str(tmp_path), samples_per_ray=200)
+
+    heights = np.array([50.0, 300.0, 2000.0])
+    line_of_sight, loss = terrain.obstruction(50.5, 4.45, heights, 50.5, 4.55, 10.0)
+    assert line_of_sight.tolist() == [False, False, True]
+    assert loss[0] > loss[1] > 0
+    assert loss[2] == 0.0
+
+    # Without the ridge every link is clear
+    flat = tmp_path / 'flat'
+    flat.mkdir()
+    write_tile(flat, 50, 4, ridge_tile(0))
+    line_of_sight, loss = TerrainModel(str(flat)).obstruction(50.5, 4.45, heights, 50.5, 4.55, 10.0)
+    assert line_of_sight.all()
+    assert not loss.any()
+
+
+def test_link_losses_are_memoized(tmp_path):
+    write_tile(tmp_path, 50, 4, ridge_tile(500))
+    terrain = TerrainModel(str(tmp_path), samples_per_ray=200)
+    heights = np.array([50.0, 300.0, 2000.0])
+    _, expected = terrain.obstruction(50.5, 4.45, heights, 50.5, 4.55, 10.0)
+
+    np.testing.assert_allclose(terrain.link_losses(50.5, 4.45, heights, 50.5, 4.55), expected)
+    assert (terrain.memo_hits, terrain.memo_misses) == (0, 3)
+    assert terrain.link_loss(50.5, 4.45, 50.0, 50.5, 4.55) == pytest.approx(expected[0])
+    assert (terrain.memo_hits, terrain.memo_misses) == (1, 3)
+
+
+def test_pickles_without_its_memory_maps(tmp_path):
+    write_tile(tmp_path, 50, 4, ridge_tile(500))
+    terrain = TerrainModel(str(tmp_path))
+    loss = terrain.link_loss(50.5, 4.45, 50.0, 50.5, 4.55)
+    copy = pickle.loads(pickle.dumps(terrain))
+    assert not copy._tiles
+    assert copy.obstruction(50.5, 4.45, 50.0, 50.5, 4.55, 10.0)[1] == pytest.approx(loss)
+
+
+def test_simulation_links_see_the_terrain(tmp_path):
+    # Full-resolution tile under DEFAULT_CENTER with a ridge between the GCS and the route
+    side = 1201
+    heights = np.zeros((side, side))
+    ridge = int((DEFAULT_CENTER[1] + 0.005 + 78) * (side - 1))
+    heights[:, ridge - 1:ridge + 2] = 500
+    (tmp_path / tile_name(38, -78)).write_bytes(heights.astype('>i2').tobytes())
+    lat, lon = DEFAULT_CENTER
+    route = [(lat, lon + 0.01, 100.0), (lat + 0.002, lon + 0.01, 100.0)]
+
+    def mean_snr(**kwargs):
+        snr = run_simulation(routes=[route], seed=1, **kwargs)['snr']
+        return np.mean([value for _, value in snr])
+
+    assert mean_snr(terrain=str(tmp_path)) < mean_snr() - 10
+
+    # The per-tick bulk lookup gives the same link budget as a per-message one
+    channel = ADSBChannel(terrain=TerrainModel(str(tmp_path)))
+    message = {'drone_id': '1', 'latitude': route[0][0], 'longitude': route[0][1], 'altitude': route[0][2]}
+    gain = channel.link_gains_db(['1'], [route[0]], DEFAULT_CENTER)[0]
+    assert gain < -10
+    bulk = channel.transmit(dict(message), DEFAULT_CENTER, link_gain_db=gain)[3]
+    assert channel.transmit(dict(message), DEFAULT_CENTER)[3] == pytest.approx(bulk)
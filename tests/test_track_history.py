@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from track_history import TrackHistory
+
+
+def points(n, lat=38.0):
+    return np.column_stack((np.full(n, lat), np.linspace(-77.0, -76.9, n), np.full(n, 100.0)))
+
+
+def test_ring_keeps_the_last_points_in_order():
+    history = TrackHistory(max_drones=2, length=4)
+    history.extend(['a'] * 6, np.arange(6.0), points(6))
+    history.append('a', 6.0, (38.0, -76.8, 100.0))
+    np.testing.assert_array_equal(history.last('a')[:, 0], [3.0, 4.0, 5.0, 6.0])
+    np.testing.assert_array_equal(history.last('a', 2)[:, 0], [5.0, 6.0])
+
+
+def test_interpolation_and_velocity():
+    history = TrackHistory(length=8)
+    history.extend(['a', 'a'], [0.0, 10.0], [(38.0, -77.0, 100.0), (38.1, -77.0, 200.0)])
+    _, at = history.positions_at(5.0)
+    np.testing.assert_allclose(at[0], [38.05, -77.0, 150.0])
+    _, outside = history.positions_at(11.0)
+    assert np.isnan(outside).all()
+    _, velocity = history.velocities(['a', 'b'])
+    np.testing.assert_allclose(velocity[0], [0.01, 0.0, 10.0])
+    assert np.isnan(velocity[1]).all()
+    assert set(history.window(9.0, 20.0)) == {'a'}
+
+
+def test_batch_never_evicts_its_own_drones():
+    history = TrackHistory(max_drones=3, length=4)
+    history.extend(['old', 'a', 'b'], [0.0, 1.0, 2.0], points(3))
+    # 'a' and 'b' report again together with a new drone: only 'old' may go
+    history.extend(['a', 'new', 'b'], [3.0, 3.0, 3.0], points(3, lat=39.0))
+    assert set(history.slots) == {'a', 'b', 'new'}
+    np.testing.assert_array_equal(history.last('a')[:, 0], [1.0, 3.0])
+    np.testing.assert_array_equal(history.last('new')[:, 0], [3.0])
+
+
+def test_more_new_drones_than_slots_keeps_the_latest():
+    history = TrackHistory(max_drones=2, length=4)
+    history.extend(['a', 'b', 'c', 'a'], [1.0, 5.0, 3.0, 2.0], points(4))
+    assert sorted(history.slots.values()) == [0, 1]
+    assert set(history.slots) == {'b', 'c'}
+    assert [history.ids[slot] for slot in (0, 1)] == ['b', 'c']
+    np.testing.assert_array_equal(history.last('b')[:, 0], [5.0])
+    np.testing.assert_array_equal(history.last('c')[:, 0], [3.0])
+    assert history.last('a').shape == (0, 4)
+
+
+@pytest.mark.parametrize('batch', [1, 5])
+def test_lru_eviction(batch):
+    history = TrackHistory(max_drones=2, length=4)
+    ids = ['a', 'b', 'a', 'c']
+    for start in range(0, len(ids), batch):
+        chunk = ids[start:start + batch]
+        history.extend(chunk, np.arange(start, start + len(chunk), dtype=float), points(len(chunk)))
+    assert set(history.slots) == {'a', 'c'}
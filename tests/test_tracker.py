@@ -0,0 +1,39 @@
+import numpy as np
+from gcs import GCS
+from tracker import KalmanTracker, geodetic_to_local, local_to_geodetic
+
+REF = (38.8977, -77.0365)
+
+
+def test_local_projection_round_trip():
+    lat = REF[0] + np.linspace(-0.02, 0.02, 5)
+    lon = REF[1] + np.linspace(-0.02, 0.02, 5)
+    alt = np.linspace(50, 150, 5)
+    back = local_to_geodetic(geodetic_to_local(lat, lon, alt, *REF), *REF)
+    assert np.allclose(back, np.stack([lat, lon, alt], axis=1))
+
+
+def test_tracker_follows_constant_velocity_and_gates_outliers():
+    tracker = KalmanTracker(*REF, process_noise=0.01, measurement_std=(1.0, 1.0, 1.0))
+    rng = np.random.default_rng(0)
+    velocity = np.array([10.0, -5.0, 1.0])
+    for t in range(30):
+        truth = velocity * t + rng.normal(0, 1.0, 3)
+        position = local_to_geodetic(truth, *REF)
+        assert tracker.update(['a'], [position], [float(t)])[0]
+    assert np.allclose(tracker.velocity('a'), velocity, atol=0.5)
+
+    outlier = local_to_geodetic(velocity * 30 + 500.0, *REF)
+    assert not tracker.update(['a'], [outlier], [30.0])[0]
+
+
+def test_gcs_batch_updates_only_the_reporting_tracks():
+    gcs = GCS(*REF, tracker=KalmanTracker(*REF))
+    positions = np.array([[REF[0] + 0.001 * i, REF[1], 100.0] for i in range(4)])
+    gcs.receive_updates(['a', 'b', 'c', 'd'], positions, np.zeros(4))
+    gcs.receive_updates(['b', 'b'], positions[[1, 1]] + [0.0001, 0, 0], np.array([1.0, 2.0]))
+
+    assert gcs.drone_positions['b'] == gcs.tracker.position('b')
+    assert gcs.drone_positions['a'] == tuple(positions[0])
+    assert np.allclose(gcs.tracker.positions(['c', 'b']),
+                       [gcs.tracker.position('c'), gcs.tracker.position('b')])
@@ -0,0 +1,191 @@
+import numpy as np
+
+FIELDS = ('time', 'latitude', 'longitude', 'altitude')
+
+
+class TrackHistory:
+    """
+    Per-drone track history in one preallocated ring buffer.
+
+    Points live in a (max_drones, length, 4) array of (time, lat, lon, alt)
+    with a write head and a fill count per drone slot, so appending overwrites
+    the oldest point in place and memory never grows past what was allocated
+    at construction. Queries unroll the rings into chronological order with a
+    single gather and work on every track at once.
+    """
+    def __init__(self, max_drones=64, length=256):
+        """
+        :param max_drones: Number of drone slots; when a new drone arrives and all are
+                           taken, the drone updated longest ago loses its slot (never
+                           one with points in the same batch).
+        :param length: Points kept per drone.
+        """
+        self.length = length
+        self.points = np.zeros((max_drones, length, len(FIELDS)))
+        self.head = np.zeros(max_drones, dtype=np.int64)  # Next write position
+        self.count = np.zeros(max_drones, dtype=np.int64)
+        self.last_time = np.full(max_drones, -np.inf)
+        self.slots = {}  # drone_id -> slot
+        self.ids = [None] * max_drones
+
+    def __len__(self):
+        return len(self.slots)
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes + self.head.nbytes + self.count.nbytes + self.last_time.nbytes
+
+    def _assign(self, drone_ids, timestamps):
+        """
+        Give slots to the drones of a batch that have none, evicting the drones updated
+        longest ago but never one of the batch. If the batch brings more new drones
+        than there are slots to give, those with the latest points get them.
+        :return: Slot of every point, -1 for points of drones left without one.
+        """
+        new = {}
+        for drone_id, timestamp in zip(drone_ids, timestamps):
+            if drone_id not in self.slots:
+                new[drone_id] = max(timestamp, new.get(drone_id, timestamp))
+        if new:
+            taken = np.array([drone_id is not None for drone_id in self.ids])
+            protected = np.zeros(len(self.ids), dtype=bool)
+            protected[[self.slots[drone_id] for drone_id in set(drone_ids) if drone_id in self.slots]] = True
+            evictable = np.flatnonzero(taken & ~protected)
+            candidates = np.concatenate((np.flatnonzero(~taken),
+                                         evictable[np.argsort(self.last_time[evictable], kind='stable')]))
+            arrivals = list(new)
+            if len(arrivals) > candidates.shape[0]:
+                latest = set(sorted(arrivals, key=new.get, reverse=True)[:candidates.shape[0]])
+                arrivals = [drone_id for drone_id in arrivals if drone_id in latest]
+            for drone_id, slot in zip(arrivals, candidates.tolist()):
+                if self.ids[slot] is not None:
+                    del self.slots[self.ids[slot]]
+                self.slots[drone_id] = slot
+                self.ids[slot] = drone_id
+                self.head[slot] = 0
+                self.count[slot] = 0
+                self.last_time[slot] = -np.inf
+        return np.array([self.slots.get(drone_id, -1) for drone_id in drone_ids], dtype=np.int64)
+
+    def append(self, drone_id, timestamp, position):
+        """Add one point (timestamp, (lat, lon, alt)) to a drone's track."""
+        slot = self.slots.get(drone_id)
+        if slot is None:
+            slot = int(self._assign([drone_id], [timestamp])[0])
+        head = self.head[slot]
+        row = self.points[slot, head]
+        row[0] = timestamp
+        row[1:] = position
+        self.head[slot] = (head + 1) % self.length
+        if self.count[slot] < self.length:
+            self.count[slot] += 1
+        self.last_time[slot] = timestamp
+
+    def extend(self, drone_ids, timestamps, positions):
+        """
+        Append a batch of points; a drone may appear several times, in time order.
+        :param positions: (N, 3) array of (lat, lon, alt).
+        """
+        slots = self._assign(drone_ids, np.asarray(timestamps, dtype=np.float64).tolist())
+        kept = slots >= 0
+        if not kept.any():
+            return
+        if not kept.all():
+            slots = slots[kept]
+            timestamps = np.asarray(timestamps, dtype=np.float64)[kept]
+            positions = np.asarray(positions, dtype=np.float64)[kept]
+        order = np.argsort(slots, kind='stable')
+        sorted_slots = slots[order]
+        starts = np.flatnonzero(np.diff(sorted_slots, prepend=-1))
+        sizes = np.diff(np.append(starts, sorted_slots.shape[0]))
+        group_slots = sorted_slots[starts]
+        rank = np.arange(sorted_slots.shape[0]) - np.repeat(starts, sizes)
+        # Only the last `length` points of a drone in the batch survive
+        keep = rank >= np.repeat(sizes, sizes) - self.length
+        order, sorted_slots, rank = order[keep], sorted_slots[keep], rank[keep]
+        positions = np.asarray(positions, dtype=np.float64)
+        columns = (self.head[sorted_slots] + rank) % self.length
+        self.points[sorted_slots, columns, 0] = np.asarray(timestamps, dtype=np.float64)[order]
+        self.points[sorted_slots, columns, 1:] = positions[order]
+
+        self.head[group_slots] = (self.head[group_slots] + sizes) % self.length
+        self.count[group_slots] = np.minimum(self.count[group_slots] + sizes, self.length)
+        self.last_time[group_slots] = self.points[group_slots, (self.head[group_slots] - 1) % self.length, 0]
+
+    def _unrolled(self, slots, k=None):
+        """Chronological (len(slots), k, 4) view of the last k points and their validity mask."""
+        k = self.length if k is None else min(k, self.length)
+        offsets = np.arange(-k, 0)
+        columns = (self.head[slots, None] + offsets) % self.length
+        valid = offsets >= -self.count[slots, None]
+        return self.points[slots[:, None], columns], valid
+
+    def _active_slots(self):
+        return np.array(sorted(self.slots.values()), dtype=np.int64)
+
+    def last(self, drone_id, k=None):
+        """The last k points (all kept points by default) of a drone, oldest first, as a (k, 4) array."""
+        slot = self.slots.get(drone_id)
+        if slot is None:
+            return np.empty((0, len(FIELDS)))
+        points, valid = self._unrolled(np.array([slot]), k)
+        return points[0, valid[0]]
+
+    def positions_at(self, timestamp, drone_ids=None):
+        """
+        Positions of drones at a time, interpolated linearly between recorded points.
+        :param drone_ids: Drones to query (all tracked drones by default).
+        :return: (ids, (N, 3) array); NaN rows where the time is outside the kept history.
+        """
+        ids = list(self.slots) if drone_ids is None else list(drone_ids)
+        known = np.array([drone_id in self.slots for drone_id in ids], dtype=bool)
+        slots = np.array([self.slots.get(drone_id, 0) for drone_id in ids], dtype=np.int64)
+        result = np.full((len(ids), 3), np.nan)
+        if not known.any():
+            return ids, result
+        count = self.count[slots[known]]
+        points, valid = self._unrolled(slots[known])
+        times = np.where(valid, points[:, :, 0], np.inf)  # Unfilled entries come first
+        rows = np.arange(points.shape[0])
+        before = (times <= timestamp).sum(axis=1)  # Kept points at or before the time
+        inside = (before >= 1) & ((before < count) | (times[:, -1] == timestamp))
+        lo = np.clip(self.length - count + before - 1, 0, self.length - 1)
+        hi = np.minimum(lo + 1, self.length - 1)
+        t0, t1 = times[rows, lo], times[rows, hi]
+        span = np.where(inside & (t1 > t0), t1 - t0, 1.0)
+        weight = np.where(inside & (t1 > t0), (timestamp - t0) / span, 0.0)[:, None]
+        positions = points[rows, lo, 1:] * (1 - weight) + points[rows, hi, 1:] * weight
+        result[known] = np.where(inside[:, None], positions, np.nan)
+        return ids, result
+
+    def window(self, start, end):
+        """
+        Every kept point with start <= time <= end.
+        :return: Dict drone_id -> (n, 4) array of (time, lat, lon, alt), oldest first,
+                 for drones with points in the window.
+        """
+        slots = self._active_slots()
+        if slots.shape[0] == 0:
+            return {}
+        points, valid = self._unrolled(slots)
+        mask = valid & (points[:, :, 0] >= start) & (points[:, :, 0] <= end)
+        return {self.ids[slot]: points[row, mask[row]]
+                for row, slot in enumerate(slots.tolist()) if mask[row].any()}
+
+    def velocities(self, drone_ids=None):
+        """
+        Velocity of each drone from its last two points, in degrees/s (lat, lon) and m/s (alt).
+        :return: (ids, (N, 3) array); NaN rows for drones with fewer than two points.
+        """
+        ids = list(self.slots) if drone_ids is None else list(drone_ids)
+        result = np.full((len(ids), 3), np.nan)
+        known = np.array([drone_id in self.slots for drone_id in ids], dtype=bool)
+        if not known.any():
+            return ids, result
+        slots = np.array([self.slots[drone_id] for drone_id in ids if drone_id in self.slots], dtype=np.int64)
+        points, valid = self._unrolled(slots, 2)
+        dt = points[:, 1, 0] - points[:, 0, 0]
+        ok = valid[:, 0] & (dt > 0)
+        velocity = (points[:, 1, 1:] - points[:, 0, 1:]) / np.where(ok, dt, 1.0)[:, None]
+        result[known] = np.where(ok[:, None], velocity, np.nan)
+        return ids, result
@@ -0,0 +1,186 @@
+import numpy as np
+
+EARTH_RADIUS = 6371000  # Earth radius in meters
+
+
+def geodetic_to_local(lat, lon, alt, ref_lat, ref_lon, ref_alt=0.0):
+    """
+    Project geodetic coordinates onto a local east/north/up plane (meters)
+    centred on the reference point. Accurate to well under a meter over the
+    few-kilometre areas the scenarios cover.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    alt = np.asarray(alt, dtype=np.float64)
+    east = EARTH_RADIUS * np.radians(lon - ref_lon) * np.cos(np.radians(ref_lat))
+    north = EARTH_RADIUS * np.radians(lat - ref_lat)
+    return np.stack([east, north, alt - ref_alt], axis=-1)
+
+
+def local_to_geodetic(enu, ref_lat, ref_lon, ref_alt=0.0):
+    """Inverse of geodetic_to_local; returns an (..., 3) array of (lat, lon, alt)."""
+    enu = np.asarray(enu, dtype=np.float64)
+    lat = ref_lat + np.degrees(enu[..., 1] / EARTH_RADIUS)
+    lon = ref_lon + np.degrees(enu[..., 0] / (EARTH_RADIUS * np.cos(np.radians(ref_lat))))
+    return np.stack([lat, lon, enu[..., 2] + ref_alt], axis=-1)
+
+
+class KalmanTracker:
+    """
+    Multi-target constant-velocity Kalman tracker.
+
+    All tracks live in stacked NumPy arrays indexed by slot, so prediction and
+    update run over every track in a batch at once. The east, north and up
+    axes are independent under the constant-velocity model, which lets each
+    track keep three 2x2 covariances (stored as their pp, pv and vv terms)
+    instead of a full 6x6 matrix.
+    """
+    def __init__(self, ref_lat, ref_lon, ref_alt=0.0, process_noise=1.0,
+                 measurement_std=(5.0, 5.0, 3.0), initial_velocity_std=20.0,
+                 gate_threshold=16.27, max_misses=5, initial_capacity=1024):
+        """
+        :param ref_lat: Latitude of the local frame origin (usually the GCS).
+        :param ref_lon: Longitude of the local frame origin.
+        :param ref_alt: Altitude of the local frame origin in meters.
+        :param process_noise: White-acceleration spectral density in m^2/s^3.
+        :param measurement_std: Measurement standard deviation (east, north, up) in meters.
+        :param initial_velocity_std: Velocity standard deviation of a new track in m/s.
+        :param gate_threshold: Chi-square gate on the 3-D innovation (16.27 = 99.9%).
+        :param max_misses: Consecutive gated measurements after which the track is re-initialised.
+        :param initial_capacity: Number of track slots to preallocate.
+        """
+        self.ref = (ref_lat, ref_lon, ref_alt)
+        self.process_noise = np.float64(process_noise)
+        self.measurement_var = np.asarray(measurement_std, dtype=np.float64) ** 2
+        self.initial_velocity_var = np.float64(initial_velocity_std) ** 2
+        self.gate_threshold = np.float64(gate_threshold)
+        self.max_misses = max_misses
+
+        self.slots = {}  # drone_id -> slot
+        self.ids = []
+        self._allocate(initial_capacity)
+
+    def _allocate(self, capacity):
+        self.pos = np.zeros((capacity, 3))
+        self.vel = np.zeros((capacity, 3))
+        self.p_pp = np.zeros((capacity, 3))
+        self.p_pv = np.zeros((capacity, 3))
+        self.p_vv = np.zeros((capacity, 3))
+        self.last_time = np.zeros(capacity)
+        self.misses = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self, capacity):
+        old = (self.pos, self.vel, self.p_pp, self.p_pv, self.p_vv, self.last_time, self.misses)
+        self._allocate(capacity)
+        n = len(self.ids)
+        for new, previous in zip((self.pos, self.vel, self.p_pp, self.p_pv, self.p_vv,
+                                  self.last_time, self.misses), old):
+            new[:n] = previous[:n]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _slot_for(self, drone_id):
+        slot = self.slots.get(drone_id)
+        if slot is None:
+            slot = len(self.ids)
+            if slot == self.pos.shape[0]:
+                self._grow(2 * slot)
+            self.slots[drone_id] = slot
+            self.ids.append(drone_id)
+            self.misses[slot] = -1  # Marks a slot awaiting its first measurement
+        return slot
+
+    def _initialise(self, slots, z, t):
+        self.pos[slots] = z
+        self.vel[slots] = 0.0
+        self.p_pp[slots] = self.measurement_var
+        self.p_pv[slots] = 0.0
+        self.p_vv[slots] = self.initial_velocity_var
+        self.last_time[slots] = t
+        self.misses[slots] = 0
+
+    def update(self, drone_ids, positions, timestamps):
+        """
+        Predict the reporting tracks to their measurement times and fuse the measurements.
+        :param drone_ids: Sequence of drone ids.
+        :param positions: (N, 3) array-like of (lat, lon, alt).
+        :param timestamps: (N,) measurement times in seconds.
+        :return: Boolean mask, True where the measurement passed the gate.
+        """
+        slots = np.fromiter((self._slot_for(d) for d in drone_ids), dtype=np.int64, count=len(drone_ids))
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        z = geodetic_to_local(positions[:, 0], positions[:, 1], positions[:, 2], *self.ref)
+        t = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+
+        accepted = np.empty(slots.shape[0], dtype=bool)
+        pending = np.arange(slots.shape[0])
+        # A slot may appear more than once per batch; fuse its reports in successive passes
+        while pending.size:
+            _, first = np.unique(slots[pending], return_index=True)
+            rows = pending[first]
+            accepted[rows] = self._update_rows(slots[rows], z[rows], t[rows])
+            pending = np.setdiff1d(pending, rows, assume_unique=True)
+        return accepted
+
+    def _update_rows(self, slots, z, t):
+        new = self.misses[slots] < 0
+        if new.any():
+            self._initialise(slots[new], z[new], t[new])
+
+        dt = np.maximum(t - self.last_time[slots], 0.0)[:, None]
+        q = self.process_noise
+        pos = self.pos[slots] + self.vel[slots] * dt
+        vel = self.vel[slots]
+        pp = self.p_pp[slots] + 2 * dt * self.p_pv[slots] + dt ** 2 * self.p_vv[slots] + q * dt ** 3 / 3
+        pv = self.p_pv[slots] + dt * self.p_vv[slots] + q * dt ** 2 / 2
+        vv = self.p_vv[slots] + q * dt
+
+        s = pp + self.measurement_var
+        innovation = z - pos
+        distance = np.sum(innovation ** 2 / s, axis=1)
+        gate = (distance <= self.gate_threshold) | new
+
+        # New tracks were just initialised on this measurement; don't fuse it twice
+        fuse = (gate & ~new)[:, None]
+        k_pos = np.where(fuse, pp / s, 0.0)
+        k_vel = np.where(fuse, pv / s, 0.0)
+        self.pos[slots] = pos + k_pos * innovation
+        self.vel[slots] = vel + k_vel * innovation
+        self.p_pp[slots] = (1 - k_pos) * pp
+        self.p_pv[slots] = (1 - k_pos) * pv
+        self.p_vv[slots] = vv - k_vel * pv
+        self.last_time[slots] = t
+
+        misses = np.where(gate, 0, self.misses[slots] + 1)
+        self.misses[slots] = misses
+        # A track that keeps rejecting everything has lost its target; re-acquire it
+        lost = misses > self.max_misses
+        if lost.any():
+            self._initialise(slots[lost], z[lost], t[lost])
+        return gate
+
+    def predicted_positions(self, t=None):
+        """
+        Geodetic positions of every track, optionally extrapolated to time t.
+        :return: (ids, (N, 3) array of (lat, lon, alt)).
+        """
+        n = len(self.ids)
+        pos = self.pos[:n]
+        if t is not None:
+            pos = pos + self.vel[:n] * np.maximum(t - self.last_time[:n], 0.0)[:, None]
+        return list(self.ids), local_to_geodetic(pos, *self.ref)
+
+    def positions(self, drone_ids):
+        """Filtered (lat, lon, alt) of the given tracks as an (N, 3) array, without touching the others."""
+        slots = np.fromiter((self.slots[d] for d in drone_ids), dtype=np.int64, count=len(drone_ids))
+        return local_to_geodetic(self.pos[slots], *self.ref)
+
+    def position(self, drone_id):
+        """Filtered (lat, lon, alt) of one track as a tuple of floats."""
+        slot = self.slots[drone_id]
+        return tuple(local_to_geodetic(self.pos[slot], *self.ref).tolist())
+
+    def velocity(self, drone_id):
+        """Filtered (east, north, up) velocity of one track in m/s."""
+        return tuple(self.vel[self.slots[drone_id]].tolist())